@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Small helpers for the JSON files the application keeps under data/
+
+Every file is written atomically (to a temporary file that is then renamed
+over the original) so readers never see a half written file, and updates
+are serialised with an advisory lock so overlapping cron runs don't lose
+each other's changes.
+"""
+import fcntl
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# How often to try again for a lock that is held elsewhere
+LOCK_POLL_INTERVAL: float = 0.05
+
+
+def get_data_path(filename: str) -> str:
+    """
+    Return the full path of a file in the application's data directory.
+
+    Args:
+        filename: The name of the file in str format.
+
+    Returns:
+        The full path of the file in str format.
+
+    Raises:
+        None
+    """
+    return os.path.join(sys.path[0], 'data', filename)
+
+
+@contextmanager
+def lock(
+        path: str,
+        shared: bool = False,
+        timeout: float | None = None) -> Iterator[None]:
+    """
+    Hold an advisory lock for the given file.
+
+    The lock is taken on a separate `<path>.lock` file so that the data file
+    itself can be replaced while the lock is held.
+
+    Args:
+        path: The path of the file to lock in str format.
+        shared: True to take a shared (read) lock instead of an exclusive
+        (write) lock.
+        timeout: The number of seconds to wait for the lock, or None to
+        wait for as long as it takes.
+
+    Returns:
+        None
+
+    Raises:
+        OSError when the lock file cannot be opened.
+        TimeoutError when the lock isn't free within the timeout.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    operation: int = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    with open(f'{path}.lock', 'a+', encoding='utf-8') as file:
+        if timeout is None:
+            fcntl.flock(file, operation)
+        else:
+            deadline: float = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(file, operation | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError as err:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(
+                            f'Timed out waiting for a lock on {path}!'
+                        ) from err
+                    time.sleep(LOCK_POLL_INTERVAL)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def read_json(path: str) -> dict[str, Any]:
+    """
+    Read a JSON object from the given file.
+
+    A missing, unreadable or corrupt file is treated as empty.
+
+    Args:
+        path: The path of the file to read in str format.
+
+    Returns:
+        The JSON object in dict format.
+
+    Raises:
+        None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data: Any = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+
+    return data
+
+
+def write_text(path: str, text: str) -> None:
+    """
+    Atomically write text to the given file.
+
+    Args:
+        path: The path of the file to write in str format.
+        text: The text to write.
+
+    Returns:
+        None
+
+    Raises:
+        OSError when the file cannot be written.
+    """
+    directory: str = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: str, data: dict[str, Any]) -> None:
+    """
+    Atomically write a JSON object to the given file.
+
+    Args:
+        path: The path of the file to write in str format.
+        data: The JSON object to write in dict format.
+
+    Returns:
+        None
+
+    Raises:
+        OSError when the file cannot be written.
+    """
+    write_text(path, json.dumps(data))
+
+
+@contextmanager
+def update_json(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Read, modify and atomically write back a JSON object under a lock.
+
+    Args:
+        path: The path of the file to update in str format.
+
+    Returns:
+        The JSON object in dict format, which is written back to the file
+        when the context exits without an exception.
+
+    Raises:
+        OSError when the file cannot be locked or written.
+    """
+    with lock(path):
+        data: dict[str, Any] = read_json(path)
+        yield data
+        write_json(path, data)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Deadline() class file
+
+Deadline() is a class that holds one time budget for a whole run. Each
+stage of the run (geocoding, fetching the weather, sending the RCON
+command) asks it for a timeout and only gets what is left of the budget,
+so a slow stage eats into the next ones instead of adding to the total.
+"""
+import threading
+import time
+from typing import Any, Callable
+
+
+class DeadlineExceededError(ValueError):
+    """
+    DeadlineExceededError() class file
+
+    DeadlineExceededError() is raised when the budget runs out before or
+    during a stage.
+    """
+
+
+class Deadline():
+    """
+    Deadline() class file
+
+    Deadline() is a class that holds one time budget for a whole run and
+    hands out what is left of it to each stage.
+    """
+
+    def __init__(self, seconds: float | None) -> None:
+        if seconds is not None and seconds <= 0:
+            raise ValueError('The deadline must be greater than zero!')
+
+        self._seconds = seconds
+        self._start = time.monotonic()
+
+    @property
+    def seconds(self) -> float | None:
+        """
+        Getter for the seconds property
+
+        Args:
+            None
+
+        Returns:
+            The whole budget in seconds, or None if there is no deadline
+
+        Raises:
+            None
+        """
+        return self._seconds
+
+    @property
+    def remaining(self) -> float | None:
+        """
+        Getter for the remaining property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds left, at least 0, or None if there is no
+            deadline
+
+        Raises:
+            None
+        """
+        if self.seconds is None:
+            return None
+
+        return max(0.0, self.seconds - (time.monotonic() - self._start))
+
+    def timeout(self, stage: str, default: float) -> float:
+        """
+        Get the timeout a stage should use
+
+        Args:
+            stage: The name of the stage, for the error message
+            default: The timeout the stage uses on its own
+
+        Returns:
+            The smaller of the default and what is left of the budget
+
+        Raises:
+            DeadlineExceededError when nothing is left of the budget
+        """
+        remaining: float | None = self.remaining
+        if remaining is None:
+            return default
+
+        if remaining <= 0:
+            raise DeadlineExceededError(
+                f'Deadline of {self.seconds:g}s exceeded before the '
+                f'{stage} stage!')
+
+        return min(default, remaining)
+
+    def call(
+            self,
+            stage: str,
+            func: Callable[..., Any],
+            *args: Any) -> Any:
+        """
+        Run a stage and give up on it when the budget runs out
+
+        The stage runs on a background thread, so one that can't be
+        interrupted (e.g. an HTTP request that keeps being retried) is left
+        to finish on its own while the run moves on.
+
+        Args:
+            stage: The name of the stage, for the error message
+            func: The function to run
+            args: The arguments to pass to the function
+
+        Returns:
+            What the function returns
+
+        Raises:
+            DeadlineExceededError when the budget runs out first
+            Any exception raised by the function, including SystemExit
+        """
+        remaining: float | None = self.remaining
+        if remaining is None:
+            return func(*args)
+
+        self.timeout(stage, remaining)
+        outcome: dict[str, Any] = {}
+
+        def run() -> None:
+            try:
+                outcome['result'] = func(*args)
+            except BaseException as err:
+                outcome['error'] = err
+
+        thread: threading.Thread = threading.Thread(
+            target=run, name=stage, daemon=True)
+        thread.start()
+        thread.join(remaining)
+        if thread.is_alive():
+            raise DeadlineExceededError(
+                f'Deadline of {self.seconds:g}s exceeded during the '
+                f'{stage} stage!')
+
+        if 'error' in outcome:
+            raise outcome['error']
+
+        return outcome.get('result')
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fleet config helpers
+
+A fleet config is a JSON file listing every Minecraft server to control,
+so a single run can update all of them:
+    {
+        "servers": [
+            {
+                "name": "survival",
+                "host": "mc1.example.com",
+                "port": 25575,
+                "password_env": "SURVIVAL_RCON_PASS",
+                "zipcode": "01234",
+                "country_code": "US"
+            }
+        ]
+    }
+
+`port` defaults to 25575 and `country_code` to US. The RCON password is
+either given directly as `password`, or read from the environment variable
+named by `password_env`.
+"""
+import json
+import os
+from typing import Any
+
+from mcrcon.rcon import DEFAULT_PORT
+
+
+def _parse_server(index: int, server: Any) -> dict[str, Any]:
+    """
+    Validate and normalise a single server entry from the config.
+
+    Args:
+        index: The position of the entry in the config, for error messages.
+        server: The entry as loaded from the JSON file.
+
+    Returns:
+        A dictionary like this:
+        {
+            'name': 'survival',
+            'host': 'mc1.example.com',
+            'port': 25575,
+            'password': 'hunter2',
+            'zipcode': 1234,
+            'country_code': 'US'
+        }
+
+    Raises:
+        ValueError if the entry is missing a field or has an invalid value.
+    """
+    if not isinstance(server, dict):
+        raise ValueError(f'Server #{index} is not an object!')
+
+    name: str = str(server.get('name') or f'server{index}')
+    host: Any = server.get('host')
+    if not host:
+        raise ValueError(f'Server `{name}` has no host!')
+
+    password: Any = server.get('password')
+    if not password and server.get('password_env'):
+        password = os.getenv(str(server['password_env']))
+    if not password:
+        raise ValueError(f'Server `{name}` has no password!')
+
+    try:
+        port: int = int(server.get('port') or DEFAULT_PORT)
+        zipcode: int = int(str(server['zipcode']).strip())
+    except KeyError as err:
+        raise ValueError(f'Server `{name}` has no zipcode!') from err
+    except ValueError as err:
+        raise ValueError(f'Server `{name}` has an invalid value!') from err
+
+    country_code: str = str(server.get('country_code') or 'US').strip()
+
+    return {
+        'name': name,
+        'host': str(host),
+        'port': port,
+        'password': str(password),
+        'zipcode': zipcode,
+        'country_code': country_code.upper()
+    }
+
+
+def load_config(path: str) -> list[dict[str, Any]]:
+    """
+    Load and validate a fleet config file.
+
+    Args:
+        path: The path of the JSON config file.
+
+    Returns:
+        A list of server dictionaries as returned by _parse_server().
+
+    Raises:
+        ValueError if the file cannot be read or is not a valid config.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            config: Any = json.load(file)
+    except OSError as err:
+        raise ValueError(f'Unable to read {path} :: {err}') from err
+    except json.JSONDecodeError as err:
+        raise ValueError(f'Invalid JSON in {path} :: {err}') from err
+
+    if not isinstance(config, dict) or not isinstance(
+            config.get('servers'), list) or not config['servers']:
+        raise ValueError(f'{path} has no servers!')
+
+    servers: list[dict[str, Any]] = [
+        _parse_server(index, server)
+        for index, server in enumerate(config['servers'], start=1)
+    ]
+
+    names: list[str] = [server['name'] for server in servers]
+    if len(set(names)) != len(names):
+        raise ValueError(f'{path} has duplicate server names!')
+
+    return servers
+
+
+def group_by_zipcode(
+        servers: list[dict[str, Any]]
+) -> dict[tuple[int, str], list[dict[str, Any]]]:
+    """
+    Group servers that share a zipcode and country code.
+
+    Args:
+        servers: The servers as returned by load_config().
+
+    Returns:
+        A dictionary mapping every unique (zipcode, country_code) to the
+        servers in that location, in config order.
+
+    Raises:
+        None
+    """
+    groups: dict[tuple[int, str], list[dict[str, Any]]] = {}
+    for server in servers:
+        key: tuple[int, str] = (server['zipcode'], server['country_code'])
+        groups.setdefault(key, []).append(server)
+
+    return groups
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Forecast timeline helpers
+
+A timeline is a list of dictionaries ordered by time, one per forecast hour,
+holding the Minecraft weather that hour maps to:
+    {
+        'dt': 1684926000, # start of the hour as a unix timestamp
+        'weather': 'rain', # clear/rain/thunder
+        'pop': 0.2 # the probability of precipitation from 0 to 1
+    }
+
+ForecastCache() keeps the latest timeline of every location in a file under
+data/, so the weather can be applied locally from a single API call until
+the forecast goes stale.
+"""
+import bisect
+import time
+from typing import Any
+
+from datastore import datastore
+
+MINUTE: int = 60
+HOUR: int = 60 * MINUTE
+DEFAULT_MAX_AGE: int = 6 * HOUR
+
+# How long after a predicted change to poll, so the new hour is in effect
+TRANSITION_MARGIN: int = 5
+
+
+def get_entry_index(timeline: list[dict[str, Any]], when: float) -> int:
+    """
+    Find the timeline entry that covers the given time.
+
+    Args:
+        timeline: The timeline to search.
+        when: The time to look up as a unix timestamp.
+
+    Returns:
+        The index of the entry covering the given time, or -1 if the time
+        falls before or after the timeline.
+
+    Raises:
+        None
+    """
+    starts: list[int] = [entry['dt'] for entry in timeline]
+    index: int = bisect.bisect_right(starts, when) - 1
+    if index < 0 or when >= starts[index] + HOUR:
+        return -1
+
+    return index
+
+
+def get_weather_at(
+        timeline: list[dict[str, Any]], when: float) -> str | None:
+    """
+    Get the Minecraft weather the timeline predicts for the given time.
+
+    Args:
+        timeline: The timeline to search.
+        when: The time to look up as a unix timestamp.
+
+    Returns:
+        Either clear/rain/thunder, or None if the timeline doesn't cover
+        the given time.
+
+    Raises:
+        None
+    """
+    index: int = get_entry_index(timeline, when)
+    if index < 0:
+        return None
+
+    return timeline[index]['weather']
+
+
+def get_weather_duration(
+        timeline: list[dict[str, Any]], when: float) -> int | None:
+    """
+    Get how long the weather at the given time is predicted to last.
+
+    Consecutive hours that map to the same Minecraft weather are treated as
+    one spell, so the duration runs until the first hour with different
+    weather, or until the end of the timeline.
+
+    Args:
+        timeline: The timeline to search.
+        when: The time to start from as a unix timestamp.
+
+    Returns:
+        The number of seconds until the weather changes, or None if the
+        timeline doesn't cover the given time.
+
+    Raises:
+        None
+    """
+    index: int = get_entry_index(timeline, when)
+    if index < 0:
+        return None
+
+    weather: str = timeline[index]['weather']
+    end: int = timeline[index]['dt'] + HOUR
+    for entry in timeline[index + 1:]:
+        if entry['weather'] != weather or entry['dt'] != end:
+            break
+        end += HOUR
+
+    return int(end - when)
+
+
+def get_precipitation_change(
+        minutely: list[dict[str, Any]],
+        when: float) -> tuple[int, bool] | None:
+    """
+    Find the minute the rain starts or stops in a minutely forecast.
+
+    Args:
+        minutely: The minutely forecast as returned by
+        openweathermap.get_minutely_weather(), ordered by time.
+        when: The time to start from as a unix timestamp.
+
+    Returns:
+        A tuple of the start of the first minute after the given time where
+        precipitation starts or stops, and whether it is precipitating from
+        then on. None if it doesn't change within the forecast, or the
+        forecast doesn't cover the given time.
+
+    Raises:
+        None
+    """
+    index: int = 0
+    while index < len(minutely) and minutely[index]['dt'] + MINUTE <= when:
+        index += 1
+
+    if index >= len(minutely) or minutely[index]['dt'] > when:
+        return None
+
+    wet: bool = minutely[index]['precipitation'] > 0
+    for minute in minutely[index + 1:]:
+        if (minute['precipitation'] > 0) != wet:
+            return (minute['dt'], not wet)
+
+    return None
+
+
+def get_poll_interval(
+        timeline: list[dict[str, Any]],
+        when: float,
+        min_interval: float,
+        max_interval: float) -> float:
+    """
+    Work out how long to wait before the next poll from the timeline.
+
+    While the forecast is settled, polls are spread out to the max interval.
+    The closer the probability of precipitation gets to a coin toss within
+    that window, the closer the interval is pulled in toward the min
+    interval. When the weather is predicted to change before then, the
+    next poll lands right after the change.
+
+    Args:
+        timeline: The timeline to plan from.
+        when: The time of this poll as a unix timestamp.
+        min_interval: The shortest number of seconds between polls.
+        max_interval: The longest number of seconds between polls.
+
+    Returns:
+        The number of seconds to wait, between the min and max interval.
+        The min interval if the timeline doesn't cover the given time.
+
+    Raises:
+        None
+    """
+    index: int = get_entry_index(timeline, when)
+    if index < 0:
+        return float(min_interval)
+
+    uncertainty: float = 0
+    for entry in timeline[index:]:
+        if entry['dt'] >= when + max_interval:
+            break
+        pop: float = float(entry.get('pop') or 0)
+        uncertainty = max(uncertainty, 1 - abs(2 * pop - 1))
+
+    interval: float = (
+        max_interval - (max_interval - min_interval) * uncertainty)
+
+    duration: int | None = get_weather_duration(timeline, when)
+    if duration is not None and duration < interval:
+        interval = duration + TRANSITION_MARGIN
+
+    return float(min(max(interval, min_interval), max_interval))
+
+
+class ForecastCache():
+    """
+    ForecastCache() class file
+
+    ForecastCache() keeps the latest timeline of every location in a file
+    under data/, so the weather can be applied locally from a single API
+    call until the forecast goes stale.
+    """
+
+    def __init__(
+            self,
+            path: str | None = None,
+            max_age: int = DEFAULT_MAX_AGE) -> None:
+        self._path = path or datastore.get_data_path('forecast.json')
+        self._max_age = max_age
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the cache file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def max_age(self) -> int:
+        """
+        Getter for the max_age property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a fetched timeline is used for
+
+        Raises:
+            None
+        """
+        return self._max_age
+
+    def _key(self, lat: str, lon: str) -> str:
+        """
+        Build the cache key for the given latitude and longitude
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+
+        Returns:
+            The cache key in str format
+
+        Raises:
+            None
+        """
+        return f'{lat},{lon}'
+
+    def get_timeline(
+            self,
+            lat: str,
+            lon: str,
+            max_age: float | None = None) -> list[dict[str, Any]] | None:
+        """
+        Get the cached timeline for a location
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+            max_age: An optional max age in seconds to use instead of the
+            cache's own, e.g. to fall back to an older forecast
+
+        Returns:
+            The timeline, or None if there is no timeline for the location
+            or it is older than the max age
+
+        Raises:
+            None
+        """
+        entry = datastore.read_json(self.path).get(self._key(lat, lon))
+        if not isinstance(entry, dict):
+            return None
+
+        try:
+            if max_age is None:
+                max_age = self.max_age
+            if time.time() - float(entry['fetched_at']) > max_age:
+                return None
+            timeline: list[dict[str, Any]] = entry['timeline']
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        if not isinstance(timeline, list):
+            return None
+
+        return timeline
+
+    def set_timeline(
+            self, lat: str, lon: str, timeline: list[dict[str, Any]]) -> None:
+        """
+        Store the timeline for a location
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+            timeline: The timeline to store
+
+        Returns:
+            None
+
+        Raises:
+            OSError when the cache file cannot be written
+        """
+        with datastore.update_json(self.path) as data:
+            data[self._key(lat, lon)] = {
+                'fetched_at': time.time(),
+                'timeline': timeline
+            }
@@ -2,12 +2,16 @@
 """
 Set up the logging module for the application
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import socket
 import sys
 
-from datetime import datetime
+# The queue listener of every configured logger, by name
+_LISTENERS: dict[str, logging.handlers.QueueListener] = {}
 
 
 def get_hostname() -> str:
@@ -46,6 +50,12 @@ def configure_logger(name: str) -> None:
     """
     Configure the application's logger.
 
+    Records are put on a queue by the calling thread and written to the log
+    file and console by a background listener thread, so logging never
+    waits on disk I/O. The hostname and process ID are looked up once here,
+    and the timestamp is only formatted for records that are written out.
+    Calling this again for the same name does nothing.
+
     Args:
         name: The name of the logger to configure in str format. This name
         will be used throughout the entire application.
@@ -57,27 +67,59 @@ def configure_logger(name: str) -> None:
         None
     """
     logger: logging.Logger = logging.getLogger(name)
+    if any(isinstance(handler, logging.handlers.QueueHandler)
+           for handler in logger.handlers):
+        return
+
     logger.setLevel(logging.INFO)
 
     fh = logging.FileHandler(sys.path[0] + f'/logs/{name}.log', 'a+')
     formatter = logging.Formatter(
-        '%(event_date)s %(hostname)s %(program)s[%(pid)d] %(message)s')
+        '%(asctime)s %(hostname)s %(program)s[%(pid)d] %(message)s',
+        datefmt='%b %d %H:%M:%S',
+        defaults={
+            'hostname': get_hostname(),
+            'program': name,
+            'pid': get_pid()
+        })
     ch = logging.StreamHandler()
     ch.setLevel(logging.ERROR)
 
     fh.setFormatter(formatter)
     ch.setFormatter(formatter)
-    logger.addHandler(fh)
-    logger.addHandler(ch)
 
-    old_factory = logging.getLogRecordFactory()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, fh, ch, respect_handler_level=True)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener.start()
+    _LISTENERS[name] = listener
+    atexit.register(flush_logger, name, False)
+
 
-    def record_factory(*args, **kwargs):
-        record = old_factory(*args, **kwargs)
-        record.event_date = datetime.now().strftime('%b %d %H:%M:%S')
-        record.hostname = get_hostname()
-        record.program = name
-        record.pid = get_pid()
-        return record
+def flush_logger(name: str, restart: bool = True) -> None:
+    """
+    Wait for the records queued so far to be written out.
+
+    Stopping the listener makes it handle every record already on the
+    queue before it returns, so the time this takes is the time logging
+    spends on disk I/O.
+
+    Args:
+        name: The name of the logger to flush in str format.
+        restart: False to leave the listener stopped, e.g. at exit.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    listener: logging.handlers.QueueListener | None = _LISTENERS.get(name)
+    if listener is None or listener._thread is None:
+        return
 
-    logging.setLogRecordFactory(record_factory)
+    listener.stop()
+    if restart:
+        listener.start()
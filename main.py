@@ -5,14 +5,45 @@ Owencraft Weather - Control the weather on the Owencraft Minecraft Server
 Owencraft Weather - Get the weather forecast from the OpenWeatherMap API
 for the given zip code, translate the weather forecast into the available
 Minecraft Weather commands, and then set the weather on the target server.
+
+asyncio, the async clients and the fan-out pool are only imported on the
+paths that use them, so a single-server run (or `--version`) starts without
+loading them.
 """
+import functools
 import logging
+import math
 import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
 
+from deadline.deadline import Deadline, DeadlineExceededError
+from fleet import fleet
+from forecast import forecast
+from forecast.forecast import ForecastCache
 from logger import logger
-from mcrcon.mcrcon import Mcrcon
+from mapping import mapping
+from mapping.mapping import WeatherMapping
+from mcrcon.mcrcon import Mcrcon, build_weather_command
+from mcrcon.presencestate import EMPTY_POLL_INTERVAL, PresenceState
+from mcrcon.weatherstate import WeatherState
+from metrics import metrics
 from openweathermap import openweathermap
+from openweathermap.geocache import GeocodeCache
+from openweathermap.quota import QuotaBudget, QuotaExceededError
+from openweathermap.weathercache import WeatherCache
 from parseargs.parseargs import ParseArgs
+from scheduler.scheduler import Scheduler
+from singleflight.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from mcrcon.aiorcon import AsyncRconClient
+
+# Refreshes of stale weather that were still running when the run moved on
+_REFRESHES: list[threading.Thread] = []
 
 
 def main() -> None:
@@ -29,9 +60,88 @@ def main() -> None:
         None
     """
     parser: ParseArgs = begin()
+    if parser.daemon:
+        run_daemon(parser)
+        return
+
+    deadline: Deadline = Deadline(parser.deadline or None)
+    try:
+        with metrics.span('run'):
+            run_once(parser)
+    finally:
+        # The process is about to exit, which would kill a refresh that is
+        # still running, so give it what is left of the deadline to finish
+        wait_for_refreshes(deadline.remaining)
+        export_metrics(parser)
+
+
+def run_once(parser: ParseArgs) -> None:
+    """
+    Update the weather once, on one server or on the whole fleet.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    if parser.config and parser.use_async:
+        import asyncio
+
+        servers: list[dict[str, Any]] = get_fleet_servers(parser.config)
+        run_async_fleet_tasks(parser, servers, asyncio.new_event_loop(), {})
+        return
+
+    if parser.config:
+        servers = get_fleet_servers(parser.config)
+        mcrcons: dict[str, Mcrcon] = {}
+        try:
+            fleet_tasks(parser, servers, mcrcons)
+        finally:
+            for mcrcon in mcrcons.values():
+                mcrcon.close()
+        return
+
     tasks(parser)
 
 
+def export_metrics(parser: ParseArgs) -> None:
+    """
+    Write the run metrics to the files given on the command line, if any.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    if not parser.metrics_file and not parser.metrics_json:
+        return
+
+    # Records are written out by a background thread, so wait for the
+    # run's records to time the logging stage
+    with metrics.span('log'):
+        logger.flush_logger('owencraftWeather')
+
+    try:
+        if parser.metrics_file:
+            metrics.write_prometheus(parser.metrics_file)
+        if parser.metrics_json:
+            metrics.write_json(parser.metrics_json)
+    except OSError as err:
+        owlogger.error('[WARN] Unable to write metrics :: %s' % err)
+
+
 def begin() -> ParseArgs:
     """
     Setup tasks to make the progam work.
@@ -50,130 +160,1421 @@ def begin() -> ParseArgs:
     parser: ParseArgs = ParseArgs(args)
     logger.configure_logger('owencraftWeather')
 
+    if parser.transport == 'stdlib':
+        from openweathermap.transport import HttpClientSession
+
+        openweathermap.set_session(HttpClientSession())
+
+    if parser.daily_quota:
+        openweathermap.set_quota(QuotaBudget(parser.daily_quota))
+
+    if parser.coalesce_window:
+        openweathermap.set_single_flight(
+            SingleFlight(parser.coalesce_window))
+
+    if parser.weather_rules:
+        try:
+            mapping.set_mapping(WeatherMapping.from_file(parser.weather_rules))
+        except ValueError as err:
+            logging.getLogger('owencraftWeather').error('[ERR] %s' % err)
+            sys.exit(1)
+
     return parser
 
 
-def tasks(parser: ParseArgs) -> None:
+def run_daemon(parser: ParseArgs) -> None:
+    """
+    Keep running and update the weather every interval until stopped.
+
+    The same RCON connections and HTTP session are reused for every update,
+    and SIGTERM/SIGINT let the update in progress finish before exiting.
+    A failed update is logged and retried on the next interval instead of
+    stopping the daemon. With --max-interval, each update plans the next
+    one from the forecast. When the daily API budget runs low, the interval
+    is stretched so the rest of it lasts until the budget resets. With
+    --skip-empty, an empty server is checked for players every minute
+    instead, so the weather is updated as soon as one joins.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    owlogger.info('Starting daemon with a %ss interval...' % parser.interval)
+
+    scheduler: Scheduler = Scheduler(parser.interval)
+    scheduler.handle_signals()
+
+    servers: list[dict[str, Any]] = []
+    mcrcons: dict[str, Mcrcon] = {}
+    clients: dict[str, AsyncRconClient] = {}
+    loop: asyncio.AbstractEventLoop | None = None
+    if parser.config:
+        servers = get_fleet_servers(parser.config)
+    else:
+        mcrcons[''] = Mcrcon(parser.rcon_backend)
+
+    if parser.use_async:
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+
+    def cycle() -> float | None:
+        quota: QuotaBudget | None = openweathermap.get_quota()
+        # Other processes spend the same budget, so only count our calls
+        spent: float = metrics.get_counter('api_quota_calls_total')
+        delay: float | None = None
+        try:
+            with metrics.span('run'):
+                if loop is not None:
+                    run_async_fleet_tasks(
+                        parser, servers, loop, clients, False)
+                elif parser.config:
+                    fleet_tasks(parser, servers, mcrcons)
+                else:
+                    delay = tasks(parser, mcrcons[''], scheduler)
+        except SystemExit:
+            metrics.increment('run_failures_total')
+            owlogger.error('[ERR] Weather update failed, retrying later...')
+        finally:
+            export_metrics(parser)
+
+        # Keep an eye on an empty server, so the weather is updated as
+        # soon as a player joins rather than on the next interval
+        mcrcon: Mcrcon | None = mcrcons.get('')
+        if (parser.skip_empty and mcrcon is not None
+                and mcrcon.presence is not None
+                and mcrcon.presence.count == 0):
+            return float(min(parser.interval, EMPTY_POLL_INTERVAL))
+
+        if quota is None:
+            return delay
+
+        planned: float = parser.interval if delay is None else delay
+        interval: float = quota.stretch_interval(
+            planned, metrics.get_counter('api_quota_calls_total') - spent)
+        if interval > planned:
+            owlogger.info(
+                '%d API calls left today, next update in %ds...' %
+                (quota.remaining(), interval))
+            return interval
+
+        return delay
+
+    try:
+        scheduler.run(cycle)
+    finally:
+        for mcrcon in mcrcons.values():
+            mcrcon.close()
+        if loop is not None:
+            loop.run_until_complete(close_async_clients(clients))
+            loop.close()
+
+    owlogger.info('Daemon stopped!')
+
+
+def tasks(
+        parser: ParseArgs,
+        mcrcon: Mcrcon | None = None,
+        scheduler: Scheduler | None = None) -> float | None:
     """
     All tasks necessary to get the weather forecast and set the weater.
 
     Args:
         parser: An instance of the ParseArgs class holding all of the
         arguments passed to the running instance of this program
+        mcrcon: An optional instance of the Mcrcon class to reuse. When
+        it is not given, a new one is created and closed again afterwards.
+        scheduler: The daemon's Scheduler, to schedule weather changes
+        predicted by the minutely precipitation on.
 
     Returns:
+        The same as update_weather().
+
+    Raises:
         None
+    """
+    owned: bool = mcrcon is None
+    if mcrcon is None:
+        mcrcon = Mcrcon(parser.rcon_backend)
+
+    try:
+        return update_weather(parser, mcrcon, scheduler)
+    finally:
+        if owned:
+            mcrcon.close()
+
+
+def update_weather(
+        parser: ParseArgs,
+        mcrcon: Mcrcon,
+        scheduler: Scheduler | None = None) -> float | None:
+    """
+    Get the weather forecast and set the weather on the target server.
+
+    With --skip-empty, the players online are checked first and nothing
+    else is done while the server is empty, except for the occasional
+    update every --empty-interval minutes. When the first player joins,
+    the weather is sent even if it hasn't changed.
+
+    With --minutely, a change of weather predicted within the next hour is
+    scheduled on the scheduler for the minute it happens.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        mcrcon: An instance of the Mcrcon class for the target server.
+        scheduler: The daemon's Scheduler, if there is one.
+
+    Returns:
+        With --max-interval, the number of seconds until the next update
+        planned from the forecast. Otherwise None for the regular interval.
 
     Raises:
         None
     """
     owlogger = logging.getLogger('owencraftWeather')
     owlogger.info('Starting script...')
+    deadline: Deadline = Deadline(parser.deadline or None)
+
+    # A change scheduled by the last update was predicted from an older
+    # forecast, so drop it whichever way this update goes. It is scheduled
+    # again below if the new forecast still predicts it.
+    if scheduler is not None:
+        scheduler.cancel('minutely')
+
+    joined: bool = False
+    if parser.skip_empty:
+        presence_state: PresenceState = PresenceState(
+            empty_interval=parser.empty_interval * 60)
+        update, joined = check_presence(mcrcon, presence_state)
+        if not update:
+            return None
 
     owlogger.info('Getting latitude and longitude from zipcode...')
-    lat, lon = get_lat_and_lon_from_zipcode(
-        parser.zipcode, parser.country_code)
+    geocache: GeocodeCache = GeocodeCache(ttl=parser.geocode_ttl * 86400)
+    try:
+        with metrics.span('geocode'):
+            lat, lon = deadline.call(
+                'geocode', get_lat_and_lon_from_zipcode, parser.zipcode,
+                parser.country_code, geocache,
+                deadline.timeout('geocode', openweathermap.DEFAULT_TIMEOUT))
+    except DeadlineExceededError as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
 
     if not lat or not lon:
         owlogger.error('[ERR] Unable to retrieve latitude and longitude!')
         sys.exit(1)
 
-    owlogger.info('Getting current weather...')
-    weather_id = get_current_weather(lat, lon)
-    current_weather = map_weather_id_to_minecraft_weather(weather_id)
+    change: tuple[int, str] | None = None
+    try:
+        with metrics.span('weather'):
+            timeout: float = deadline.timeout(
+                'weather', openweathermap.DEFAULT_TIMEOUT)
+            if parser.minutely:
+                current_weather, duration, change = deadline.call(
+                    'weather', get_minutely_weather, lat, lon, timeout)
+            else:
+                current_weather, duration = deadline.call(
+                    'weather', get_weather, parser, lat, lon, timeout)
+    except QuotaExceededError as err:
+        owlogger.error('[WARN] %s Keeping the current weather...' % err)
+        return None
+    except DeadlineExceededError as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
 
     owlogger.info('Setting current weather...')
-    mcrcon: Mcrcon = Mcrcon()
+    # Whatever happened to the weather while the server was empty, the
+    # player who just joined should get ours
+    resync_interval: int = 0 if joined else parser.resync_interval * 60
     try:
-        mcrcon.set_weather(current_weather)
-        owlogger.info('Weather set to `%s`!' % current_weather)
-    except ValueError as err:
-        owlogger.error(err)
+        with metrics.span('rcon'):
+            # Connecting, logging in and reading the reply can each wait
+            # for the socket timeout, so the stage as a whole is bounded too
+            applied: bool = deadline.call(
+                'rcon', set_weather, mcrcon, current_weather,
+                resync_interval, duration,
+                deadline.timeout('rcon', mcrcon.timeout))
+    except DeadlineExceededError as err:
+        # The command may still be running in the background, so don't let
+        # the next update share its connection
+        mcrcon.close()
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
+
+    if not applied:
         sys.exit(1)
 
+    if scheduler is not None and change is not None:
+        schedule_weather_change(parser, mcrcon, scheduler, *change)
+
     owlogger.info('Script finished!')
+    if parser.max_interval:
+        return get_poll_interval(parser, lat, lon)
 
+    return None
 
-def get_lat_and_lon_from_zipcode(
-        zipcode: int, country_code: str) -> tuple[str, str]:
+
+def schedule_weather_change(
+        parser: ParseArgs,
+        mcrcon: Mcrcon,
+        scheduler: Scheduler,
+        when: int,
+        weather: str) -> None:
     """
-    Retrieve the latitude and longitude from the given zipcode and
-    country code.
+    Schedule the weather to be set at the minute it is predicted to change.
+
+    A change scheduled by an earlier update is replaced, since the newer
+    minutely forecast knows better.
 
     Args:
-        zipcode: An integer representing the location you want to check
-        the weather in.
-        country_code: A two letter string representing the country the
-        zipcode belongs to.
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        mcrcon: An instance of the Mcrcon class for the target server.
+        scheduler: The daemon's Scheduler.
+        when: The time of the change as a unix timestamp.
+        weather: A string of either clear/rain/thunder.
 
     Returns:
-        A tuple representing the Latitude and Longitude matching the
-        zipcode and country code. The values are converted from float to str.
+        None
 
     Raises:
         None
     """
     owlogger = logging.getLogger('owencraftWeather')
 
-    try:
-        lat, lon = openweathermap.get_lat_and_lon(zipcode, country_code)
-        return (lat, lon)
-    except (ValueError, KeyError) as err:
-        owlogger.error('[ERR] %s' % err)
-        sys.exit(1)
+    delay: float = when - time.time()
+    owlogger.info('Weather changes to `%s` in %ds, scheduling it...'
+                  % (weather, delay))
 
+    def apply() -> None:
+        # This runs in between the daemon's cycles, so a failure must not
+        # take the daemon down with it
+        owlogger.info('Applying the scheduled weather change...')
+        applied: bool = False
+        try:
+            with metrics.span('rcon'):
+                applied = set_weather(
+                    mcrcon, weather, parser.resync_interval * 60)
+        except SystemExit:
+            pass
+        except Exception as err:
+            owlogger.error('[ERR] %s' % err)
 
-def get_current_weather(lat: str, lon: str) -> int:
+        if not applied:
+            metrics.increment('run_failures_total')
+            owlogger.error('[ERR] Scheduled weather change failed, '
+                           'leaving it to the next update...')
+        export_metrics(parser)
+
+    scheduler.call_later('minutely', delay, apply)
+
+
+def get_poll_interval(parser: ParseArgs, lat: str, lon: str) -> float | None:
     """
-    Get the current weather for the given latitude and longitude.
+    Plan the next update from the cached forecast for the location.
 
     Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
         lat: The latitude in str format.
         lon: The longitude in str format.
 
     Returns:
-        An ID representing the current weather.
+        The number of seconds until the next update, or None if there is no
+        cached forecast to plan from.
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    forecast_cache: ForecastCache = ForecastCache(
+        max_age=parser.forecast_max_age * 3600)
+    timeline: list[dict[str, Any]] | None = forecast_cache.get_timeline(
+        lat, lon, math.inf)
+    if not timeline:
+        return None
+
+    interval: float = forecast.get_poll_interval(
+        timeline, time.time(), parser.interval, parser.max_interval)
+    owlogger.info('Next update in %ds...' % interval)
+    return interval
+
+
+def check_presence(
+        mcrcon: Mcrcon, presence_state: PresenceState) -> tuple[bool, bool]:
+    """
+    Check whether the weather should be updated given the players online.
+
+    Args:
+        mcrcon: An instance of the Mcrcon class for the target server.
+        presence_state: The PresenceState to check and fill.
+
+    Returns:
+        A tuple of whether to update the weather, and whether a player has
+        just joined the empty server.
 
     Raises:
         None
     """
     owlogger = logging.getLogger('owencraftWeather')
 
+    owlogger.info('Checking for players online...')
+    with metrics.span('presence'):
+        online: int = int(mcrcon.get_count_of_players_online())
+
     try:
-        return openweathermap.get_current_weather(lat, lon)
-    except (ValueError, KeyError) as err:
-        owlogger.error('[ERR] %s' % err)
+        joined: bool = presence_state.record(mcrcon.server, online)
+    except OSError as err:
+        owlogger.error('[WARN] Unable to record players online :: %s' % err)
+        return (True, False)
+
+    if joined:
+        owlogger.info('A player joined, updating the weather now...')
+        return (True, True)
+
+    if online > 0:
+        return (True, False)
+
+    if not presence_state.needs_update(mcrcon.server):
+        owlogger.info('Nobody is online, skipping the update...')
+        metrics.increment('empty_skips_total')
+        return (False, False)
+
+    owlogger.info('Nobody is online, updating the weather anyway...')
+    try:
+        presence_state.set_updated(mcrcon.server)
+    except OSError as err:
+        owlogger.error('[WARN] Unable to record players online :: %s' % err)
+
+    return (True, False)
+
+
+def fleet_tasks(
+        parser: ParseArgs,
+        servers: list[dict[str, Any]],
+        mcrcons: dict[str, Mcrcon]) -> None:
+    """
+    All tasks necessary to set the weather on every server in the fleet.
+
+    Every unique zipcode is geocoded once, and the weather for every unique
+    latitude and longitude is fetched once and then set on all of the
+    servers that share it. Servers are updated in parallel by a pool of
+    workers, each with its own deadline, and a location or server that
+    fails is logged and skipped so the rest of the fleet is still updated.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        servers: The servers as returned by fleet.load_config()
+        mcrcons: The instances of the Mcrcon class to reuse, by server name.
+        Missing ones are created and added.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    owlogger.info('Starting script for %d servers...' % len(servers))
+
+    failed: list[str] = []
+    geocache: GeocodeCache = GeocodeCache(ttl=parser.geocode_ttl * 86400)
+    locations: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for (zipcode, country_code), group in fleet.group_by_zipcode(
+            servers).items():
+        try:
+            with metrics.span('geocode'):
+                lat, lon = get_lat_and_lon_from_zipcode(
+                    zipcode, country_code, geocache)
+        except SystemExit:
+            lat, lon = ('', '')
+
+        if not lat or not lon:
+            owlogger.error(
+                '[ERR] Unable to retrieve latitude and longitude for %s!' %
+                zipcode)
+            failed.extend(server['name'] for server in group)
+            continue
+
+        locations.setdefault((lat, lon), []).extend(group)
+
+    owlogger.info('Getting weather for %d locations...' % len(locations))
+    jobs: dict[str, Callable[[], None]] = {}
+    for (lat, lon), group in locations.items():
+        try:
+            with metrics.span('weather'):
+                current_weather, duration = get_weather(parser, lat, lon)
+        except QuotaExceededError as err:
+            owlogger.error(
+                '[WARN] %s Keeping the current weather on: %s' %
+                (err, ', '.join(server['name'] for server in group)))
+            continue
+        except SystemExit:
+            failed.extend(server['name'] for server in group)
+            continue
+
+        for server in group:
+            mcrcon: Mcrcon | None = mcrcons.get(server['name'])
+            if mcrcon is None:
+                # Connecting and logging in, then sending the command and
+                # reading the reply, can each wait for the whole socket
+                # timeout, so give each half of the server's deadline
+                mcrcon = Mcrcon(
+                    parser.rcon_backend,
+                    server['host'],
+                    server['password'],
+                    server['port'],
+                    parser.server_deadline / 2)
+                mcrcons[server['name']] = mcrcon
+
+            jobs[server['name']] = functools.partial(
+                set_fleet_weather,
+                mcrcon,
+                current_weather,
+                parser.resync_interval * 60,
+                duration)
+
+    owlogger.info('Setting weather on %d servers...' % len(jobs))
+    from mcrcon.fanout import FanOut
+
+    fan_out: FanOut = FanOut(parser.workers, parser.server_deadline)
+    with metrics.span('rcon'):
+        report: dict[str, list[dict[str, Any]]] = fan_out.run(jobs)
+    for result in report['succeeded']:
+        owlogger.info('Weather set on `%s` in %.3fs' %
+                      (result['server'], result['latency']))
+    for result in report['failed']:
+        owlogger.error('[ERR] Unable to set the weather on `%s` after '
+                       '%.3fs :: %s' %
+                       (result['server'], result['latency'], result['error']))
+        failed.append(result['server'])
+        # The job may still be running in the background, so don't let the
+        # next run share its connection, and close it once the job is done
+        mcrcon = mcrcons.pop(result['server'], None)
+        if mcrcon is not None:
+            result['future'].add_done_callback(
+                functools.partial(close_mcrcon, mcrcon))
+
+    if failed:
+        owlogger.error(
+            '[ERR] Unable to set the weather on: %s' % ', '.join(failed))
         sys.exit(1)
 
+    owlogger.info('Script finished!')
+
 
-def map_weather_id_to_minecraft_weather(weather_id: int) -> str:
+def close_mcrcon(mcrcon: Mcrcon, *args: Any) -> None:
     """
-    Map the Current Weather ID from OpenWeatherMap to Minecraft Weater.
+    Close the connection of a server in the fleet, for use as a callback.
 
-    https://openweathermap.org/weather-conditions#Weather-Condition-Codes-2
+    Args:
+        mcrcon: The instance of the Mcrcon class to close.
+        args: Ignored, e.g. the future of the job that was using it.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    mcrcon.close()
+
+
+def set_fleet_weather(
+        mcrcon: Mcrcon,
+        weather: str,
+        resync_interval: int,
+        duration: int | None = None) -> None:
+    """
+    Set the weather on one server in the fleet, for use with FanOut().
 
     Args:
-        weather_id: An integer representing the current weather.
+        The same as set_weather().
 
     Returns:
-        A string of either clear/rain/thunder based on the given ID.
+        None
+
+    Raises:
+        ValueError when setting the weather fails
+    """
+    if not set_weather(mcrcon, weather, resync_interval, duration):
+        raise ValueError(f'Unable to set the weather on {mcrcon.server}!')
+
+
+def run_async_fleet_tasks(
+        parser: ParseArgs,
+        servers: list[dict[str, Any]],
+        loop: 'asyncio.AbstractEventLoop',
+        clients: 'dict[str, AsyncRconClient]',
+        close: bool = True) -> None:
+    """
+    Run async_fleet_tasks() to completion on the given event loop.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        servers: The servers as returned by fleet.load_config()
+        loop: The event loop to run on. Reusing the same loop lets the RCON
+        connections be reused between runs.
+        clients: The instances of the AsyncRconClient class to reuse, by
+        server name. Missing ones are created and added.
+        close: True to close the connections and the loop afterwards.
+
+    Returns:
+        None
 
     Raises:
         None
     """
-    if weather_id == -1:
-        return 'clear'
+    owlogger = logging.getLogger('owencraftWeather')
+
+    try:
+        failed: list[str] = loop.run_until_complete(
+            async_fleet_tasks(parser, servers, clients))
+    finally:
+        if close:
+            loop.run_until_complete(close_async_clients(clients))
+            loop.close()
+
+    if failed:
+        owlogger.error(
+            '[ERR] Unable to set the weather on: %s' % ', '.join(failed))
+        sys.exit(1)
+
+    owlogger.info('Script finished!')
+
+
+async def async_fleet_tasks(
+        parser: ParseArgs,
+        servers: list[dict[str, Any]],
+        clients: 'dict[str, AsyncRconClient]') -> list[str]:
+    """
+    All tasks necessary to set the weather on every server in the fleet,
+    run concurrently.
+
+    This does the same as fleet_tasks(), but every geocode lookup, every
+    weather fetch and every server update runs at the same time, bounded by
+    the configured concurrency and request timeout. A run takes about as
+    long as its slowest request instead of the sum of all of them.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        servers: The servers as returned by fleet.load_config()
+        clients: The instances of the AsyncRconClient class to reuse, by
+        server name. Missing ones are created and added.
+
+    Returns:
+        A list of the names of the servers the weather could not be set on.
+
+    Raises:
+        None
+    """
+    import asyncio
+
+    from mcrcon.aiorcon import AsyncRconClient
+    from openweathermap import aio
+
+    owlogger = logging.getLogger('owencraftWeather')
+    owlogger.info('Starting async script for %d servers...' % len(servers))
+
+    api_semaphore: asyncio.Semaphore = asyncio.Semaphore(parser.concurrency)
+    rcon_semaphore: asyncio.Semaphore = asyncio.Semaphore(parser.concurrency)
+    geocache: GeocodeCache = GeocodeCache(ttl=parser.geocode_ttl * 86400)
+    weather_state: WeatherState = WeatherState(
+        resync_interval=parser.resync_interval * 60)
+
+    async def geocode(zipcode: int, country_code: str) -> tuple[str, str]:
+        async with api_semaphore:
+            return await aio.call(
+                parser.request_timeout, run_fleet_helper,
+                f'Unable to geocode {zipcode},{country_code}!',
+                get_lat_and_lon_from_zipcode, zipcode, country_code,
+                geocache, parser.request_timeout)
+
+    async def get_weather_async(
+            lat: str, lon: str) -> tuple[str, int | None]:
+        # get_weather() waits for the refresh timeout when it has stale
+        # weather to fall back on and for the request timeout when it
+        # doesn't, and a refresh it gives up on still fills the cache
+        async with api_semaphore:
+            return await aio.call(
+                parser.refresh_timeout + parser.request_timeout,
+                run_fleet_helper,
+                f'Unable to get the weather for {lat},{lon}!',
+                get_weather, parser, lat, lon, parser.request_timeout)
+
+    async def apply(
+            server: dict[str, Any],
+            weather: str,
+            duration: int | None) -> None:
+        client: AsyncRconClient | None = clients.get(server['name'])
+        if client is None:
+            client = AsyncRconClient(
+                server['host'],
+                server['password'],
+                server['port'],
+                parser.request_timeout)
+            clients[server['name']] = client
 
-    if weather_id >= 700:
-        return 'clear'
+        if not weather_state.needs_update(client.server, weather):
+            owlogger.info('Weather on `%s` is already `%s`, skipping...' %
+                          (server['name'], weather))
+            return
 
-    if weather_id >= 300:
-        return 'rain'
+        metrics.increment('rcon_commands_total', {'backend': 'async'})
+        async with rcon_semaphore:
+            await client.command(build_weather_command(weather, duration))
 
-    if weather_id >= 200:
-        return 'thunder'
+        owlogger.info(
+            'Weather on `%s` set to `%s`!' % (server['name'], weather))
+        try:
+            weather_state.set(client.server, weather, duration)
+        except OSError as err:
+            owlogger.error('[WARN] Unable to record weather :: %s' % err)
 
-    return 'clear'
+    failed: list[str] = []
+    groups: dict[tuple[int, str], list[dict[str, Any]]] = (
+        fleet.group_by_zipcode(servers))
+    with metrics.span('geocode'):
+        results: list[Any] = await asyncio.gather(
+            *(geocode(zipcode, country_code)
+              for zipcode, country_code in groups),
+            return_exceptions=True)
+
+    locations: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for (zipcode, _), group, result in zip(groups, groups.values(), results):
+        if isinstance(result, Exception) or not result[0] or not result[1]:
+            owlogger.error(
+                '[ERR] Unable to retrieve latitude and longitude for %s! %s' %
+                (zipcode, result if isinstance(result, Exception) else ''))
+            failed.extend(server['name'] for server in group)
+            continue
+
+        locations.setdefault(result, []).extend(group)
+
+    owlogger.info('Getting weather for %d locations...' % len(locations))
+    with metrics.span('weather'):
+        results = await asyncio.gather(
+            *(get_weather_async(lat, lon) for lat, lon in locations),
+            return_exceptions=True)
+
+    updates: list[dict[str, Any]] = []
+    coroutines: list[Any] = []
+    for group, result in zip(locations.values(), results):
+        if isinstance(result, QuotaExceededError):
+            owlogger.error(
+                '[WARN] %s Keeping the current weather on: %s' %
+                (result, ', '.join(server['name'] for server in group)))
+            continue
+
+        if isinstance(result, Exception):
+            owlogger.error('[ERR] %s' % result)
+            failed.extend(server['name'] for server in group)
+            continue
+
+        for server in group:
+            updates.append(server)
+            coroutines.append(apply(server, *result))
+
+    with metrics.span('rcon'):
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for server, result in zip(updates, results):
+        if isinstance(result, Exception):
+            metrics.increment('rcon_failures_total', {'backend': 'async'})
+            owlogger.error('[ERR] Unable to set the weather on `%s` :: %r' %
+                           (server['name'], result))
+            failed.append(server['name'])
+
+    return failed
+
+
+async def close_async_clients(
+        clients: 'dict[str, AsyncRconClient]') -> None:
+    """
+    Close every given async RCON connection.
+
+    Args:
+        clients: The instances of the AsyncRconClient class to close.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    import asyncio
+
+    await asyncio.gather(*(client.close() for client in clients.values()))
+
+
+def get_fleet_servers(path: str) -> list[dict[str, Any]]:
+    """
+    Load the servers from the given fleet config file.
+
+    Args:
+        path: The path of the fleet config file.
+
+    Returns:
+        The servers as returned by fleet.load_config()
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    try:
+        return fleet.load_config(path)
+    except ValueError as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
+
+
+def get_weather(
+        parser: ParseArgs,
+        lat: str,
+        lon: str,
+        timeout: float = openweathermap.DEFAULT_TIMEOUT
+) -> tuple[str, int | None]:
+    """
+    Get the Minecraft weather to set for the given latitude and longitude.
+
+    Args:
+        parser: An instance of the ParseArgs class holding all of the
+        arguments passed to the running instance of this program
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        timeout: The number of seconds to wait for each API request.
+
+    Returns:
+        A tuple of a string of either clear/rain/thunder, and the number of
+        seconds that weather is predicted to last for or None if unknown.
+
+    Raises:
+        QuotaExceededError when the daily API budget is spent and there is
+        no cached forecast to fall back to
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    if parser.forecast:
+        owlogger.info('Getting current weather from the forecast...')
+        forecast_cache: ForecastCache = ForecastCache(
+            max_age=parser.forecast_max_age * 3600)
+        return get_weather_from_forecast(
+            lat, lon, forecast_cache, timeout)
+
+    owlogger.info('Getting current weather...')
+    weather_cache: WeatherCache = WeatherCache(
+        ttl=parser.weather_ttl * 60,
+        stale_ttl=parser.weather_stale_ttl * 60)
+    weather_id: int = get_current_weather(
+        lat, lon, weather_cache, min(parser.refresh_timeout, timeout),
+        timeout)
+    return (map_weather_id_to_minecraft_weather(weather_id), None)
+
+
+def get_minutely_weather(
+        lat: str,
+        lon: str,
+        timeout: float = openweathermap.DEFAULT_TIMEOUT
+) -> tuple[str, int | None, tuple[int, str] | None]:
+    """
+    Get the Minecraft weather to set now, and when it is predicted to
+    change, from the current weather and the minutely precipitation.
+
+    When the rain is predicted to start, it becomes rain (or stays
+    thunder). When it is predicted to stop, it becomes clear.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        timeout: The number of seconds to wait for the API.
+
+    Returns:
+        A tuple of a string of either clear/rain/thunder, the number of
+        seconds until it changes or None if it isn't predicted to within
+        the hour, and a tuple of when it changes as a unix timestamp and
+        what to, or None.
+
+    Raises:
+        QuotaExceededError when the daily API budget is spent
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    owlogger.info('Getting current weather and minutely precipitation...')
+    try:
+        data: dict[str, Any] = openweathermap.get_minutely_weather(
+            lat, lon, timeout=timeout)
+    except QuotaExceededError:
+        raise
+    except (ValueError, KeyError) as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
+
+    if data['id'] == -1:
+        owlogger.error('[ERR] Unable to retrieve the current weather!')
+        sys.exit(1)
+
+    weather: str = map_weather_id_to_minecraft_weather(data['id'])
+    now: float = time.time()
+    precipitation: tuple[int, bool] | None = (
+        forecast.get_precipitation_change(data['minutely'], now))
+    if precipitation is None:
+        return (weather, None, None)
+
+    when, wet = precipitation
+    next_weather: str = 'clear'
+    if wet:
+        next_weather = 'rain' if weather == 'clear' else weather
+
+    if next_weather == weather:
+        return (weather, None, None)
+
+    return (weather, int(when - now), (when, next_weather))
+
+
+def set_weather(
+        mcrcon: Mcrcon,
+        weather: str,
+        resync_interval: int,
+        duration: int | None = None,
+        timeout: float | None = None) -> bool:
+    """
+    Set the weather on the target server unless it is already set.
+
+    The last weather applied to each server is recorded, and sending the
+    same weather again is skipped until the resync interval has passed or
+    the duration the server was told to hold it for is over.
+
+    Args:
+        mcrcon: An instance of the Mcrcon class for the target server.
+        weather: A string of either clear/rain/thunder.
+        resync_interval: The number of seconds to skip unchanged weather
+        for, or 0 to always send it.
+        duration: The optional number of seconds the server should hold
+        the weather for.
+        timeout: An optional number of seconds to use instead of the
+        Mcrcon instance's timeout.
+
+    Returns:
+        True if the weather is set or already was, False if setting it
+        failed.
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    weather_state: WeatherState = WeatherState(
+        resync_interval=resync_interval)
+    if not weather_state.needs_update(mcrcon.server, weather):
+        owlogger.info('Weather is already `%s`, skipping...' % weather)
+        return True
+
+    try:
+        mcrcon.set_weather(weather, duration, timeout)
+        owlogger.info('Weather set to `%s`!' % weather)
+    except ValueError as err:
+        owlogger.error(err)
+        return False
+
+    try:
+        weather_state.set(mcrcon.server, weather, duration)
+    except OSError as err:
+        owlogger.error('[WARN] Unable to record weather :: %s' % err)
+
+    return True
+
+
+def get_lat_and_lon_from_zipcode(
+        zipcode: int,
+        country_code: str,
+        geocache: GeocodeCache | None = None,
+        timeout: float = openweathermap.DEFAULT_TIMEOUT) -> tuple[str, str]:
+    """
+    Retrieve the latitude and longitude from the given zipcode and
+    country code.
+
+    The offline geocoding index is checked first, then the geocode cache
+    if one is given, and only a miss in both results in a call to the
+    Geocoding API. Only the API's answers are cached, since the index
+    already holds the rest.
+
+    Args:
+        zipcode: An integer representing the location you want to check
+        the weather in.
+        country_code: A two letter string representing the country the
+        zipcode belongs to.
+        geocache: An optional GeocodeCache to check and fill.
+        timeout: The number of seconds to wait for the Geocoding API.
+
+    Returns:
+        A tuple representing the Latitude and Longitude matching the
+        zipcode and country code. The values are converted from float to str.
+
+    Raises:
+        None
+    """
+    from openweathermap import geoindex
+
+    owlogger = logging.getLogger('owencraftWeather')
+
+    local: tuple[str, str] | None = geoindex.lookup(zipcode, country_code)
+    if local:
+        metrics.increment('cache_hits_total', {'cache': 'geoindex'})
+        owlogger.info('Using the offline geocoding index...')
+        return local
+
+    if geocache:
+        cached: tuple[str, str] | None = geocache.get(zipcode, country_code)
+        if cached:
+            metrics.increment('cache_hits_total', {'cache': 'geocode'})
+            owlogger.info('Using cached latitude and longitude...')
+            return cached
+
+        metrics.increment('cache_misses_total', {'cache': 'geocode'})
+
+    try:
+        lat, lon = openweathermap.get_lat_and_lon(
+            zipcode, country_code, timeout=timeout)
+    except (ValueError, KeyError) as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
+
+    if geocache and lat and lon:
+        try:
+            geocache.set(zipcode, country_code, lat, lon)
+        except OSError as err:
+            owlogger.error('[WARN] Unable to cache location :: %s' % err)
+
+    return (lat, lon)
+
+
+def get_current_weather(
+        lat: str,
+        lon: str,
+        weather_cache: WeatherCache | None = None,
+        refresh_timeout: float = 3,
+        timeout: float = openweathermap.DEFAULT_TIMEOUT) -> int:
+    """
+    Get the current weather for the given latitude and longitude.
+
+    When a weather cache is given, a fresh cached weather is used as is.
+    A stale one is refreshed, but only waited on for the refresh timeout:
+    if the API is slower than that or fails, the stale weather is used
+    and the refresh finishes in the background. An API error is never
+    turned into a clear sky.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        weather_cache: An optional WeatherCache to check and fill.
+        refresh_timeout: The number of seconds to wait for the API when
+        there is stale weather to fall back on.
+        timeout: The number of seconds to wait for the API otherwise.
+
+    Returns:
+        An ID representing the current weather.
+
+    Raises:
+        QuotaExceededError when the daily API budget is spent and there is
+        no cached weather to fall back on
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    if weather_cache:
+        cached: int | None = weather_cache.get(lat, lon)
+        if cached is not None:
+            metrics.increment('cache_hits_total', {'cache': 'weather'})
+            owlogger.info('Using cached weather...')
+            return cached
+
+        metrics.increment('cache_misses_total', {'cache': 'weather'})
+        stale: int | None = weather_cache.get_stale(lat, lon)
+        if stale is not None:
+            refreshed: int | None = refresh_current_weather(
+                lat, lon, weather_cache, refresh_timeout, timeout)
+            if refreshed is not None:
+                return refreshed
+
+            owlogger.error('[WARN] Unable to refresh the weather in time, '
+                           'using the last known weather...')
+            metrics.increment('stale_served_total', {'cache': 'weather'})
+            return stale
+
+    try:
+        weather_id: int = openweathermap.get_current_weather(
+            lat, lon, timeout=timeout)
+    except QuotaExceededError:
+        raise
+    except (ValueError, KeyError) as err:
+        owlogger.error('[ERR] %s' % err)
+        sys.exit(1)
+
+    if weather_id == -1:
+        owlogger.error('[ERR] Unable to retrieve the current weather!')
+        sys.exit(1)
+
+    if weather_cache:
+        try:
+            weather_cache.set(lat, lon, weather_id)
+        except OSError as err:
+            owlogger.error('[WARN] Unable to cache weather :: %s' % err)
+
+    return weather_id
+
+
+def run_fleet_helper(
+        message: str, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run one of the blocking helpers for the async fleet, for use on a
+    worker thread.
+
+    Args:
+        message: The error message to raise if the helper exits.
+        func: The helper to run, like get_weather().
+        args: The arguments to pass to the helper.
+
+    Returns:
+        What the helper returns.
+
+    Raises:
+        ValueError with the given message when the helper exits
+        Any other exception raised by the helper
+    """
+    try:
+        return func(*args)
+    except SystemExit as err:
+        # The error is already logged, and exiting the worker thread would
+        # take the event loop down with it
+        raise ValueError(message) from err
+
+
+def refresh_current_weather(
+        lat: str,
+        lon: str,
+        weather_cache: WeatherCache,
+        timeout: float,
+        request_timeout: float = openweathermap.DEFAULT_TIMEOUT
+) -> int | None:
+    """
+    Fetch the current weather in the background and wait for it for at
+    most the given timeout.
+
+    A refresh that finishes after the timeout still fills the cache for
+    the next run. A daemon keeps running, so it does on its own. A single
+    run waits for it in wait_for_refreshes() before exiting.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        weather_cache: The WeatherCache to fill.
+        timeout: The number of seconds to wait for the refresh.
+        request_timeout: The number of seconds the refresh itself waits for
+        the API.
+
+    Returns:
+        The fresh weather ID, or None if the refresh failed or didn't finish
+        in time.
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    result: dict[str, int] = {}
+
+    def refresh() -> None:
+        try:
+            weather_id: int = openweathermap.get_current_weather(
+                lat, lon, timeout=request_timeout)
+        except (ValueError, KeyError) as err:
+            owlogger.error('[WARN] Unable to refresh the weather :: %s' % err)
+            return
+
+        if weather_id == -1:
+            return
+
+        try:
+            weather_cache.set(lat, lon, weather_id)
+        except OSError as err:
+            owlogger.error('[WARN] Unable to cache weather :: %s' % err)
+        result['id'] = weather_id
+
+    thread: threading.Thread = threading.Thread(
+        target=refresh, name='refresh', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        # A daemon never waits for them, so only keep the running ones
+        _REFRESHES[:] = [
+            running for running in _REFRESHES if running.is_alive()]
+        _REFRESHES.append(thread)
+
+    return result.get('id')
+
+
+def wait_for_refreshes(timeout: float | None) -> None:
+    """
+    Wait for the refreshes that didn't finish in time to fill the cache.
+
+    Args:
+        timeout: The number of seconds to wait for all of them together, or
+        None to wait for as long as they take. Each refresh also times out
+        on its own.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    if not any(thread.is_alive() for thread in _REFRESHES):
+        _REFRESHES.clear()
+        return
+
+    owlogger.info('Waiting for the weather refresh to finish...')
+    end: float | None = None if timeout is None else time.monotonic() + timeout
+    for thread in _REFRESHES:
+        thread.join(None if end is None else max(0, end - time.monotonic()))
+    _REFRESHES[:] = [thread for thread in _REFRESHES if thread.is_alive()]
+
+
+def get_weather_from_forecast(
+        lat: str,
+        lon: str,
+        forecast_cache: ForecastCache,
+        timeout: float = openweathermap.DEFAULT_TIMEOUT
+) -> tuple[str, int | None]:
+    """
+    Get the current Minecraft weather and how long it will last from the
+    hourly forecast.
+
+    The cached forecast is used while it is fresh and covers the current
+    hour. Otherwise a new hourly forecast is fetched, mapped to Minecraft
+    weather and cached for the next runs. When the API fails or the daily
+    budget is spent, an older cached forecast is used for as long as it
+    covers the current hour.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        forecast_cache: The ForecastCache to check and fill.
+        timeout: The number of seconds to wait for the One Call API.
+
+    Returns:
+        A tuple of a string of either clear/rain/thunder, and the number of
+        seconds that weather is predicted to last for or None if unknown.
+
+    Raises:
+        QuotaExceededError when the daily API budget is spent and there is
+        no cached forecast to fall back to
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+
+    cached: tuple[str, int | None] | None = get_cached_forecast_weather(
+        lat, lon, forecast_cache)
+    if cached:
+        return cached
+
+    try:
+        hourly: list[dict[str, Any]] = openweathermap.get_hourly_forecast(
+            lat, lon, timeout=timeout)
+    except QuotaExceededError:
+        stale: tuple[str, int | None] | None = get_stale_forecast_weather(
+            lat, lon, forecast_cache)
+        if stale:
+            return stale
+        raise
+    except (ValueError, KeyError) as err:
+        owlogger.error('[ERR] %s' % err)
+        hourly = []
+
+    fresh: tuple[str, int | None] | None = cache_forecast_weather(
+        lat, lon, forecast_cache, hourly)
+    if fresh:
+        return fresh
+
+    stale = get_stale_forecast_weather(lat, lon, forecast_cache)
+    if stale:
+        return stale
+
+    owlogger.error('[ERR] Unable to retrieve the forecast!')
+    sys.exit(1)
+
+
+def get_cached_forecast_weather(
+        lat: str,
+        lon: str,
+        forecast_cache: ForecastCache) -> tuple[str, int | None] | None:
+    """
+    Get the current Minecraft weather from the cached hourly forecast.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        forecast_cache: The ForecastCache to check.
+
+    Returns:
+        The same tuple as get_weather_from_forecast(), or None if there is
+        no fresh forecast covering the current hour.
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    now: float = time.time()
+
+    timeline: list[dict[str, Any]] | None = forecast_cache.get_timeline(
+        lat, lon)
+    weather: str | None = (
+        forecast.get_weather_at(timeline, now) if timeline else None)
+    if not timeline or not weather:
+        metrics.increment('cache_misses_total', {'cache': 'forecast'})
+        return None
+
+    metrics.increment('cache_hits_total', {'cache': 'forecast'})
+    owlogger.info('Using cached forecast...')
+    return (weather, forecast.get_weather_duration(timeline, now))
+
+
+def get_stale_forecast_weather(
+        lat: str,
+        lon: str,
+        forecast_cache: ForecastCache) -> tuple[str, int | None] | None:
+    """
+    Get the current Minecraft weather from a cached hourly forecast of any
+    age, for when a new one can't be fetched.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        forecast_cache: The ForecastCache to check.
+
+    Returns:
+        The same tuple as get_weather_from_forecast(), or None if no cached
+        forecast covers the current hour.
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    now: float = time.time()
+
+    timeline: list[dict[str, Any]] | None = forecast_cache.get_timeline(
+        lat, lon, math.inf)
+    weather: str | None = (
+        forecast.get_weather_at(timeline, now) if timeline else None)
+    if not timeline or not weather:
+        return None
+
+    owlogger.error('[WARN] Using an older forecast...')
+    return (weather, forecast.get_weather_duration(timeline, now))
+
+
+def cache_forecast_weather(
+        lat: str,
+        lon: str,
+        forecast_cache: ForecastCache,
+        hourly: list[dict[str, Any]]) -> tuple[str, int | None] | None:
+    """
+    Map and cache a freshly fetched hourly forecast, and get the current
+    Minecraft weather from it.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        forecast_cache: The ForecastCache to fill.
+        hourly: The hourly forecast as returned by
+        openweathermap.get_hourly_forecast().
+
+    Returns:
+        The same tuple as get_weather_from_forecast(), or None if the
+        forecast doesn't cover the current hour (e.g. it is empty because
+        the API returned an error).
+
+    Raises:
+        None
+    """
+    owlogger = logging.getLogger('owencraftWeather')
+    now: float = time.time()
+
+    timeline: list[dict[str, Any]] = build_timeline(hourly)
+    if timeline:
+        try:
+            forecast_cache.set_timeline(lat, lon, timeline)
+        except OSError as err:
+            owlogger.error('[WARN] Unable to cache forecast :: %s' % err)
+
+    weather: str | None = forecast.get_weather_at(timeline, now)
+    if not weather:
+        return None
+
+    return (weather, forecast.get_weather_duration(timeline, now))
+
+
+def build_timeline(hourly: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Map every hour of an hourly forecast to Minecraft weather.
+
+    Args:
+        hourly: The hourly forecast as returned by
+        openweathermap.get_hourly_forecast().
+
+    Returns:
+        A timeline of dictionaries, one per hour, like this:
+        {
+            'dt': 1684926000,
+            'weather': 'rain',
+            'pop': 0.2
+        }
+
+    Raises:
+        None
+    """
+    weathers: list[str] = mapping.get_mapping().map_many(
+        hour['id'] for hour in hourly)
+    return [
+        {
+            'dt': hour['dt'],
+            'weather': weather,
+            'pop': hour['pop']
+        }
+        for hour, weather in zip(hourly, weathers)
+    ]
+
+
+def map_weather_id_to_minecraft_weather(weather_id: int) -> str:
+    """
+    Map the Current Weather ID from OpenWeatherMap to Minecraft Weater.
+
+    The mapping comes from the shared WeatherMapping, which uses the rules
+    file given with --weather-rules if there is one.
+
+    https://openweathermap.org/weather-conditions#Weather-Condition-Codes-2
+
+    Args:
+        weather_id: An integer representing the current weather.
+
+    Returns:
+        A string of either clear/rain/thunder based on the given ID.
+
+    Raises:
+        None
+    """
+    return mapping.get_mapping().map(weather_id)
 
 
 if __name__ == '__main__':
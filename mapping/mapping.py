@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+WeatherMapping() class file
+
+WeatherMapping() is a class that maps OpenWeatherMap weather condition codes
+to Minecraft weather through a precomputed lookup table covering every code
+from 0 to 999. The table is built from the default rules, optionally
+overridden by a JSON rules file like this:
+    {
+        "default": "clear",
+        "rules": [
+            {"codes": "502-504", "weather": "thunder"},
+            {"codes": "6xx", "weather": "rain"},
+            {"codes": [771, 781], "weather": "thunder"}
+        ]
+    }
+
+Rules are applied in order on top of the default rules, so later rules win.
+The default rules cover every code from 200 to 999, so `default` is only
+used for the codes below 200 that no rule matches and for codes outside of
+0-999. -1, which means the API could not be reached, is always clear.
+
+https://openweathermap.org/weather-conditions#Weather-Condition-Codes-2
+"""
+import json
+import operator
+from typing import Any, Iterable
+
+TABLE_SIZE: int = 1000
+WEATHER_STATES: list[str] = ['clear', 'rain', 'thunder']
+DEFAULT_RULES: list[dict[str, Any]] = [
+    {'codes': '200-299', 'weather': 'thunder'},
+    {'codes': '300-699', 'weather': 'rain'},
+    {'codes': '700-999', 'weather': 'clear'}
+]
+# The weather ID the API wrapper returns when the API could not be reached
+ERROR_ID: int = -1
+ERROR_WEATHER: str = 'clear'
+
+
+def parse_codes(codes: Any) -> range | list[int]:
+    """
+    Parse the codes of a single rule.
+
+    Codes can be a single code (500), a range ("502-504"), a whole group
+    ("6xx"), or a list of any of those.
+
+    Args:
+        codes: The codes as given in the rule.
+
+    Returns:
+        The codes the rule applies to.
+
+    Raises:
+        ValueError if the codes are invalid or outside of 0-999.
+    """
+    if isinstance(codes, list):
+        parsed: list[int] = []
+        for code in codes:
+            parsed.extend(parse_codes(code))
+        return parsed
+
+    text: str = str(codes).strip().lower()
+    try:
+        if text.endswith('xx') and len(text) == 3:
+            start: int = int(text[0]) * 100
+            end: int = start + 99
+        elif '-' in text[1:]:
+            first, last = text.split('-', 1)
+            start, end = int(first), int(last)
+        else:
+            start = end = int(text)
+    except ValueError as err:
+        raise ValueError(f'Invalid weather codes `{codes}`!') from err
+
+    if not 0 <= start <= end < TABLE_SIZE:
+        raise ValueError(f'Invalid weather codes `{codes}`!')
+
+    return range(start, end + 1)
+
+
+class WeatherMapping():
+    """
+    WeatherMapping() class file
+
+    WeatherMapping() is a class that maps OpenWeatherMap weather condition
+    codes to Minecraft weather through a precomputed lookup table covering
+    every code from 0 to 999.
+    """
+
+    def __init__(
+            self,
+            rules: list[dict[str, Any]] | None = None,
+            default: str = 'clear') -> None:
+        if default not in WEATHER_STATES:
+            raise ValueError(f'{default} is not a valid weather state!')
+
+        self._default = default
+        self._table: list[str] = [default] * TABLE_SIZE
+        for rule in DEFAULT_RULES + (rules or []):
+            self._apply_rule(rule)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'WeatherMapping':
+        """
+        Create a WeatherMapping from a JSON rules file
+
+        Args:
+            path: The path of the rules file
+
+        Returns:
+            An instance of the WeatherMapping class
+
+        Raises:
+            ValueError if the file cannot be read or has invalid rules
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                config: Any = json.load(file)
+        except OSError as err:
+            raise ValueError(f'Unable to read {path} :: {err}') from err
+        except json.JSONDecodeError as err:
+            raise ValueError(f'Invalid JSON in {path} :: {err}') from err
+
+        if not isinstance(config, dict) or not isinstance(
+                config.get('rules', []), list):
+            raise ValueError(f'{path} has invalid rules!')
+
+        return cls(config.get('rules'), config.get('default', 'clear'))
+
+    @property
+    def default(self) -> str:
+        """
+        Getter for the default property
+
+        Args:
+            None
+
+        Returns:
+            The weather used for codes no rule matches and codes outside of
+            the table
+
+        Raises:
+            None
+        """
+        return self._default
+
+    def _apply_rule(self, rule: Any) -> None:
+        """
+        Write a single rule into the lookup table
+
+        Args:
+            rule: A dictionary with `codes` and `weather` keys
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if the rule is invalid
+        """
+        if not isinstance(rule, dict) or 'codes' not in rule:
+            raise ValueError(f'Invalid weather rule `{rule}`!')
+
+        weather: Any = rule.get('weather')
+        if weather not in WEATHER_STATES:
+            raise ValueError(f'{weather} is not a valid weather state!')
+
+        for code in parse_codes(rule['codes']):
+            self._table[code] = weather
+
+    def map(self, weather_id: int) -> str:
+        """
+        Map a single weather condition code to Minecraft weather
+
+        Args:
+            weather_id: The OpenWeatherMap weather condition code
+
+        Returns:
+            A string of either clear/rain/thunder
+
+        Raises:
+            None
+        """
+        if 0 <= weather_id < TABLE_SIZE:
+            return self._table[weather_id]
+
+        if weather_id == ERROR_ID:
+            return ERROR_WEATHER
+
+        return self.default
+
+    def map_many(self, weather_ids: Iterable[int]) -> list[str]:
+        """
+        Map many weather condition codes to Minecraft weather in one call
+
+        This is meant for whole hourly or minutely forecasts. When every
+        code is inside the table, they are all looked up in a single pass.
+
+        Args:
+            weather_ids: The OpenWeatherMap weather condition codes
+
+        Returns:
+            A list of either clear/rain/thunder, in the same order
+
+        Raises:
+            None
+        """
+        ids: list[int] = list(weather_ids)
+        if not ids:
+            return []
+
+        if len(ids) > 1 and 0 <= min(ids) and max(ids) < TABLE_SIZE:
+            return list(operator.itemgetter(*ids)(self._table))
+
+        return [self.map(weather_id) for weather_id in ids]
+
+
+_MAPPING: WeatherMapping | None = None
+
+
+def get_mapping() -> WeatherMapping:
+    """
+    Get the application's shared WeatherMapping, creating it on first use.
+
+    Args:
+        None
+
+    Returns:
+        The shared instance of the WeatherMapping class.
+
+    Raises:
+        None
+    """
+    global _MAPPING
+    if _MAPPING is None:
+        _MAPPING = WeatherMapping()
+    return _MAPPING
+
+
+def set_mapping(weather_mapping: WeatherMapping | None) -> None:
+    """
+    Replace the application's shared WeatherMapping.
+
+    Args:
+        weather_mapping: The WeatherMapping to use everywhere, or None to
+        go back to the default rules.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _MAPPING
+    _MAPPING = weather_mapping
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+AsyncRconClient() class file
+
+AsyncRconClient() is the asyncio version of RconClient(). It speaks the same
+Source RCON protocol over a single authenticated connection, so many
+servers can be updated concurrently from one event loop.
+"""
+import asyncio
+import select
+import struct
+
+from mcrcon.rcon import (DEFAULT_PORT, SERVERDATA_AUTH,
+                         SERVERDATA_AUTH_RESPONSE, SERVERDATA_EXECCOMMAND,
+                         SERVERDATA_RESPONSE_VALUE, StaleConnectionError,
+                         decode_packet, encode_packet)
+from metrics import metrics
+
+
+class AsyncRconClient():
+    """
+    AsyncRconClient() class file
+
+    AsyncRconClient() is the asyncio version of RconClient(). It speaks the
+    same Source RCON protocol over a single authenticated connection.
+    """
+
+    def __init__(
+            self,
+            hostname: str,
+            password: str,
+            port: int = DEFAULT_PORT,
+            timeout: float = 10) -> None:
+        self._hostname = hostname
+        self._password = password
+        self._port = port
+        self._timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+        self._request_id = 0
+
+    @property
+    def hostname(self) -> str:
+        """
+        Getter for the hostname property
+
+        Args:
+            None
+
+        Returns:
+            The hostname or IP Address of the target Minecraft server
+
+        Raises:
+            None
+        """
+        return self._hostname
+
+    @property
+    def port(self) -> int:
+        """
+        Getter for the port property
+
+        Args:
+            None
+
+        Returns:
+            The RCON port of the target Minecraft server
+
+        Raises:
+            None
+        """
+        return self._port
+
+    @property
+    def server(self) -> str:
+        """
+        Getter for the server property
+
+        Args:
+            None
+
+        Returns:
+            The target server in `hostname:port` format
+
+        Raises:
+            None
+        """
+        return f'{self.hostname}:{self.port}'
+
+    @property
+    def connected(self) -> bool:
+        """
+        Getter for the connected property
+
+        Args:
+            None
+
+        Returns:
+            True if an authenticated connection is currently open, False if
+            not
+
+        Raises:
+            None
+        """
+        return self._writer is not None
+
+    def _next_request_id(self) -> int:
+        """
+        Generate the next request ID for this connection
+
+        Args:
+            None
+
+        Returns:
+            A positive integer to use as the ID of the next packet
+
+        Raises:
+            None
+        """
+        self._request_id = (self._request_id % 0x7FFFFFFF) + 1
+        return self._request_id
+
+    async def _recv_packet(self) -> tuple[int, int, bytes]:
+        """
+        Read and decode a single RCON packet
+
+        Args:
+            None
+
+        Returns:
+            A tuple of the request ID, the packet type and the raw body
+
+        Raises:
+            OSError when the server closes the connection early
+        """
+        if self._reader is None:
+            raise OSError('RCON connection is not open!')
+
+        try:
+            (length,) = struct.unpack(
+                '<i', await self._reader.readexactly(4))
+            return decode_packet(await self._reader.readexactly(length))
+        except asyncio.IncompleteReadError as err:
+            raise OSError('RCON connection closed by the server!') from err
+
+    async def _connect(self) -> None:
+        """
+        Open the connection and authenticate, the lock must be held
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            ValueError when the server rejects the password
+            OSError when the server cannot be reached
+        """
+        if self._writer is not None:
+            return
+
+        self._reader, self._writer = await asyncio.open_connection(
+            self.hostname, self.port)
+        try:
+            request_id: int = self._next_request_id()
+            self._writer.write(
+                encode_packet(request_id, SERVERDATA_AUTH, self._password))
+            await self._writer.drain()
+
+            while True:
+                response_id, packet_type, _ = await self._recv_packet()
+                if packet_type == SERVERDATA_AUTH_RESPONSE:
+                    break
+
+            if response_id == -1:
+                raise ValueError('RCON authentication failed!')
+
+        except BaseException:
+            await self._close()
+            raise
+
+    async def _close(self) -> None:
+        """
+        Close the connection if it is open, the lock must be held
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        writer: asyncio.StreamWriter | None = self._writer
+        self._reader = None
+        self._writer = None
+        if writer is None:
+            return
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    def _is_stale(self) -> bool:
+        """
+        Check whether the open connection has gone away since it was used
+
+        This is the same check as RconClient._is_stale(). The event loop
+        may already have read the server closing the connection, or may
+        not have got to it yet, so both the stream and the socket are
+        checked.
+
+        Args:
+            None
+
+        Returns:
+            True if the open connection should be replaced, False if it is
+            fine or there is none
+
+        Raises:
+            None
+        """
+        if self._reader is None or self._writer is None:
+            return False
+
+        if self._reader.at_eof() or self._writer.is_closing():
+            return True
+
+        try:
+            readable, _, _ = select.select(
+                [self._writer.get_extra_info('socket')], [], [], 0)
+        except (OSError, TypeError, ValueError):
+            return True
+
+        return bool(readable)
+
+    async def _reuse(self) -> bool:
+        """
+        Make sure the connection is open, replacing it if it went stale,
+        the lock must be held
+
+        Args:
+            None
+
+        Returns:
+            True if an already open connection is reused, False if a new
+            one was opened
+
+        Raises:
+            ValueError when the server rejects the password
+            OSError when the server cannot be reached
+        """
+        if self._is_stale():
+            await self._close()
+
+        reused: bool = self.connected
+        await self._connect()
+        return reused
+
+    async def _send_first(self, reused: bool, packet: bytes) -> None:
+        """
+        Send the first packet of a request, the lock must be held
+
+        Args:
+            reused: True if the connection was open before this request
+            packet: The encoded packet to send
+
+        Returns:
+            None
+
+        Raises:
+            StaleConnectionError when sending fails on a reused connection,
+            since the server can't have run a packet it never got whole
+            OSError when sending fails otherwise
+        """
+        if self._writer is None:
+            raise OSError('RCON connection is not open!')
+
+        try:
+            self._writer.write(packet)
+            await self._writer.drain()
+        except OSError as err:
+            if reused:
+                raise StaleConnectionError(str(err)) from err
+            raise
+
+    async def connect(self) -> None:
+        """
+        Open the connection and authenticate against the server
+
+        Calling this on an already connected client does nothing.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            ValueError when the server rejects the password
+            OSError when the server cannot be reached
+            asyncio.TimeoutError when the server takes too long to answer
+        """
+        async with self._lock:
+            await asyncio.wait_for(self._connect(), self._timeout)
+
+    async def close(self) -> None:
+        """
+        Close the connection if it is open
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        async with self._lock:
+            await self._close()
+
+    async def _command(self, cmd: str) -> bytes:
+        """
+        Run a single command, the lock must be held
+
+        Args:
+            cmd: The command you want to run
+
+        Returns:
+            The raw response body from the server
+
+        Raises:
+            ValueError when the command is too long to send
+            StaleConnectionError when a reused connection fails before the
+            command was sent
+            OSError when the connection fails otherwise
+        """
+        request_id: int = self._next_request_id()
+        sentinel_id: int = self._next_request_id()
+        packet: bytes = encode_packet(
+            request_id, SERVERDATA_EXECCOMMAND, cmd)
+
+        reused: bool = await self._reuse()
+        await self._send_first(reused, packet)
+        if self._writer is None:
+            raise OSError('RCON connection is not open!')
+        self._writer.write(
+            encode_packet(sentinel_id, SERVERDATA_RESPONSE_VALUE, ''))
+        await self._writer.drain()
+
+        body: bytearray = bytearray()
+        while True:
+            response_id, _, data = await self._recv_packet()
+            if response_id == sentinel_id:
+                break
+            if response_id == request_id:
+                body.extend(data)
+
+        return bytes(body)
+
+    async def command(self, cmd: str) -> bytes:
+        """
+        Run a single command and return the raw response
+
+        Commands sent concurrently on the same client are run one at a time,
+        and the whole command (including connecting if needed) must finish
+        within the client's timeout.
+
+        Like Mcrcon with the `rcon` backend, a command that couldn't be sent
+        on a connection the server dropped while idle is sent once more on
+        a fresh one, with whatever time is left. Once it is out, the server
+        may have run it, so it is never sent again.
+
+        Args:
+            cmd: The command you want to run
+
+        Returns:
+            The raw response body from the server
+
+        Raises:
+            ValueError when the command is too long to send
+            OSError when the connection fails
+            asyncio.TimeoutError when the server takes too long to answer
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        async with self._lock:
+            start: float = loop.time()
+            try:
+                try:
+                    return await asyncio.wait_for(
+                        self._command(cmd), self._timeout)
+                except StaleConnectionError:
+                    await self._close()
+                    remaining: float = self._timeout - (loop.time() - start)
+                    if remaining <= 0:
+                        raise
+                    metrics.increment('rcon_reconnects_total')
+                    return await asyncio.wait_for(
+                        self._command(cmd), remaining)
+            except (OSError, asyncio.TimeoutError):
+                # The stream is in an unknown state now, so force a reconnect
+                # on the next command instead of reading someone else's reply
+                await self._close()
+                raise
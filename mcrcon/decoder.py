@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+ResponseDecoder() class file
+
+ResponseDecoder() is a class that turns the raw output of an RCON command
+into clean lines of text. The formatting codes the built-in client receives,
+the ANSI characters the mcrcon binary prints, and the lines other RCON users
+mix into the stream are all stripped by one precompiled pattern in a single
+pass over the raw bytes. The output of the `list` command can then be
+parsed into a PlayerList().
+"""
+import re
+
+# Lines that end up in our output when the server is also driven over RCON
+# by something else, like a backup script
+NOISE_LINES: list[str] = [
+    'Automatic saving is now disabled',
+    'Automatic saving is now enabled',
+    'Saved the game'
+]
+
+# ANSI escape codes written as ESC, then the UTF-8 encoded ones written as
+# a C1 control and Minecraft's section sign formatting codes. Both of the
+# latter start with \xc2, so they share a branch, which keeps the regex
+# engine from trying every alternative at every byte.
+CODE_PATTERN: bytes = (
+    rb'\x1b[@-_][0-?]*[ -/]*[@-~]'
+    rb'|\xc2(?:[\x80-\x9f][0-?]*[ -/]*[@-~]|\xa7[0-9a-fk-orA-FK-OR])'
+)
+
+# `There are 2 of a max of 20 players online: a, b`, `2/20` on older
+# servers, or `2 out of maximum 20` with Essentials
+LIST_PATTERN: re.Pattern = re.compile(
+    r'are\s+(\d+)\s*(?:of\s+a\s+max(?:\s+of)?|out\s+of\s+maximum|/)'
+    r'\s*(\d+)\s+players?\s+online[:.]?(.*)$',
+    re.IGNORECASE)
+
+
+class PlayerList():
+    """
+    PlayerList() class file
+
+    PlayerList() holds the parsed output of the `list` command.
+    """
+
+    def __init__(self, count: int, max_players: int, names: list[str]) -> None:
+        self._count = count
+        self._max_players = max_players
+        self._names = names
+
+    @property
+    def count(self) -> int:
+        """
+        Getter for the count property
+
+        Args:
+            None
+
+        Returns:
+            The number of players online as reported by the server
+
+        Raises:
+            None
+        """
+        return self._count
+
+    @property
+    def max_players(self) -> int:
+        """
+        Getter for the max_players property
+
+        Args:
+            None
+
+        Returns:
+            The maximum number of players the server allows
+
+        Raises:
+            None
+        """
+        return self._max_players
+
+    @property
+    def names(self) -> list[str]:
+        """
+        Getter for the names property
+
+        Args:
+            None
+
+        Returns:
+            The names of the players online, in the order the server
+            listed them
+
+        Raises:
+            None
+        """
+        return self._names
+
+
+class ResponseDecoder():
+    """
+    ResponseDecoder() class file
+
+    ResponseDecoder() is a class that cleans the raw output of an RCON
+    command in a single pass and parses the output of the `list` command.
+    """
+
+    def __init__(self, noise_lines: list[str] | None = None) -> None:
+        if noise_lines is None:
+            noise_lines = NOISE_LINES
+
+        alternatives: list[bytes] = [CODE_PATTERN]
+        alternatives.extend(
+            re.escape(line.encode('utf-8')) for line in noise_lines)
+        self._pattern: re.Pattern = re.compile(b'|'.join(alternatives))
+
+    def decode(self, raw: bytes) -> list[str]:
+        """
+        Clean the raw output of a command and split it into lines
+
+        When the server is driven over RCON from multiple sources, their
+        output gets combined into a single stream, sometimes on the same
+        line as ours. Noise is removed wherever it appears in a line, and
+        the lines it leaves empty are dropped.
+
+        Args:
+            raw: The raw output of the command, from either backend
+
+        Returns:
+            A list of strings where each string in the list is a line of
+            output from the command
+
+        Raises:
+            None
+        """
+        data: str = self._pattern.sub(b'', raw).decode('utf-8', 'replace')
+        return [line for line in data.splitlines() if line.strip()]
+
+    def parse_list(self, lines: list[str]) -> PlayerList | None:
+        """
+        Parse the output of the `list` command
+
+        The first line that looks like the player count is used, so other
+        output interleaved before it doesn't get in the way.
+
+        Args:
+            lines: The decoded output of the `list` command
+
+        Returns:
+            The parsed player list, or None if none of the lines is the
+            output of the `list` command
+
+        Raises:
+            None
+        """
+        for line in lines:
+            match: re.Match | None = LIST_PATTERN.search(line)
+            if not match:
+                continue
+
+            names: list[str] = [
+                name.strip()
+                for name in match.group(3).split(',')
+                if name.strip()
+            ]
+            return PlayerList(
+                int(match.group(1)), int(match.group(2)), names)
+
+        return None
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+FanOut() class file
+
+FanOut() is a class that runs one job per server on a bounded pool of
+threads, so a slow or unreachable server can't hold up the rest of the
+fleet. Each job gets its own deadline, counted from when it starts running.
+"""
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable
+
+# How often to check running jobs against their deadline
+POLL_INTERVAL: float = 0.05
+
+
+class FanOut():
+    """
+    FanOut() class file
+
+    FanOut() is a class that runs one job per server on a bounded pool of
+    threads, so a slow or unreachable server can't hold up the rest of the
+    fleet. Each job gets its own deadline, counted from when it starts
+    running.
+    """
+
+    def __init__(self, workers: int = 8, deadline: float = 10) -> None:
+        if workers <= 0:
+            raise ValueError('The number of workers must be at least one!')
+
+        if deadline <= 0:
+            raise ValueError('The deadline must be greater than zero!')
+
+        self._workers = workers
+        self._deadline = deadline
+
+    @property
+    def workers(self) -> int:
+        """
+        Getter for the workers property
+
+        Args:
+            None
+
+        Returns:
+            The maximum number of jobs that run at the same time
+
+        Raises:
+            None
+        """
+        return self._workers
+
+    @property
+    def deadline(self) -> float:
+        """
+        Getter for the deadline property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds each job can run for before it is reported
+            as failed
+
+        Raises:
+            None
+        """
+        return self._deadline
+
+    def run(
+            self, jobs: dict[str, Callable[[], Any]]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Run every job and report how each one went
+
+        A job succeeds when it returns and fails when it raises an exception
+        or runs past the deadline. A job that runs past the deadline is left
+        to finish in the background, so jobs should also time out on their
+        own (for example through the Mcrcon timeout). The future of every
+        failed job is reported, so whatever the job was using can be
+        cleaned up once it is really done.
+
+        Args:
+            jobs: The jobs to run by server name, each is called with no
+            arguments
+
+        Returns:
+            A dictionary like this, with the servers in the order they
+            finished:
+            {
+                'succeeded': [
+                    {'server': 'survival', 'latency': 0.012, 'result': None}
+                ],
+                'failed': [
+                    {
+                        'server': 'creative',
+                        'latency': 10.0,
+                        'error': '...',
+                        'future': <Future at 0x7f... state=running>
+                    }
+                ]
+            }
+
+        Raises:
+            None
+        """
+        report: dict[str, list[dict[str, Any]]] = {
+            'succeeded': [],
+            'failed': []
+        }
+        if not jobs:
+            return report
+
+        started: dict[str, float] = {}
+        finished: dict[str, float] = {}
+        lock: threading.Lock = threading.Lock()
+
+        def timed(name: str, job: Callable[[], Any]) -> Any:
+            with lock:
+                started[name] = time.monotonic()
+            try:
+                return job()
+            finally:
+                with lock:
+                    finished[name] = time.monotonic()
+
+        executor: concurrent.futures.ThreadPoolExecutor = (
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(self.workers, len(jobs)),
+                thread_name_prefix='fanout'))
+        futures: dict[concurrent.futures.Future, str] = {
+            executor.submit(timed, name, job): name
+            for name, job in jobs.items()
+        }
+
+        try:
+            pending: set[concurrent.futures.Future] = set(futures)
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    timeout=POLL_INTERVAL,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                now: float = time.monotonic()
+
+                for future in done:
+                    name: str = futures[future]
+                    with lock:
+                        latency: float = (
+                            finished.get(name, now) - started.get(name, now))
+                    try:
+                        result: Any = future.result()
+                        report['succeeded'].append({
+                            'server': name,
+                            'latency': latency,
+                            'result': result
+                        })
+                    except Exception as err:
+                        report['failed'].append({
+                            'server': name,
+                            'latency': latency,
+                            'error': str(err) or repr(err),
+                            'future': future
+                        })
+
+                for future in list(pending):
+                    name = futures[future]
+                    with lock:
+                        start: float | None = started.get(name)
+                    if start is not None and now - start >= self.deadline:
+                        pending.discard(future)
+                        report['failed'].append({
+                            'server': name,
+                            'latency': now - start,
+                            'error': f'Deadline of {self.deadline}s exceeded!',
+                            'future': future
+                        })
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return report
@@ -2,27 +2,83 @@
 """
 Mcrcon() class file
 
-Mcrcon() is a class that wraps around the mcrcon binary to interact with
-Minecraft's Remote Console feature.
+Mcrcon() is a class that wraps around Minecraft's Remote Console feature.
+Commands are sent over a persistent connection by the built-in RconClient(),
+or by the mcrcon binary when the `mcrcon` backend is selected.
 """
 import os
-import re
-import subprocess
 import sys
+import time
 from typing import Any
 
+from mcrcon.decoder import PlayerList, ResponseDecoder
+from mcrcon.presence import PlayerPresence
+from mcrcon.rcon import DEFAULT_PORT, RconClient, StaleConnectionError
+from metrics import metrics
+
+BACKENDS: list[str] = ['rcon', 'mcrcon']
+MAX_WEATHER_DURATION: int = 1000000
+WEATHER_STATES: list[str] = ['clear', 'rain', 'thunder']
+
+
+def build_weather_command(weather: str, duration: int | None = None) -> str:
+    """
+    Build the /weather command for the given weather and duration
+
+    Durations are sent with a seconds suffix, which needs Minecraft 1.19.4
+    or newer.
+
+    Args:
+        weather: The name of the weather to set, clear/rain/thunder
+        duration: The optional number of seconds to hold the weather for,
+        clamped to between 1 and 1,000,000
+
+    Returns:
+        The command in str format
+
+    Raises:
+        ValueError when the given weather state is invalid
+    """
+    if weather.lower() not in WEATHER_STATES:
+        raise ValueError(f'{weather} is not a valid weather state!')
+
+    cmd: str = f'weather {weather}'
+    if duration is not None:
+        duration = max(1, min(int(duration), MAX_WEATHER_DURATION))
+        cmd = f'{cmd} {duration}s'
+
+    return cmd
+
 
 class Mcrcon():
     """
     Mcrcon() class file
 
-    Mcrcon() is a class that wraps around the mcrcon binary to interact with
-    Minecraft's Remote Console feature.
+    Mcrcon() is a class that wraps around Minecraft's Remote Console feature.
+    Commands are sent over a persistent connection by the built-in
+    RconClient(), or by the mcrcon binary when the `mcrcon` backend is
+    selected.
     """
 
-    def __init__(self) -> None:
-        self._hostname = os.getenv('MCRCON_HOST')
-        self._password = os.getenv('MCRCON_PASS')
+    def __init__(
+            self,
+            backend: str = 'rcon',
+            hostname: str | None = None,
+            password: str | None = None,
+            port: int | None = None,
+            timeout: float = 10) -> None:
+        self._hostname = hostname or os.getenv('MCRCON_HOST')
+        self._password = password or os.getenv('MCRCON_PASS')
+        self._port = port or int(os.getenv('MCRCON_PORT') or DEFAULT_PORT)
+        self._timeout = timeout
+        self._backend = backend
+        self._client: RconClient | None = None
+        self._decoder: ResponseDecoder = ResponseDecoder()
+        self._presence: PlayerPresence | None = None
+
+        if self.backend not in BACKENDS:
+            print(f'{backend} is not a valid MCRCON backend!')
+            sys.exit(1)
 
         if not self.hostname:
             print('MCRCON_HOST unset!')
@@ -38,7 +94,9 @@ class Mcrcon():
         Getter for the hostname property
 
         The hostname is the target Minecraft server, which is likely just
-        localhost or 127.0.0.1, though it can be any hostname or IP Address
+        localhost or 127.0.0.1, though it can be any hostname or IP Address.
+        It is read from the MCRCON_HOST environment variable unless one is
+        given when creating the class.
 
         Args:
             None
@@ -58,7 +116,8 @@ class Mcrcon():
         Getter for the password property
 
         The password is the remote console password defined in the Minecraft
-        server's server.properties file.
+        server's server.properties file. It is read from the MCRCON_PASS
+        environment variable unless one is given when creating the class.
 
         Args:
             None
@@ -72,63 +131,273 @@ class Mcrcon():
         """
         return self._password
 
-    def _ansi_decode(self, output: str) -> str:
+    @property
+    def port(self) -> int:
         """
-        Strip all ANSI characters from the output
+        Getter for the port property
 
-        All MCRCON packets have ANSI characters in them. This method
-        strips out all of those characters by doing a find and replace.
+        The port is the rcon.port defined in the Minecraft server's
+        server.properties file. It is read from the MCRCON_PORT environment
+        variable unless one is given when creating the class, and defaults
+        to 25575.
 
         Args:
-            output: The direct output from the self._run_command() method
+            None
 
         Returns:
-            A string with all ANSI characters stripped from the output
+            The remote console port in integer format
 
         Raises:
             None
         """
-        pattern = r'(?:\x1B[@-_]|[\x80-\x9F])[0-?]*[ -/]*[@-~]'
-        return re.sub(pattern, '', output)
+        return self._port
 
-    def _mcrcon_strip(self, output: str) -> str:
+    @property
+    def server(self) -> str:
         """
-        Remove lines of data when using MCRCON from multiple sources
+        Getter for the server property
 
-        When using MCRCON from multiple sources, the output from MCRCON
-        gets combined all into a single stream. So this strips out
-        all the possible lines that aren't relevant.
+        The server identifies the target Minecraft server by its hostname
+        and port, for example when recording what was sent to it.
 
         Args:
-            output: The direct output from the self._run_command() method
+            None
 
         Returns:
-            A string with all configured lines and characters stripped from
-            the output
+            The target server in `hostname:port` format
 
         Raises:
             None
         """
-        lines: list[str] = [
-            'Automatic saving is now disabled',
-            'Automatic saving is now enabled',
-            'Saved the game'
-        ]
-        for line in lines:
-            output = output.replace(line, '')
+        return f'{self.hostname}:{self.port}'
+
+    @property
+    def timeout(self) -> float:
+        """
+        Getter for the timeout property
+
+        The timeout is how many seconds connecting to the server or running
+        a single command can take before it is given up on.
+
+        Args:
+            None
 
-        return output
+        Returns:
+            The number of seconds a command can take
+
+        Raises:
+            None
+        """
+        return self._timeout
 
-    def _run_command(self, cmd: str) -> list[str]:
+    @property
+    def backend(self) -> str:
+        """
+        Getter for the backend property
+
+        The backend is either `rcon` to use the built-in RCON client over a
+        persistent connection, or `mcrcon` to fork the mcrcon binary for
+        every command.
+
+        Args:
+            None
+
+        Returns:
+            The name of the backend in string format
+
+        Raises:
+            None
+        """
+        return self._backend
+
+    @property
+    def presence(self) -> PlayerPresence | None:
+        """
+        Getter for the presence property
+
+        Args:
+            None
+
+        Returns:
+            Who was online at the last poll of get_presence(), or None if
+            it hasn't been polled yet
+
+        Raises:
+            None
+        """
+        return self._presence
+
+    def close(self) -> None:
+        """
+        Close the persistent RCON connection if one is open
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _run_command(
+            self, cmd: str, timeout: float | None = None) -> list[str]:
         """
         Run an MCRCON command and return the output
 
+        This method runs a command against the configured MCRCON target
+        using the selected backend, and returns the output as a list of
+        strings.
+
+        Args:
+            cmd: The command you want to run
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
+
+        Returns:
+            A list of strings where each string in the list is a line of
+            output from the command
+
+        Raises:
+            ValueError when the command fails to run
+        """
+        labels: dict[str, str] = {'backend': self.backend}
+        metrics.increment('rcon_commands_total', labels)
+        try:
+            with metrics.span('rcon_command'):
+                if self.backend == 'mcrcon':
+                    return self._run_mcrcon_command(cmd, timeout)
+
+                return self._run_rcon_command(cmd, timeout)
+        except ValueError:
+            metrics.increment('rcon_failures_total', labels)
+            raise
+
+    def _run_rcon_command(
+            self, cmd: str, timeout: float | None = None) -> list[str]:
+        """
+        Run an MCRCON command through the built-in client and return the output
+
+        This method runs a command against the configured MCRCON target over
+        a persistent connection that is opened and authenticated on first
+        use. If the connection has gone away since the last command, it is
+        reopened once before giving up, within the same timeout. That only
+        happens when the command couldn't be sent at all: once it is out,
+        the server may have run it, so a failure to read the reply is never
+        retried.
+
+        Args:
+            cmd: The command you want to run
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
+
+        Returns:
+            A list of strings where each string in the list is a line of
+            output from the command
+
+        Raises:
+            ValueError when the command fails to run
+        """
+        if not self.hostname:
+            raise ValueError('MCRCON_HOST is unset!')
+
+        if not self.password:
+            raise ValueError('MCRCON_PASS is unset!')
+
+        if self._client is None:
+            self._client = RconClient(
+                self.hostname, self.password, self.port, self.timeout)
+        # A command given up on by a deadline keeps the client it started
+        # with, even if close() lets the next one open another
+        client: RconClient = self._client
+
+        start: float = time.monotonic()
+        try:
+            try:
+                raw: bytes = client.command(cmd, timeout)
+            except StaleConnectionError:
+                # The server may have dropped an idle connection, so give it
+                # one more go on a fresh one with whatever time is left
+                if timeout is not None:
+                    timeout -= time.monotonic() - start
+                    if timeout <= 0:
+                        raise
+                metrics.increment('rcon_reconnects_total')
+                raw = client.command(cmd, timeout)
+
+        except OSError as err:
+            raise ValueError(f'[ERROR] {err}') from err
+
+        return self._decoder.decode(raw)
+
+    def _run_rcon_batch(
+            self,
+            cmds: list[str],
+            timeout: float | None = None) -> list[list[str]]:
+        """
+        Run several MCRCON commands through the built-in client
+
+        Like _run_rcon_command(), the batch is retried once on a fresh
+        connection only when the reused one failed before the first command
+        was sent. A failure after that is never retried, since the server
+        may have run some of the commands already.
+
+        Args:
+            cmds: The commands you want to run, in order
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
+
+        Returns:
+            A list with the output lines of every command, in the same order
+
+        Raises:
+            ValueError when the batch fails to run
+        """
+        if not self.hostname:
+            raise ValueError('MCRCON_HOST is unset!')
+
+        if not self.password:
+            raise ValueError('MCRCON_PASS is unset!')
+
+        if self._client is None:
+            self._client = RconClient(
+                self.hostname, self.password, self.port, self.timeout)
+        client: RconClient = self._client
+
+        start: float = time.monotonic()
+        try:
+            try:
+                raws: list[bytes] = client.command_many(cmds, timeout)
+            except StaleConnectionError:
+                if timeout is not None:
+                    timeout -= time.monotonic() - start
+                    if timeout <= 0:
+                        raise
+                metrics.increment('rcon_reconnects_total')
+                raws = client.command_many(cmds, timeout)
+
+        except OSError as err:
+            raise ValueError(f'[ERROR] {err}') from err
+
+        return [self._decoder.decode(raw) for raw in raws]
+
+    def _run_mcrcon_command(
+            self, cmd: str, timeout: float | None = None) -> list[str]:
+        """
+        Run an MCRCON command through the mcrcon binary and return the output
+
         This method runs a command against the configured MCRCON target,
         strips out all of the ANSI characters, and any irrelevant lines of
         data, and returns the output as a list of strings.
 
         Args:
             cmd: The command you want to run
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
 
         Returns:
             A list of strings where each string in the list is a line of
@@ -137,23 +406,28 @@ class Mcrcon():
         Raises:
             ValueError when the command fails to run
         """
+        # Only this backend needs subprocess, so don't load it on startup
+        import subprocess
+
         if not self.password:
             raise ValueError('MCRCON_PASS is unset!')
 
         command: list[str] = [
             '/usr/local/bin/mcrcon', '-p', self.password, cmd
         ]
+        if self.hostname:
+            command[1:1] = ['-H', self.hostname, '-P', str(self.port)]
         try:
             output: subprocess.CompletedProcess = subprocess.run(
-                command, capture_output=True, check=True
+                command,
+                capture_output=True,
+                check=True,
+                timeout=self.timeout if timeout is None else timeout
             )
             if output.returncode > 0:
                 raise ValueError(f'[WARN] {output.stderr.decode()}')
 
-            data: str = self._ansi_decode(output.stdout.decode())
-            data = self._mcrcon_strip(data)
-
-            return data.splitlines()
+            return self._decoder.decode(output.stdout)
 
         except subprocess.CalledProcessError as err:
             stdout: list[str] = err.stdout.decode().splitlines()
@@ -166,6 +440,39 @@ class Mcrcon():
 
             raise ValueError(' '.join(msg)) from err
 
+        except subprocess.TimeoutExpired as err:
+            raise ValueError(f'[ERROR] {cmd} timed out!') from err
+
+    def get_presence(self) -> PlayerPresence:
+        """
+        Poll who is logged in
+
+        This method parses the output of the `list` MCRCON command once
+        into a PlayerPresence, and keeps it as the presence property. Grab
+        the presence property before calling this to get who joined and
+        left since the last poll, like this:
+            previous = mcrcon.presence
+            joined, left = mcrcon.get_presence().diff(previous)
+
+        Args:
+            None
+
+        Returns:
+            Who is online, empty if the output couldn't be parsed
+
+        Raises:
+            ValueError when the MCRCON command fails
+        """
+        output: list[str] = self._run_command('list')
+        player_list: PlayerList | None = self._decoder.parse_list(output)
+        if player_list is None:
+            self._presence = PlayerPresence()
+        else:
+            self._presence = PlayerPresence(
+                player_list.names, player_list.count)
+
+        return self._presence
+
     def get_count_of_players_online(self) -> str:
         """
         Get the count of logged in players
@@ -183,14 +490,7 @@ class Mcrcon():
             None
         """
         try:
-            output: list[str] = self._run_command('list')
-            pattern: str = r'^.*?are\s+(\d+)\s+of\s+a\s+max'
-            match = re.match(pattern, output[0])
-            if not match:
-                return '0'
-
-            return match.group(1)
-
+            return str(self.get_presence().count)
         except ValueError as err:
             print(err)
             sys.exit(1)
@@ -201,7 +501,10 @@ class Mcrcon():
         Get the names of players who are logged in
 
         This method returns which players are online and offline as found
-        from the `list` MCRCON command.
+        from the `list` MCRCON command. The output is polled once, and each
+        whitelisted player is then looked up by name, so the work grows
+        with the whitelist rather than with the whitelist times the number
+        of players online.
 
         Args:
             players: A list of dictionaries containing the player names
@@ -218,44 +521,41 @@ class Mcrcon():
         Raises:
             None
         """
-        logged_in_players: list[dict[str, Any]] = []
-
-        for player in players:
-            for key, value in player.items():
-                if key == 'name':
-                    logged_in: dict[str, Any] = {
-                        'player': value,
-                        'count': 0
-                    }
-                    logged_in_players.append(logged_in)
-
-        pattern: str = r'^.*?online\:\s+([A-z0-9\,\s]+)'
         try:
-            output: list[str] = self._run_command('list')
-            matches = re.match(pattern, output[0])
-            if not matches:
-                return logged_in_players
-
-            for player in matches.group(1).split(','):
-                name: str = player.strip()
-                for logged_in in logged_in_players:
-                    if logged_in['player'] == name:
-                        logged_in['count'] = 1
-
+            presence: PlayerPresence = self.get_presence()
         except ValueError as err:
             print(err)
+            presence = PlayerPresence()
 
-        return logged_in_players
+        return [
+            {
+                'player': player['name'],
+                'count': 1 if presence.is_online(player['name']) else 0
+            }
+            for player in players
+            if 'name' in player
+        ]
 
-    def set_weather(self, weather: str) -> None:
+    def set_weather(
+            self,
+            weather: str,
+            duration: int | None = None,
+            timeout: float | None = None) -> None:
         """
         Set the weather on the target server
 
         This method uses the /weather command to set the weather on the
-        target server using either "clear", "rain", or "thunder".
+        target server using either "clear", "rain", or "thunder". When a
+        duration is given, the server holds that weather for that long
+        before its own weather cycle takes over again, see
+        build_weather_command().
 
         Args:
             weather: The name of the weather to set on the server
+            duration: The optional number of seconds to hold the weather for,
+            clamped to between 1 and 1,000,000
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
 
         Returns:
             None
@@ -264,11 +564,76 @@ class Mcrcon():
             ValueError when the given weather state is invalid
             ValueError when the MCRCON command fails
         """
-        weather_states: list[str] = ['clear', 'rain', 'thunder']
-        if weather.lower() not in weather_states:
-            raise ValueError(f'{weather} is not a valid weather state!')
+        cmd: str = build_weather_command(weather, duration)
 
         try:
-            self._run_command(f'weather {weather}')
+            self._run_command(cmd, timeout)
         except ValueError as err:
             raise ValueError(err) from err
+
+    def run_batch(
+            self,
+            cmds: list[str],
+            timeout: float | None = None) -> list[dict[str, Any]]:
+        """
+        Run several MCRCON commands in one go and return their output
+
+        With the `rcon` backend, the commands are pipelined over the one
+        authenticated connection, see RconClient.command_many(). Like a
+        single command, a batch is only sent once more, on a fresh
+        connection, when the old one failed before any of it was sent, so
+        its commands never run twice. With the
+        `mcrcon` backend, the commands are run one after the other, and one
+        failing doesn't stop the rest.
+
+        Args:
+            cmds: The commands you want to run, in order
+            timeout: An optional number of seconds to use instead of the
+            configured timeout
+
+        Returns:
+            A list with a dictionary for every command, in the same order,
+            like this:
+            {
+                'command': 'list',
+                'output': ['There are 0 of a max of 20 players online:'],
+                'error': None # or why the command failed
+            }
+
+        Raises:
+            None
+        """
+        labels: dict[str, str] = {'backend': self.backend}
+        metrics.increment('rcon_commands_total', labels, len(cmds))
+        results: list[dict[str, Any]] = []
+        with metrics.span('rcon_batch'):
+            if self.backend == 'mcrcon':
+                for cmd in cmds:
+                    try:
+                        results.append({
+                            'command': cmd,
+                            'output': self._run_mcrcon_command(cmd, timeout),
+                            'error': None
+                        })
+                    except ValueError as err:
+                        results.append(
+                            {'command': cmd, 'output': [], 'error': str(err)})
+            else:
+                try:
+                    outputs: list[list[str]] = self._run_rcon_batch(
+                        cmds, timeout)
+                    results = [
+                        {'command': cmd, 'output': output, 'error': None}
+                        for cmd, output in zip(cmds, outputs)
+                    ]
+                except ValueError as err:
+                    results = [
+                        {'command': cmd, 'output': [], 'error': str(err)}
+                        for cmd in cmds
+                    ]
+
+        failures: int = sum(1 for result in results if result['error'])
+        if failures:
+            metrics.increment('rcon_failures_total', labels, failures)
+
+        return results
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+PlayerPresence() class file
+
+PlayerPresence() is a class that holds who was online at one poll of the
+`list` command, indexed by name so counting players and checking whether
+one of them is online don't depend on the size of the whitelist. Two polls
+can be compared to get who joined and who left in between.
+"""
+from typing import Iterable
+
+
+class PlayerPresence():
+    """
+    PlayerPresence() class file
+
+    PlayerPresence() is a class that holds who was online at one poll,
+    indexed by name. Minecraft names are unique regardless of case, so
+    lookups ignore case.
+    """
+
+    def __init__(
+            self,
+            names: Iterable[str] = (),
+            count: int | None = None) -> None:
+        self._online: dict[str, str] = {
+            name.casefold(): name for name in names
+        }
+        self._count = len(self._online) if count is None else count
+
+    @property
+    def count(self) -> int:
+        """
+        Getter for the count property
+
+        This is the count the server reported, which can be higher than the
+        number of names when the server hides some of them.
+
+        Args:
+            None
+
+        Returns:
+            The number of players online
+
+        Raises:
+            None
+        """
+        return self._count
+
+    @property
+    def names(self) -> list[str]:
+        """
+        Getter for the names property
+
+        Args:
+            None
+
+        Returns:
+            The names of the players online, in the order the server
+            listed them
+
+        Raises:
+            None
+        """
+        return list(self._online.values())
+
+    def is_online(self, name: str) -> bool:
+        """
+        Check whether a player is online
+
+        Args:
+            name: The name of the player, in any case
+
+        Returns:
+            True if the player is online, otherwise False
+
+        Raises:
+            None
+        """
+        return name.casefold() in self._online
+
+    def diff(
+            self,
+            previous: 'PlayerPresence | None'
+    ) -> tuple[list[str], list[str]]:
+        """
+        Compare this poll with an earlier one
+
+        Args:
+            previous: The presence from the earlier poll, or None if there
+            wasn't one, in which case everyone online has just joined
+
+        Returns:
+            A tuple of the names of the players who joined and the names of
+            the players who left since the earlier poll
+
+        Raises:
+            None
+        """
+        if previous is None:
+            return (self.names, [])
+
+        joined: list[str] = [
+            name for key, name in self._online.items()
+            if key not in previous._online
+        ]
+        left: list[str] = [
+            name for key, name in previous._online.items()
+            if key not in self._online
+        ]
+        return (joined, left)
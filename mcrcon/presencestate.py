@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+PresenceState() class file
+
+PresenceState() is a class that remembers which servers were empty at the
+last poll in a file under data/, so runs can skip the weather while nobody
+is online, and notice when the first player comes back.
+"""
+import time
+from typing import Any
+
+from datastore import datastore
+
+DEFAULT_EMPTY_INTERVAL: int = 0
+
+# How often a daemon checks an empty server for players
+EMPTY_POLL_INTERVAL: int = 60
+
+
+class PresenceState():
+    """
+    PresenceState() class file
+
+    PresenceState() is a class that remembers which servers were empty at
+    the last poll, and when their weather was last updated while empty, in
+    a file under data/.
+    """
+
+    def __init__(
+            self,
+            path: str | None = None,
+            empty_interval: int = DEFAULT_EMPTY_INTERVAL) -> None:
+        self._path = path or datastore.get_data_path('presence_state.json')
+        self._empty_interval = empty_interval
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the state file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def empty_interval(self) -> int:
+        """
+        Getter for the empty_interval property
+
+        The weather of an empty server is still updated after this many
+        seconds. Zero means it isn't updated until a player joins.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds between updates on an empty server
+
+        Raises:
+            None
+        """
+        return self._empty_interval
+
+    def get(self, server: str) -> dict[str, Any] | None:
+        """
+        Get the state of a server that was empty at the last poll
+
+        Args:
+            server: The server in `hostname:port` format
+
+        Returns:
+            A dictionary like this, or None if the server wasn't empty:
+            {
+                'empty_since': 1684926000.0,
+                'updated_at': 1684926000.0
+            }
+
+        Raises:
+            None
+        """
+        entry = datastore.read_json(self.path).get(server)
+        if not isinstance(entry, dict):
+            return None
+
+        return entry
+
+    def record(self, server: str, online: int) -> bool:
+        """
+        Record how many players were online at this poll
+
+        The file is only written when a server becomes empty or stops
+        being empty, not on every poll.
+
+        Args:
+            server: The server in `hostname:port` format
+            online: The number of players online
+
+        Returns:
+            True if the server was empty at the last poll and a player has
+            just joined, otherwise False
+
+        Raises:
+            OSError when the state file cannot be written
+        """
+        entry: dict[str, Any] | None = self.get(server)
+        if online > 0:
+            if entry is None:
+                return False
+
+            with datastore.update_json(self.path) as data:
+                data.pop(server, None)
+            return True
+
+        if entry is None:
+            # The weather was kept up to date until now
+            now: float = time.time()
+            with datastore.update_json(self.path) as data:
+                data[server] = {'empty_since': now, 'updated_at': now}
+
+        return False
+
+    def needs_update(self, server: str) -> bool:
+        """
+        Check if the weather of an empty server is due for an update
+
+        Args:
+            server: The server in `hostname:port` format
+
+        Returns:
+            True if the server isn't recorded as empty, or the empty
+            interval has passed since its weather was last updated. False
+            if the update can be skipped.
+
+        Raises:
+            None
+        """
+        entry: dict[str, Any] | None = self.get(server)
+        if entry is None:
+            return True
+
+        if self.empty_interval <= 0:
+            return False
+
+        try:
+            updated_at: float = float(entry['updated_at'])
+        except (KeyError, TypeError, ValueError):
+            return True
+
+        return time.time() - updated_at >= self.empty_interval
+
+    def set_updated(self, server: str) -> None:
+        """
+        Record that the weather of an empty server was just updated
+
+        Args:
+            server: The server in `hostname:port` format
+
+        Returns:
+            None
+
+        Raises:
+            OSError when the state file cannot be written
+        """
+        with datastore.update_json(self.path) as data:
+            entry = data.get(server)
+            if isinstance(entry, dict):
+                entry['updated_at'] = time.time()
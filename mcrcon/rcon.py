@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+RconClient() class file
+
+RconClient() is a pure Python implementation of the Source RCON protocol
+that Minecraft uses for its Remote Console feature. It keeps a single
+authenticated socket open so that many commands can be sent without paying
+for a new connection and login each time.
+
+https://developer.valvesoftware.com/wiki/Source_RCON_Protocol
+"""
+import select
+import socket
+import struct
+
+SERVERDATA_AUTH: int = 3
+SERVERDATA_AUTH_RESPONSE: int = 2
+SERVERDATA_EXECCOMMAND: int = 2
+SERVERDATA_RESPONSE_VALUE: int = 0
+
+# Minecraft rejects any packet bigger than this from the client
+MAX_PACKET_SIZE: int = 1460
+DEFAULT_PORT: int = 25575
+
+# How many commands of a batch are sent before reading their responses, so
+# neither side blocks on a full socket buffer with a long batch
+PIPELINE_DEPTH: int = 16
+
+
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    """
+    Encode a single RCON packet, including its length prefix
+
+    Args:
+        request_id: The ID the server will echo back in its response
+        packet_type: One of the SERVERDATA_* packet types
+        body: The command or password to send
+
+    Returns:
+        The encoded packet
+
+    Raises:
+        ValueError when the packet is too large for the server to accept
+    """
+    payload: bytes = struct.pack('<ii', request_id, packet_type)
+    payload += body.encode('utf-8') + b'\x00\x00'
+    if len(payload) + 4 > MAX_PACKET_SIZE:
+        raise ValueError(f'RCON command is too long: {body[:32]}...')
+
+    return struct.pack('<i', len(payload)) + payload
+
+
+def decode_packet(data: bytes) -> tuple[int, int, bytes]:
+    """
+    Decode a single RCON packet without its length prefix
+
+    Args:
+        data: The packet as read from the socket, after the length prefix
+
+    Returns:
+        A tuple of the request ID, the packet type and the raw body
+
+    Raises:
+        OSError when the packet is too short to be valid
+    """
+    if len(data) < 10:
+        raise OSError('Received a malformed RCON packet!')
+
+    request_id, packet_type = struct.unpack('<ii', data[:8])
+    return (request_id, packet_type, data[8:-2])
+
+
+class StaleConnectionError(OSError):
+    """
+    Raised when a reused connection fails before the command was written,
+    so the server can't have run it and it is safe to send it again
+    """
+
+
+class RconClient():
+    """
+    RconClient() class file
+
+    RconClient() is a pure Python implementation of the Source RCON protocol
+    that Minecraft uses for its Remote Console feature.
+    """
+
+    def __init__(
+            self,
+            hostname: str,
+            password: str,
+            port: int = DEFAULT_PORT,
+            timeout: float = 10) -> None:
+        self._hostname = hostname
+        self._password = password
+        self._port = port
+        self._timeout = timeout
+        self._socket: socket.socket | None = None
+        self._request_id = 0
+
+    def __enter__(self) -> 'RconClient':
+        self.connect()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def hostname(self) -> str:
+        """
+        Getter for the hostname property
+
+        Args:
+            None
+
+        Returns:
+            The hostname or IP Address of the target Minecraft server
+
+        Raises:
+            None
+        """
+        return self._hostname
+
+    @property
+    def port(self) -> int:
+        """
+        Getter for the port property
+
+        Args:
+            None
+
+        Returns:
+            The RCON port of the target Minecraft server
+
+        Raises:
+            None
+        """
+        return self._port
+
+    @property
+    def connected(self) -> bool:
+        """
+        Getter for the connected property
+
+        Args:
+            None
+
+        Returns:
+            True if an authenticated socket is currently open, False if not
+
+        Raises:
+            None
+        """
+        return self._socket is not None
+
+    def _next_request_id(self) -> int:
+        """
+        Generate the next request ID for this connection
+
+        Request IDs only need to be unique per connection and must never be
+        -1, since that is what the server uses to signal a failed login.
+
+        Args:
+            None
+
+        Returns:
+            A positive integer to use as the ID of the next packet
+
+        Raises:
+            None
+        """
+        self._request_id = (self._request_id % 0x7FFFFFFF) + 1
+        return self._request_id
+
+    def _send_packet(
+            self, request_id: int, packet_type: int, body: str) -> None:
+        """
+        Encode and send a single RCON packet
+
+        Args:
+            request_id: The ID the server will echo back in its response
+            packet_type: One of the SERVERDATA_* packet types
+            body: The command or password to send
+
+        Returns:
+            None
+
+        Raises:
+            ValueError when the packet is too large for the server to accept
+            OSError when the socket fails to send the packet
+        """
+        if self._socket is None:
+            raise OSError('RCON connection is not open!')
+
+        self._socket.sendall(encode_packet(request_id, packet_type, body))
+
+    def _recv_exactly(self, size: int) -> bytes:
+        """
+        Read exactly the given number of bytes from the socket
+
+        Args:
+            size: The number of bytes to read
+
+        Returns:
+            The bytes that were read
+
+        Raises:
+            OSError when the server closes the connection early
+        """
+        if self._socket is None:
+            raise OSError('RCON connection is not open!')
+
+        data: bytearray = bytearray()
+        while len(data) < size:
+            chunk: bytes = self._socket.recv(size - len(data))
+            if not chunk:
+                raise OSError('RCON connection closed by the server!')
+            data.extend(chunk)
+
+        return bytes(data)
+
+    def _recv_packet(self) -> tuple[int, int, bytes]:
+        """
+        Read and decode a single RCON packet
+
+        Args:
+            None
+
+        Returns:
+            A tuple of the request ID, the packet type and the raw body
+
+        Raises:
+            OSError when the server closes the connection early
+        """
+        (length,) = struct.unpack('<i', self._recv_exactly(4))
+        return decode_packet(self._recv_exactly(length))
+
+    def _is_stale(self) -> bool:
+        """
+        Check whether the open connection has gone away since it was used
+
+        Nothing is left to read between commands, so a socket that is
+        readable has either been closed by the server, which drops idle
+        connections, or holds a reply that belongs to no one. It can't be
+        trusted with the next command in both cases.
+
+        Args:
+            None
+
+        Returns:
+            True if the open socket should be replaced, False if it is fine
+            or there is none
+
+        Raises:
+            None
+        """
+        if self._socket is None:
+            return False
+
+        try:
+            readable, _, _ = select.select([self._socket], [], [], 0)
+        except (OSError, ValueError):
+            return True
+
+        return bool(readable)
+
+    def _reuse(self, timeout: float | None = None) -> bool:
+        """
+        Make sure the connection is open, replacing it if it went stale
+
+        Args:
+            timeout: An optional number of seconds to use instead of the
+            client's timeout while connecting
+
+        Returns:
+            True if an already open connection is reused, False if a new
+            one was opened
+
+        Raises:
+            ValueError when the server rejects the password
+            OSError when the server cannot be reached
+        """
+        if self._is_stale():
+            self.close()
+
+        reused: bool = self.connected
+        self.connect(timeout)
+        return reused
+
+    def _send_first(self, reused: bool, packet: bytes) -> None:
+        """
+        Send the first packet of a request
+
+        Args:
+            reused: True if the connection was open before this request
+            packet: The encoded packet to send
+
+        Returns:
+            None
+
+        Raises:
+            StaleConnectionError when sending fails on a reused connection,
+            since the server can't have run a packet it never got whole
+            OSError when sending fails otherwise
+        """
+        if self._socket is None:
+            raise OSError('RCON connection is not open!')
+
+        try:
+            self._socket.sendall(packet)
+        except OSError as err:
+            if reused:
+                raise StaleConnectionError(str(err)) from err
+            raise
+
+    def connect(self, timeout: float | None = None) -> None:
+        """
+        Open the socket and authenticate against the server
+
+        Calling this on an already connected client does nothing.
+
+        Args:
+            timeout: An optional number of seconds to use instead of the
+            client's timeout while connecting
+
+        Returns:
+            None
+
+        Raises:
+            ValueError when the server rejects the password
+            OSError when the server cannot be reached
+        """
+        if self._socket is not None:
+            return
+
+        self._socket = socket.create_connection(
+            (self.hostname, self.port),
+            timeout=self._timeout if timeout is None else timeout)
+        try:
+            request_id: int = self._next_request_id()
+            self._send_packet(request_id, SERVERDATA_AUTH, self._password)
+
+            # Source servers send an empty RESPONSE_VALUE before the real
+            # AUTH_RESPONSE, Minecraft only sends the latter
+            while True:
+                response_id, packet_type, _ = self._recv_packet()
+                if packet_type == SERVERDATA_AUTH_RESPONSE:
+                    break
+
+            if response_id == -1:
+                raise ValueError('RCON authentication failed!')
+
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """
+        Close the socket if it is open
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        if self._socket is None:
+            return
+
+        try:
+            self._socket.close()
+        finally:
+            self._socket = None
+
+    def command(self, cmd: str, timeout: float | None = None) -> bytes:
+        """
+        Run a single command and return the raw response
+
+        Large responses can be split across several packets, so a second
+        empty packet is sent right after the command. The server answers
+        packets in order, which means every packet with the command's ID
+        that arrives before the answer to the empty packet belongs to the
+        command's response.
+
+        A connection the server closed while idle is replaced before the
+        command is sent. Only a failure to send the command on a reused
+        connection raises StaleConnectionError: once the command is out,
+        the server may have run it, so any later failure is an OSError
+        that must not be retried.
+
+        Args:
+            cmd: The command you want to run
+            timeout: An optional number of seconds to use instead of the
+            client's timeout for every socket operation of this command
+
+        Returns:
+            The raw response body from the server
+
+        Raises:
+            ValueError when the command is too long to send
+            StaleConnectionError when a reused connection fails before the
+            command was sent
+            OSError when the connection fails otherwise
+        """
+        request_id: int = self._next_request_id()
+        sentinel_id: int = self._next_request_id()
+        packet: bytes = encode_packet(request_id, SERVERDATA_EXECCOMMAND, cmd)
+
+        reused: bool = self._reuse(timeout)
+        try:
+            if self._socket is not None:
+                self._socket.settimeout(
+                    self._timeout if timeout is None else timeout)
+
+            self._send_first(reused, packet)
+            self._send_packet(sentinel_id, SERVERDATA_RESPONSE_VALUE, '')
+
+            body: bytearray = bytearray()
+            while True:
+                response_id, _, data = self._recv_packet()
+                if response_id == sentinel_id:
+                    break
+                if response_id == request_id:
+                    body.extend(data)
+
+            return bytes(body)
+
+        except OSError:
+            # The stream is in an unknown state now, so force a reconnect
+            # on the next command instead of reading someone else's reply
+            self.close()
+            raise
+
+    def command_many(
+            self,
+            cmds: list[str],
+            timeout: float | None = None) -> list[bytes]:
+        """
+        Run several commands over the connection and return their responses
+
+        The commands are pipelined: up to PIPELINE_DEPTH of them are sent
+        back to back, followed by a single empty packet, before any
+        response is read. Every response packet is matched to its command
+        by request ID, and the answer to the empty packet marks the end of
+        the responses to that group of commands.
+
+        As with command(), a connection the server closed while idle is
+        replaced first, and only a failure to send the first command on a
+        reused connection raises StaleConnectionError. The first command
+        goes out on its own for that reason: a packet the server never got
+        whole can't have been run, but commands packed in after it could
+        have been.
+
+        Args:
+            cmds: The commands you want to run, in order
+            timeout: An optional number of seconds to use instead of the
+            client's timeout for every socket operation of the batch
+
+        Returns:
+            The raw response body of every command, in the same order
+
+        Raises:
+            ValueError when one of the commands is too long to send, in
+            which case none of them are sent
+            StaleConnectionError when a reused connection fails before the
+            first command was sent
+            OSError when the connection fails otherwise
+        """
+        # Encode every command first, so a bad one doesn't leave the batch
+        # half sent
+        for cmd in cmds:
+            encode_packet(0, SERVERDATA_EXECCOMMAND, cmd)
+
+        reused: bool = self._reuse(timeout)
+        try:
+            if self._socket is None:
+                raise OSError('RCON connection is not open!')
+            self._socket.settimeout(
+                self._timeout if timeout is None else timeout)
+
+            responses: list[bytes] = []
+            for start in range(0, len(cmds), PIPELINE_DEPTH):
+                window: list[str] = cmds[start:start + PIPELINE_DEPTH]
+                bodies: dict[int, bytearray] = {}
+                packets: list[bytes] = []
+                for cmd in window:
+                    request_id: int = self._next_request_id()
+                    bodies[request_id] = bytearray()
+                    packets.append(encode_packet(
+                        request_id, SERVERDATA_EXECCOMMAND, cmd))
+
+                sentinel_id: int = self._next_request_id()
+                packets.append(
+                    encode_packet(sentinel_id, SERVERDATA_RESPONSE_VALUE, ''))
+                if start == 0:
+                    self._send_first(reused, packets.pop(0))
+                self._socket.sendall(b''.join(packets))
+
+                while True:
+                    response_id, _, data = self._recv_packet()
+                    if response_id == sentinel_id:
+                        break
+                    if response_id in bodies:
+                        bodies[response_id].extend(data)
+
+                responses.extend(bytes(body) for body in bodies.values())
+
+            return responses
+
+        except OSError:
+            # The stream is in an unknown state now, so force a reconnect
+            # on the next command instead of reading someone else's reply
+            self.close()
+            raise
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+WeatherState() class file
+
+WeatherState() is a class that remembers the last weather that was applied
+to every server in a file under data/, so the same weather doesn't have to
+be sent again on every run.
+"""
+import time
+from typing import Any
+
+from datastore import datastore
+
+DEFAULT_RESYNC_INTERVAL: int = 60 * 60
+
+
+class WeatherState():
+    """
+    WeatherState() class file
+
+    WeatherState() is a class that remembers the last weather that was
+    applied to every server in a file under data/, so the same weather
+    doesn't have to be sent again on every run.
+    """
+
+    def __init__(
+            self,
+            path: str | None = None,
+            resync_interval: int = DEFAULT_RESYNC_INTERVAL) -> None:
+        self._path = path or datastore.get_data_path('weather_state.json')
+        self._resync_interval = resync_interval
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the state file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def resync_interval(self) -> int:
+        """
+        Getter for the resync_interval property
+
+        The weather is sent again after this many seconds even if it hasn't
+        changed, in case it was changed on the server by something else.
+        Zero means the weather is always sent.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds between forced updates
+
+        Raises:
+            None
+        """
+        return self._resync_interval
+
+    def get(self, server: str) -> dict[str, Any] | None:
+        """
+        Get the last weather applied to a server
+
+        Args:
+            server: The server in `hostname:port` format
+
+        Returns:
+            A dictionary like this, or None if nothing was recorded:
+            {
+                'weather': 'rain',
+                'applied_at': 1684926000.0,
+                'expires_at': 1684933200.0 # None if no duration was sent
+            }
+
+        Raises:
+            None
+        """
+        entry = datastore.read_json(self.path).get(server)
+        if not isinstance(entry, dict):
+            return None
+
+        return entry
+
+    def set(
+            self,
+            server: str,
+            weather: str,
+            duration: int | None = None) -> None:
+        """
+        Record the weather that was just applied to a server
+
+        Args:
+            server: The server in `hostname:port` format
+            weather: The weather that was applied
+            duration: The optional number of seconds the server was told to
+            hold the weather for
+
+        Returns:
+            None
+
+        Raises:
+            OSError when the state file cannot be written
+        """
+        now: float = time.time()
+        with datastore.update_json(self.path) as data:
+            data[server] = {
+                'weather': weather,
+                'applied_at': now,
+                'expires_at': now + duration if duration else None
+            }
+
+    def needs_update(self, server: str, weather: str) -> bool:
+        """
+        Check if the weather has to be sent to a server
+
+        Args:
+            server: The server in `hostname:port` format
+            weather: The weather that is about to be applied
+
+        Returns:
+            True if the weather differs from the last one applied, nothing
+            was recorded yet, the duration the server was told to hold it
+            for is over, or the resync interval has passed. False if sending
+            it would change nothing.
+
+        Raises:
+            None
+        """
+        if self.resync_interval <= 0:
+            return True
+
+        entry: dict[str, Any] | None = self.get(server)
+        if not entry or entry.get('weather') != weather:
+            return True
+
+        try:
+            applied_at: float = float(entry['applied_at'])
+            expires_at: float | None = entry.get('expires_at')
+            if expires_at is not None:
+                expires_at = float(expires_at)
+        except (KeyError, TypeError, ValueError):
+            return True
+
+        now: float = time.time()
+        if expires_at is not None and now >= expires_at:
+            return True
+
+        return now - applied_at >= self.resync_interval
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Run metrics
+
+These functions keep a process wide registry of counters and stage timings
+so a run can show where its time went (geocoding, the weather call, JSON
+decoding, the RCON command) and how often the API was called, the caches
+were hit, requests were retried and RCON commands failed. The registry can
+be exported as a Prometheus textfile (for the node_exporter textfile
+collector) or as a JSON summary.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from datastore import datastore
+
+PREFIX: str = 'owencraft'
+
+_COUNTERS: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_STAGES: dict[str, dict[str, float]] = {}
+_LOCK: threading.Lock = threading.Lock()
+
+
+def _label_key(labels: dict[str, str] | None) -> tuple[tuple[str, str], ...]:
+    """
+    Turn a dictionary of labels into a hashable, ordered key.
+
+    Args:
+        labels: The labels of a metric, or None.
+
+    Returns:
+        The labels as a sorted tuple of (name, value) pairs.
+
+    Raises:
+        None
+    """
+    if not labels:
+        return ()
+
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _format_name(name: str, labels: tuple[tuple[str, str], ...]) -> str:
+    """
+    Format a metric name with its labels the way Prometheus expects.
+
+    Args:
+        name: The name of the metric.
+        labels: The labels of the metric as returned by _label_key().
+
+    Returns:
+        The metric, like `owencraft_api_calls_total{endpoint="onecall"}`.
+
+    Raises:
+        None
+    """
+    if not labels:
+        return name
+
+    values: str = ','.join(
+        '%s="%s"' % (key, value.replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in labels)
+    return f'{name}{{{values}}}'
+
+
+def increment(
+        name: str,
+        labels: dict[str, str] | None = None,
+        value: float = 1) -> None:
+    """
+    Add to a counter, creating it on first use.
+
+    Args:
+        name: The name of the counter without the prefix, like
+        `api_calls_total`.
+        labels: Optional labels to tell counters with the same name apart.
+        value: The amount to add.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    key = (f'{PREFIX}_{name}', _label_key(labels))
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + value
+
+
+def get_counter(name: str, labels: dict[str, str] | None = None) -> float:
+    """
+    Get the current value of a counter.
+
+    Args:
+        name: The name of the counter without the prefix, like
+        `api_calls_total`.
+        labels: The labels of the counter, if it has any.
+
+    Returns:
+        The value of the counter, or 0 if it hasn't been incremented yet.
+
+    Raises:
+        None
+    """
+    key = (f'{PREFIX}_{name}', _label_key(labels))
+    with _LOCK:
+        return _COUNTERS.get(key, 0)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """
+    Record how long one run of a stage took.
+
+    Args:
+        stage: The name of the stage, like `geocode`.
+        seconds: How long the stage took in seconds.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    with _LOCK:
+        timing: dict[str, float] | None = _STAGES.get(stage)
+        if timing is None:
+            timing = {'last': 0.0, 'sum': 0.0, 'count': 0, 'max': 0.0}
+            _STAGES[stage] = timing
+        timing['last'] = seconds
+        timing['sum'] += seconds
+        timing['count'] += 1
+        timing['max'] = max(timing['max'], seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time the code inside the with block as a run of the given stage.
+
+    The time is recorded even when the block raises an exception.
+
+    Args:
+        stage: The name of the stage, like `geocode`.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def reset() -> None:
+    """
+    Clear every counter and stage timing.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    with _LOCK:
+        _COUNTERS.clear()
+        _STAGES.clear()
+
+
+def snapshot() -> dict[str, Any]:
+    """
+    Get a copy of every counter and stage timing.
+
+    Args:
+        None
+
+    Returns:
+        A dictionary like this:
+        {
+            'timestamp': 1684926000.0,
+            'counters': {'owencraft_api_calls_total{endpoint="onecall"}': 1},
+            'stages': {
+                'weather': {'last': 0.2, 'sum': 0.2, 'count': 1, 'max': 0.2}
+            }
+        }
+
+    Raises:
+        None
+    """
+    with _LOCK:
+        counters: dict[str, float] = {
+            _format_name(name, labels): value
+            for (name, labels), value in sorted(_COUNTERS.items())
+        }
+        stages: dict[str, dict[str, float]] = {
+            stage: dict(timing) for stage, timing in sorted(_STAGES.items())
+        }
+
+    return {'timestamp': time.time(), 'counters': counters, 'stages': stages}
+
+
+def format_prometheus() -> str:
+    """
+    Format every counter and stage timing in the Prometheus text format.
+
+    Args:
+        None
+
+    Returns:
+        The metrics in str format.
+
+    Raises:
+        None
+    """
+    with _LOCK:
+        counters = sorted(_COUNTERS.items())
+        stages = sorted((k, dict(v)) for k, v in _STAGES.items())
+
+    lines: list[str] = []
+    typed: set[str] = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} counter')
+        lines.append(f'{_format_name(name, labels)} {value:g}')
+
+    if stages:
+        name = f'{PREFIX}_stage_duration_seconds'
+        lines.append(f'# TYPE {name} summary')
+        for stage, timing in stages:
+            labels = (('stage', stage),)
+            lines.append(
+                f'{_format_name(name + "_sum", labels)} {timing["sum"]:.6f}')
+            lines.append(
+                f'{_format_name(name + "_count", labels)} '
+                f'{timing["count"]:g}')
+
+        for suffix in ('last', 'max'):
+            gauge: str = f'{PREFIX}_stage_{suffix}_duration_seconds'
+            lines.append(f'# TYPE {gauge} gauge')
+            for stage, timing in stages:
+                lines.append(
+                    f'{_format_name(gauge, (("stage", stage),))} '
+                    f'{timing[suffix]:.6f}')
+
+    name = f'{PREFIX}_last_run_timestamp_seconds'
+    lines.append(f'# TYPE {name} gauge')
+    lines.append(f'{name} {time.time():.3f}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path: str) -> None:
+    """
+    Atomically write the metrics to a Prometheus textfile.
+
+    Args:
+        path: The path of the file, it should end in `.prom` for the
+        node_exporter textfile collector to pick it up.
+
+    Returns:
+        None
+
+    Raises:
+        OSError when the file cannot be written.
+    """
+    datastore.write_text(path, format_prometheus())
+
+
+def write_json(path: str) -> None:
+    """
+    Atomically write the metrics to a JSON summary file.
+
+    Args:
+        path: The path of the file in str format.
+
+    Returns:
+        None
+
+    Raises:
+        OSError when the file cannot be written.
+    """
+    datastore.write_json(path, snapshot())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+OpenWeatherMap API Wrapper for asyncio
+
+Async versions of the functions in openweathermap.py. Each call runs the
+blocking version on a worker thread with the module's shared, pooled
+session, so many locations can be looked up concurrently from one event
+loop without adding an async HTTP client dependency.
+"""
+import asyncio
+import threading
+from typing import Any, Callable
+
+from openweathermap import openweathermap
+
+DEFAULT_TIMEOUT: float = 15
+
+
+async def _call(
+        timeout: float,
+        func: Callable[..., Any],
+        *args: Any) -> Any:
+    """
+    Run a blocking call on a worker thread and wait for it for at most the
+    given timeout.
+
+    The call is given the same timeout for every request it sends, but its
+    retries can still outlast the wait. It runs on a daemon thread rather
+    than the loop's executor, so a call that is given up on is left to
+    finish on its own without holding up the interpreter's exit.
+
+    Args:
+        timeout: The number of seconds to wait for the call to finish.
+        func: The blocking function to call.
+        args: The arguments to pass to the function.
+
+    Returns:
+        What the function returns
+
+    Raises:
+        asyncio.TimeoutError when the call takes longer than the timeout
+        Any exception raised by the function
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+
+    def settle(result: Any, error: BaseException | None) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run() -> None:
+        result: Any = None
+        error: BaseException | None = None
+        try:
+            result = func(*args)
+        except BaseException as err:
+            error = err
+
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            # The loop was closed after giving up on the call
+            pass
+
+    threading.Thread(
+        target=run, name=getattr(func, '__name__', 'aio'), daemon=True
+    ).start()
+    return await asyncio.wait_for(future, timeout)
+
+
+async def call(
+        timeout: float,
+        func: Callable[..., Any],
+        *args: Any) -> Any:
+    """
+    Run any blocking function on a worker thread, so the caches and
+    fallbacks of the blocking code path can be shared with the event loop.
+
+    Args:
+        timeout: The number of seconds to wait for the call to finish.
+        func: The blocking function to call.
+        args: The arguments to pass to the function.
+
+    Returns:
+        What the function returns
+
+    Raises:
+        ValueError when the call takes longer than the timeout
+        Any exception raised by the function
+    """
+    try:
+        return await _call(timeout, func, *args)
+    except asyncio.TimeoutError as err:
+        raise ValueError(
+            f'{getattr(func, "__name__", "The call")} timed out!') from err
+
+
+async def get_lat_and_lon(
+        zipcode: int,
+        country_code: str,
+        timeout: float = DEFAULT_TIMEOUT) -> tuple[str, str]:
+    """
+    Retrieve the latitude and longitude from the given zipcode and
+    country code.
+
+    Args:
+        zipcode: An integer representing the location you want to check
+        the weather in.
+        country_code: A two letter string representing the country the
+        zipcode belongs to.
+        timeout: The number of seconds to wait for the call to finish.
+
+    Returns:
+        The same as openweathermap.get_lat_and_lon()
+
+    Raises:
+        The same as openweathermap.get_lat_and_lon()
+        ValueError when the call takes longer than the timeout
+    """
+    try:
+        return await _call(
+            timeout, openweathermap.get_lat_and_lon,
+            zipcode, country_code, None, timeout)
+    except asyncio.TimeoutError as err:
+        raise ValueError(
+            f'Geocoding {zipcode},{country_code} timed out!') from err
+
+
+async def get_current_weather(
+        lat: str, lon: str, timeout: float = DEFAULT_TIMEOUT) -> int:
+    """
+    Get the current weather for the given latitude and longitude.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        timeout: The number of seconds to wait for the call to finish.
+
+    Returns:
+        The same as openweathermap.get_current_weather()
+
+    Raises:
+        The same as openweathermap.get_current_weather()
+        ValueError when the call takes longer than the timeout
+    """
+    try:
+        return await _call(
+            timeout, openweathermap.get_current_weather,
+            lat, lon, None, timeout)
+    except asyncio.TimeoutError as err:
+        raise ValueError(
+            f'Getting the weather for {lat},{lon} timed out!') from err
+
+
+async def get_hourly_forecast(
+        lat: str,
+        lon: str,
+        timeout: float = DEFAULT_TIMEOUT) -> list[dict[str, Any]]:
+    """
+    Get the hourly forecast for the given latitude and longitude.
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        timeout: The number of seconds to wait for the call to finish.
+
+    Returns:
+        The same as openweathermap.get_hourly_forecast()
+
+    Raises:
+        The same as openweathermap.get_hourly_forecast()
+        ValueError when the call takes longer than the timeout
+    """
+    try:
+        return await _call(
+            timeout, openweathermap.get_hourly_forecast,
+            lat, lon, None, timeout)
+    except asyncio.TimeoutError as err:
+        raise ValueError(
+            f'Getting the forecast for {lat},{lon} timed out!') from err
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+GeocodeCache() class file
+
+GeocodeCache() is a class that keeps the latitude and longitude of every
+zipcode and country code that has been looked up in a file under data/, so
+the Geocoding API only has to be called once per location.
+"""
+import time
+
+from datastore import datastore
+
+DEFAULT_TTL: int = 90 * 24 * 60 * 60
+
+
+class GeocodeCache():
+    """
+    GeocodeCache() class file
+
+    GeocodeCache() is a class that keeps the latitude and longitude of every
+    zipcode and country code that has been looked up in a file under data/,
+    so the Geocoding API only has to be called once per location.
+    """
+
+    def __init__(
+            self, path: str | None = None, ttl: int = DEFAULT_TTL) -> None:
+        self._path = path or datastore.get_data_path('geocode.json')
+        self._ttl = ttl
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the cache file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def ttl(self) -> int:
+        """
+        Getter for the ttl property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a cached location stays valid for
+
+        Raises:
+            None
+        """
+        return self._ttl
+
+    def _key(self, zipcode: int, country_code: str) -> str:
+        """
+        Build the cache key for the given zipcode and country code
+
+        Args:
+            zipcode: The zipcode of the location
+            country_code: The two letter country code of the location
+
+        Returns:
+            The cache key in str format
+
+        Raises:
+            None
+        """
+        return f'{zipcode},{country_code.upper()}'
+
+    def get(self, zipcode: int, country_code: str) -> tuple[str, str] | None:
+        """
+        Look up a cached latitude and longitude
+
+        Args:
+            zipcode: The zipcode of the location
+            country_code: The two letter country code of the location
+
+        Returns:
+            A tuple of the Latitude and Longitude in str format, or None if
+            the location is not cached or the cached entry has expired
+
+        Raises:
+            None
+        """
+        entry = datastore.read_json(self.path).get(
+            self._key(zipcode, country_code))
+        if not isinstance(entry, dict):
+            return None
+
+        try:
+            if time.time() - float(entry['cached_at']) > self.ttl:
+                return None
+            return (str(entry['lat']), str(entry['lon']))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def set(self, zipcode: int, country_code: str, lat: str, lon: str) -> None:
+        """
+        Store the latitude and longitude of a location
+
+        Args:
+            zipcode: The zipcode of the location
+            country_code: The two letter country code of the location
+            lat: The latitude in str format
+            lon: The longitude in str format
+
+        Returns:
+            None
+
+        Raises:
+            OSError when the cache file cannot be written
+        """
+        with datastore.update_json(self.path) as data:
+            data[self._key(zipcode, country_code)] = {
+                'lat': lat,
+                'lon': lon,
+                'cached_at': time.time()
+            }
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Offline geocoding index
+
+These functions build and query an SQLite index of postal codes from a bulk
+GeoNames postal code dump (https://download.geonames.org/export/zip/), so
+zipcodes can be turned into a latitude and longitude without calling the
+Geocoding API. Build the index with:
+
+    python3 -m openweathermap.geoindex allCountries.txt [data/postal.sqlite]
+"""
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+from datastore import datastore
+
+# Columns of the GeoNames postal code dump
+COUNTRY_COLUMN: int = 0
+POSTAL_CODE_COLUMN: int = 1
+LATITUDE_COLUMN: int = 9
+LONGITUDE_COLUMN: int = 10
+
+_CONNECTIONS: dict[str, tuple[sqlite3.Connection, tuple[int, int]]] = {}
+_LOCK: threading.Lock = threading.Lock()
+
+
+def get_index_path() -> str:
+    """
+    Return the default path of the index.
+
+    Args:
+        None
+
+    Returns:
+        The path of the index in str format.
+
+    Raises:
+        None
+    """
+    return datastore.get_data_path('postal.sqlite')
+
+
+def normalize_postal_code(postal_code: str | int) -> str:
+    """
+    Normalise a postal code so the same code always looks the same.
+
+    Zipcodes are handled as integers elsewhere, which drops leading zeros,
+    so leading zeros are stripped from numeric codes here too.
+
+    Args:
+        postal_code: The postal code to normalise.
+
+    Returns:
+        The normalised postal code in str format.
+
+    Raises:
+        None
+    """
+    code: str = str(postal_code).strip().upper().replace(' ', '')
+    if code.isdigit():
+        return code.lstrip('0') or '0'
+
+    return code
+
+
+def build_index(tsv_path: str, db_path: str | None = None) -> int:
+    """
+    Build the index from a GeoNames postal code dump.
+
+    The index is written to a temporary file and then moved over the old
+    one, so lookups running at the same time never see a partial index.
+    When a postal code appears more than once, the first row wins.
+
+    Args:
+        tsv_path: The path of the tab separated GeoNames dump.
+        db_path: The path to write the index to, the default path is used
+        if not given.
+
+    Returns:
+        The number of postal codes in the index.
+
+    Raises:
+        OSError when the dump cannot be read or the index cannot be written.
+    """
+    db_path = db_path or get_index_path()
+    directory: str = os.path.dirname(db_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f'.{os.path.basename(db_path)}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        connection: sqlite3.Connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute(
+                'CREATE TABLE postal_codes ('
+                'country_code TEXT NOT NULL, '
+                'postal_code TEXT NOT NULL, '
+                'lat TEXT NOT NULL, '
+                'lon TEXT NOT NULL, '
+                'PRIMARY KEY (country_code, postal_code)) WITHOUT ROWID')
+
+            with open(tsv_path, 'r', encoding='utf-8', newline='') as file:
+                rows = (
+                    (
+                        row[COUNTRY_COLUMN].strip().upper(),
+                        normalize_postal_code(row[POSTAL_CODE_COLUMN]),
+                        row[LATITUDE_COLUMN].strip(),
+                        row[LONGITUDE_COLUMN].strip()
+                    )
+                    for row in csv.reader(
+                        file, delimiter='\t', quoting=csv.QUOTE_NONE)
+                    if len(row) > LONGITUDE_COLUMN
+                    and row[LATITUDE_COLUMN].strip()
+                    and row[LONGITUDE_COLUMN].strip()
+                )
+                connection.executemany(
+                    'INSERT OR IGNORE INTO postal_codes VALUES (?, ?, ?, ?)',
+                    rows)
+
+            connection.commit()
+            count: int = connection.execute(
+                'SELECT COUNT(*) FROM postal_codes').fetchone()[0]
+        finally:
+            connection.close()
+
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    return count
+
+
+def _get_connection(db_path: str) -> sqlite3.Connection | None:
+    """
+    Get a shared read-only connection to the index, the lock must be held.
+
+    Args:
+        db_path: The path of the index.
+
+    Returns:
+        The connection, or None if the index doesn't exist.
+
+    Raises:
+        None
+    """
+    try:
+        stat: os.stat_result = os.stat(db_path)
+    except OSError:
+        return None
+
+    # A rebuilt index is a new file, so reconnect when it changes
+    version: tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+    cached = _CONNECTIONS.get(db_path)
+    if cached is not None:
+        if cached[1] == version:
+            return cached[0]
+        cached[0].close()
+        del _CONNECTIONS[db_path]
+
+    try:
+        connection: sqlite3.Connection = sqlite3.connect(
+            f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+    except sqlite3.Error:
+        return None
+
+    _CONNECTIONS[db_path] = (connection, version)
+    return connection
+
+
+def lookup(
+        zipcode: int | str,
+        country_code: str,
+        db_path: str | None = None) -> tuple[str, str] | None:
+    """
+    Look up the latitude and longitude of a postal code in the index.
+
+    Args:
+        zipcode: The zipcode of the location.
+        country_code: The two letter country code of the location.
+        db_path: The path of the index, the default path is used if not
+        given.
+
+    Returns:
+        A tuple of the Latitude and Longitude in str format, or None if the
+        index doesn't exist or doesn't have the postal code.
+
+    Raises:
+        None
+    """
+    db_path = db_path or get_index_path()
+    with _LOCK:
+        connection: sqlite3.Connection | None = _get_connection(db_path)
+        if connection is None:
+            return None
+
+        try:
+            row = connection.execute(
+                'SELECT lat, lon FROM postal_codes '
+                'WHERE country_code = ? AND postal_code = ?',
+                (country_code.strip().upper(),
+                 normalize_postal_code(zipcode))).fetchone()
+        except sqlite3.Error:
+            return None
+
+    if row is None:
+        return None
+
+    return (row[0], row[1])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print(f'Usage: {sys.argv[0]} <geonames.txt> [index.sqlite]')
+        sys.exit(1)
+
+    total: int = build_index(
+        sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    print(f'Indexed {total} postal codes')
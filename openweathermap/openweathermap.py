@@ -4,17 +4,280 @@ OpenWeatherMap API Wrapper
 
 These functions are used to interact with the OpenWeatherMap One Call 3.0
 REST API. Docs can be found here: https://openweathermap.org/api/one-call-3
+
+requests (and urllib3 with it) is only imported when the first session is
+created, so starting the program doesn't pay for it on runs that never
+call the API. Every requests exception is an OSError, which is what these
+functions catch, so they work the same with the stdlib transport from
+transport.py.
 """
 import logging
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
-import requests
+from metrics import metrics
+from openweathermap.quota import QuotaBudget, QuotaExceededError
+from singleflight.singleflight import SingleFlight
 
 SCHEME: str = 'https'
 DOMAIN: str = 'api.openweathermap.org'
 BASE_URL: str = f'{SCHEME}://{DOMAIN}'
-LOGGER = logging.getLogger('owencraftWeater')
+LOGGER = logging.getLogger('owencraftWeather')
+DEFAULT_TIMEOUT: float = 10
+
+if TYPE_CHECKING:
+    import requests
+
+RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+# A Retry-After longer than this isn't waited for, the next run tries again
+MAX_RETRY_AFTER: float = 10
+# Endpoints that are paid for out of the daily One Call allowance
+METERED_ENDPOINTS: tuple[str, ...] = ('onecall',)
+_SESSION: 'requests.Session | None' = None
+_QUOTA: QuotaBudget | None = None
+_SINGLE_FLIGHT: SingleFlight | None = None
+
+
+def create_session() -> 'requests.Session':
+    """
+    Create a requests Session with connection pooling and retries.
+
+    Connections to the API are kept alive between calls, and transient
+    failures (connection errors and 429/5xx responses) are retried with
+    jittered exponential backoff that honors the Retry-After header. When
+    the server asks to wait longer than MAX_RETRY_AFTER, its response is
+    returned right away instead.
+
+    Args:
+        None
+
+    Returns:
+        A new instance of requests.Session.
+
+    Raises:
+        None
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    from openweathermap.retry import CountingRetry
+
+    retry: CountingRetry = CountingRetry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        backoff_max=30,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=10, max_retries=retry)
+
+    session: requests.Session = requests.Session()
+    session.mount(f'{SCHEME}://', adapter)
+    return session
+
+
+def get_session() -> 'requests.Session':
+    """
+    Get the module's shared requests Session, creating it on first use.
+
+    Args:
+        None
+
+    Returns:
+        The shared instance of requests.Session.
+
+    Raises:
+        None
+    """
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = create_session()
+    return _SESSION
+
+
+def set_session(session: 'requests.Session | None') -> None:
+    """
+    Replace the module's shared requests Session.
+
+    Args:
+        session: The requests.Session (or any object with the same get()
+        method, like transport.HttpClientSession) to use for all API calls,
+        or None to have a new one created on the next call.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _SESSION
+    _SESSION = session
+
+
+def get_quota() -> QuotaBudget | None:
+    """
+    Get the module's shared daily API budget.
+
+    Args:
+        None
+
+    Returns:
+        The shared instance of QuotaBudget, or None if calls aren't
+        budgeted.
+
+    Raises:
+        None
+    """
+    return _QUOTA
+
+
+def set_quota(quota: QuotaBudget | None) -> None:
+    """
+    Replace the module's shared daily API budget.
+
+    Args:
+        quota: The QuotaBudget to spend metered calls from, or None to stop
+        budgeting calls.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _QUOTA
+    _QUOTA = quota
+
+
+def get_single_flight() -> SingleFlight | None:
+    """
+    Get the module's shared request coalescer.
+
+    Args:
+        None
+
+    Returns:
+        The shared instance of SingleFlight, or None if requests aren't
+        coalesced.
+
+    Raises:
+        None
+    """
+    return _SINGLE_FLIGHT
+
+
+def set_single_flight(single_flight: SingleFlight | None) -> None:
+    """
+    Replace the module's shared request coalescer.
+
+    Args:
+        single_flight: The SingleFlight to coalesce lookups of the same
+        location through, or None to stop coalescing them.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _SINGLE_FLIGHT
+    _SINGLE_FLIGHT = single_flight
+
+
+def _coalesce(
+        key: str,
+        fetch: Callable[[], Any],
+        share: Callable[[Any], bool]) -> Any:
+    """
+    Run a fetch through the shared request coalescer, if there is one.
+
+    Args:
+        key: The key of the fetch, like `current:40.7,-74.0`.
+        fetch: The function doing the fetch.
+        share: A function that returns False for results that shouldn't be
+        shared with other processes.
+
+    Returns:
+        The result of the fetch, or of the same fetch done by another
+        caller at the same time.
+
+    Raises:
+        Any exception raised by the fetch
+    """
+    single_flight: SingleFlight | None = get_single_flight()
+    if single_flight is None:
+        return fetch()
+
+    return single_flight.do(key, fetch, share)
+
+
+def _get(
+        endpoint: str,
+        url: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> 'requests.Response':
+    """
+    Send a GET request to the API and record it in the run metrics.
+
+    Args:
+        endpoint: The name of the endpoint for the metrics, like `onecall`.
+        url: The full URL to request.
+        session: An optional requests.Session to use instead of the
+        module's shared one.
+        timeout: The number of seconds to wait for the server.
+
+    Returns:
+        The requests.Response from the API.
+
+    Raises:
+        QuotaExceededError when the endpoint is metered and today's budget
+        is spent.
+        The same as requests.Session.get()
+    """
+    labels: dict[str, str] = {'endpoint': endpoint}
+    quota: QuotaBudget | None = get_quota()
+    if quota is not None and endpoint in METERED_ENDPOINTS:
+        if not quota.acquire():
+            metrics.increment('api_quota_exhausted_total', labels)
+            raise QuotaExceededError(
+                f'The daily budget of {quota.daily_limit} API calls is spent!')
+        # The budget is shared with other processes, this counts our share
+        metrics.increment('api_quota_calls_total')
+
+    metrics.increment('api_calls_total', labels)
+    try:
+        with metrics.span(f'api_{endpoint}'):
+            response: requests.Response = (session or get_session()).get(
+                url=url, timeout=timeout)
+    except OSError:
+        metrics.increment('api_errors_total', labels)
+        raise
+
+    if response.status_code != 200:
+        metrics.increment('api_errors_total', labels)
+
+    return response
+
+
+def _decode(response: 'requests.Response') -> Any:
+    """
+    Decode the JSON body of a response and time it in the run metrics.
+
+    Args:
+        response: The requests.Response from the API.
+
+    Returns:
+        The decoded JSON body.
+
+    Raises:
+        The same as requests.Response.json()
+    """
+    with metrics.span('json_decode'):
+        return response.json()
 
 
 def get_api_key() -> str:
@@ -37,11 +300,20 @@ def get_api_key() -> str:
     return api_key
 
 
-def get_lat_and_lon(zipcode: int, country_code: str) -> tuple[str, str]:
+def get_lat_and_lon(
+        zipcode: int,
+        country_code: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> tuple[str, str]:
     """
     Retrieve the latitude and longitude from the given zipcode and
     country code.
 
+    The offline geocoding index is checked first when it has been built,
+    and the Geocoding API is only called when the zipcode isn't in it.
+    Concurrent lookups of the same zipcode are coalesced into one call when
+    a SingleFlight has been set.
+
     https://openweathermap.org/api/geocoding-api#direct_zip
 
     Args:
@@ -49,6 +321,9 @@ def get_lat_and_lon(zipcode: int, country_code: str) -> tuple[str, str]:
         the weather in.
         country_code: A two letter string representing the country the
         zipcode belongs to.
+        session: An optional requests.Session to use instead of the
+        module's shared one.
+        timeout: The number of seconds to wait for the server.
 
     Returns:
         A tuple representing the Latitude and Longitude matching the
@@ -59,8 +334,41 @@ def get_lat_and_lon(zipcode: int, country_code: str) -> tuple[str, str]:
         ValueError when the request encounters an HTTPError
         ValueError when the request encounters a ReadTimeout
         ValueError when the request encounters a ConnectionError
+        ValueError when the request runs out of retries
         KeyError if the `lat` and `lon` cannot be found in the returned data.
     """
+    from openweathermap import geoindex
+
+    local: tuple[str, str] | None = geoindex.lookup(zipcode, country_code)
+    if local:
+        metrics.increment('cache_hits_total', {'cache': 'geoindex'})
+        return local
+
+    lat, lon = _coalesce(
+        f'geocode:{zipcode},{country_code.upper()}',
+        lambda: _fetch_lat_and_lon(
+            zipcode, country_code, session, timeout),
+        lambda result: bool(result[0] and result[1]))
+    return (lat, lon)
+
+
+def _fetch_lat_and_lon(
+        zipcode: int,
+        country_code: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> tuple[str, str]:
+    """
+    Call the Geocoding API for get_lat_and_lon().
+
+    Args:
+        The same as get_lat_and_lon()
+
+    Returns:
+        The same as get_lat_and_lon()
+
+    Raises:
+        The same as get_lat_and_lon()
+    """
     try:
         api_key: str = get_api_key()
     except ValueError as err:
@@ -70,35 +378,43 @@ def get_lat_and_lon(zipcode: int, country_code: str) -> tuple[str, str]:
     url: str = f'{BASE_URL}/{uri}'
 
     try:
-        response: requests.Response = requests.get(url=url, timeout=10)
+        response: requests.Response = _get(
+            'geocode', url, session, timeout)
         if response.status_code != 200:
             LOGGER.error(
                 '[ERR] %s :: %s' %
                 (response.status_code, response.text))
             return ('', '')
 
-        data: dict[str, Any] = response.json()
+        data: dict[str, Any] = _decode(response)
         lat: str = str(data['lat'])
         lon: str = str(data['lon'])
         return (lat, lon)
-    except (
-            requests.exceptions.HTTPError,
-            requests.exceptions.ReadTimeout,
-            requests.exceptions.ConnectionError) as err:
+    except OSError as err:
         raise ValueError(err) from err
     except KeyError as err:
         raise KeyError(err) from err
 
 
-def get_current_weather(lat: str, lon: str) -> int:
+def get_current_weather(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> int:
     """
     Get the current weather for the given latitude and longitude.
 
+    Concurrent lookups of the same location are coalesced into one call
+    when a SingleFlight has been set.
+
     https://openweathermap.org/api/one-call-3#current
 
     Args:
         lat: The latitude in str format.
         lon: The longitude in str format.
+        session: An optional requests.Session to use instead of the
+        module's shared one.
+        timeout: The number of seconds to wait for the server.
 
     Returns:
         An ID representing the current weather.
@@ -108,8 +424,33 @@ def get_current_weather(lat: str, lon: str) -> int:
         ValueError when the request encounters an HTTPError
         ValueError when the request encounters a ReadTimeout
         ValueError when the request encounters a ConnectionError
+        ValueError when the request runs out of retries
+        QuotaExceededError when the daily API budget is spent
         KeyError if the `id` cannot be found in the returned data.
     """
+    return _coalesce(
+        f'current:{lat},{lon}',
+        lambda: _fetch_current_weather(lat, lon, session, timeout),
+        lambda weather_id: weather_id != -1)
+
+
+def _fetch_current_weather(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> int:
+    """
+    Call the One Call API for get_current_weather().
+
+    Args:
+        The same as get_current_weather()
+
+    Returns:
+        The same as get_current_weather()
+
+    Raises:
+        The same as get_current_weather()
+    """
     try:
         api_key: str = get_api_key()
     except ValueError as err:
@@ -121,19 +462,217 @@ def get_current_weather(lat: str, lon: str) -> int:
     url: str = f'{BASE_URL}/{uri}'
 
     try:
-        response: requests.Response = requests.get(url=url, timeout=10)
+        response: requests.Response = _get(
+            'onecall', url, session, timeout)
         if response.status_code != 200:
             LOGGER.error(
                 '[ERR] %s :: %s' %
                 (response.status_code, response.text))
             return -1
 
-        data: dict[str, Any] = response.json()
+        data: dict[str, Any] = _decode(response)
         return data['current']['weather'][0]['id']
-    except (
-            requests.exceptions.HTTPError,
-            requests.exceptions.ReadTimeout,
-            requests.exceptions.ConnectionError) as err:
+    except OSError as err:
+        raise ValueError(err) from err
+    except KeyError as err:
+        raise KeyError(err) from err
+
+
+def get_minutely_weather(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> dict[str, Any]:
+    """
+    Get the current weather and the minute by minute precipitation for the
+    next hour for the given latitude and longitude, in a single call.
+
+    Concurrent lookups of the same location are coalesced into one call
+    when a SingleFlight has been set.
+
+    https://openweathermap.org/api/one-call-3#current
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        session: An optional requests.Session to use instead of the
+        module's shared one.
+        timeout: The number of seconds to wait for the server.
+
+    Returns:
+        A dictionary like this:
+        {
+            'id': 500, # the current weather ID, -1 if the API errors
+            'minutely': [
+                {
+                    'dt': 1684926000, # start of the minute
+                    'precipitation': 0.5 # in mm/h
+                },
+                ...
+            ]
+        }
+        The minutely list is empty where the API has no minutely data.
+
+    Raises:
+        ValueError when the environment variable for the API Key is not set.
+        ValueError when the request encounters an HTTPError
+        ValueError when the request encounters a ReadTimeout
+        ValueError when the request encounters a ConnectionError
+        ValueError when the request runs out of retries
+        QuotaExceededError when the daily API budget is spent
+        KeyError if the `id` cannot be found in the returned data.
+    """
+    return _coalesce(
+        f'minutely:{lat},{lon}',
+        lambda: _fetch_minutely_weather(lat, lon, session, timeout),
+        lambda data: data['id'] != -1)
+
+
+def _fetch_minutely_weather(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> dict[str, Any]:
+    """
+    Call the One Call API for get_minutely_weather().
+
+    Args:
+        The same as get_minutely_weather()
+
+    Returns:
+        The same as get_minutely_weather()
+
+    Raises:
+        The same as get_minutely_weather()
+    """
+    try:
+        api_key: str = get_api_key()
+    except ValueError as err:
+        raise ValueError(err) from err
+
+    parts: list[str] = ['data/3.0/onecall?lat=', lat, '&lon=', lon,
+                        '&exclude=hourly,daily,alerts&appid=', api_key]
+    uri: str = ''.join(parts)
+    url: str = f'{BASE_URL}/{uri}'
+
+    try:
+        response: requests.Response = _get(
+            'onecall', url, session, timeout)
+        if response.status_code != 200:
+            LOGGER.error(
+                '[ERR] %s :: %s' %
+                (response.status_code, response.text))
+            return {'id': -1, 'minutely': []}
+
+        data: dict[str, Any] = _decode(response)
+        return {
+            'id': data['current']['weather'][0]['id'],
+            'minutely': [
+                {
+                    'dt': int(minute['dt']),
+                    'precipitation': float(minute.get('precipitation', 0))
+                }
+                for minute in data.get('minutely', [])
+            ]
+        }
+    except OSError as err:
+        raise ValueError(err) from err
+    except KeyError as err:
+        raise KeyError(err) from err
+
+
+def get_hourly_forecast(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> list[dict[str, Any]]:
+    """
+    Get the hourly forecast for the next 48 hours for the given latitude
+    and longitude.
+
+    Concurrent lookups of the same location are coalesced into one call
+    when a SingleFlight has been set.
+
+    https://openweathermap.org/api/one-call-3#current
+
+    Args:
+        lat: The latitude in str format.
+        lon: The longitude in str format.
+        session: An optional requests.Session to use instead of the
+        module's shared one.
+        timeout: The number of seconds to wait for the server.
+
+    Returns:
+        A list of dictionaries ordered by time, one per hour, like this:
+        {
+            'dt': 1684926000, # start of the hour as a unix timestamp
+            'id': 803, # the weather ID for that hour
+            'pop': 0.2 # the probability of precipitation from 0 to 1
+        }
+        The list is empty if the API returns an error.
+
+    Raises:
+        ValueError when the environment variable for the API Key is not set.
+        ValueError when the request encounters an HTTPError
+        ValueError when the request encounters a ReadTimeout
+        ValueError when the request encounters a ConnectionError
+        ValueError when the request runs out of retries
+        QuotaExceededError when the daily API budget is spent
+        KeyError if the `dt` or `id` cannot be found in the returned data.
+    """
+    return _coalesce(
+        f'hourly:{lat},{lon}',
+        lambda: _fetch_hourly_forecast(lat, lon, session, timeout),
+        bool)
+
+
+def _fetch_hourly_forecast(
+        lat: str,
+        lon: str,
+        session: 'requests.Session | None' = None,
+        timeout: float = DEFAULT_TIMEOUT) -> list[dict[str, Any]]:
+    """
+    Call the One Call API for get_hourly_forecast().
+
+    Args:
+        The same as get_hourly_forecast()
+
+    Returns:
+        The same as get_hourly_forecast()
+
+    Raises:
+        The same as get_hourly_forecast()
+    """
+    try:
+        api_key: str = get_api_key()
+    except ValueError as err:
+        raise ValueError(err) from err
+
+    parts: list[str] = ['data/3.0/onecall?lat=', lat, '&lon=', lon,
+                        '&exclude=current,minutely,daily,alerts&appid=',
+                        api_key]
+    uri: str = ''.join(parts)
+    url: str = f'{BASE_URL}/{uri}'
+
+    try:
+        response: requests.Response = _get(
+            'onecall', url, session, timeout)
+        if response.status_code != 200:
+            LOGGER.error(
+                '[ERR] %s :: %s' %
+                (response.status_code, response.text))
+            return []
+
+        data: dict[str, Any] = _decode(response)
+        return [
+            {
+                'dt': int(hour['dt']),
+                'id': hour['weather'][0]['id'],
+                'pop': float(hour.get('pop', 0))
+            }
+            for hour in data['hourly']
+        ]
+    except OSError as err:
         raise ValueError(err) from err
     except KeyError as err:
         raise KeyError(err) from err
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+QuotaBudget() class file
+
+QuotaBudget() is a class that tracks how many calls have been made against
+the daily One Call allowance in a file under data/. Every process shares
+the same file under a lock, so overlapping cron jobs and fleet runs all
+spend from one budget. OpenWeatherMap resets the allowance at midnight UTC,
+and so does the budget.
+"""
+import datetime
+import time
+
+from datastore import datastore
+
+# Below this share of the daily limit, polling is stretched out
+DEFAULT_LOW_WATERMARK: float = 0.2
+
+
+class QuotaExceededError(ValueError):
+    """
+    QuotaExceededError() class file
+
+    QuotaExceededError() is raised instead of making an API call once the
+    daily budget is spent.
+    """
+
+
+class QuotaBudget():
+    """
+    QuotaBudget() class file
+
+    QuotaBudget() is a class that tracks how many calls have been made
+    against the daily One Call allowance in a file under data/ that every
+    process shares.
+    """
+
+    def __init__(
+            self,
+            daily_limit: int,
+            path: str | None = None,
+            low_watermark: float = DEFAULT_LOW_WATERMARK) -> None:
+        if daily_limit <= 0:
+            raise ValueError('The daily limit must be greater than zero!')
+
+        if not 0 <= low_watermark <= 1:
+            raise ValueError('The low watermark must be between 0 and 1!')
+
+        self._daily_limit = daily_limit
+        self._path = path or datastore.get_data_path('api_quota.json')
+        self._low_watermark = low_watermark
+
+    @property
+    def daily_limit(self) -> int:
+        """
+        Getter for the daily_limit property
+
+        Args:
+            None
+
+        Returns:
+            The number of calls allowed per day
+
+        Raises:
+            None
+        """
+        return self._daily_limit
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the budget file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def low_watermark(self) -> float:
+        """
+        Getter for the low_watermark property
+
+        Args:
+            None
+
+        Returns:
+            The share of the daily limit below which polling is stretched
+
+        Raises:
+            None
+        """
+        return self._low_watermark
+
+    def _today(self) -> str:
+        """
+        Get the current day the allowance is counted against
+
+        Args:
+            None
+
+        Returns:
+            The current UTC date in YYYY-MM-DD format
+
+        Raises:
+            None
+        """
+        return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+    def _used(self, data: dict) -> int:
+        """
+        Get how many calls have been used today from the budget file
+
+        Args:
+            data: The contents of the budget file
+
+        Returns:
+            The number of calls used today, 0 if the file is from a
+            previous day
+
+        Raises:
+            None
+        """
+        if data.get('day') != self._today():
+            return 0
+
+        try:
+            return max(0, int(data.get('used', 0)))
+        except (TypeError, ValueError):
+            return 0
+
+    def used(self) -> int:
+        """
+        Get how many calls have been used today by every process
+
+        Args:
+            None
+
+        Returns:
+            The number of calls used today
+
+        Raises:
+            None
+        """
+        return self._used(datastore.read_json(self.path))
+
+    def remaining(self) -> int:
+        """
+        Get how many calls are left for today
+
+        Args:
+            None
+
+        Returns:
+            The number of calls left today
+
+        Raises:
+            None
+        """
+        return max(0, self.daily_limit - self.used())
+
+    def acquire(self, cost: int = 1) -> bool:
+        """
+        Spend calls from today's budget if there are enough left
+
+        Args:
+            cost: The number of calls about to be made
+
+        Returns:
+            True if the calls were spent and can be made, False if there
+            aren't enough left
+
+        Raises:
+            OSError when the budget file cannot be written
+        """
+        with datastore.update_json(self.path) as data:
+            used: int = self._used(data)
+            if used + cost > self.daily_limit:
+                return False
+
+            data['day'] = self._today()
+            data['used'] = used + cost
+
+        return True
+
+    def seconds_until_reset(self) -> float:
+        """
+        Get how long until the allowance resets at midnight UTC
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds until the next reset
+
+        Raises:
+            None
+        """
+        now: float = time.time()
+        return 86400 - (now % 86400)
+
+    def stretch_interval(
+            self, interval: float, calls_per_run: float = 1) -> float:
+        """
+        Stretch a polling interval so the budget lasts until the reset
+
+        While more than the low watermark of the budget is left the
+        interval is returned unchanged. Below it, the interval is stretched
+        so the calls that are left are spread evenly over the rest of the
+        day, and once the budget is spent polling waits for the reset.
+
+        Args:
+            interval: The normal number of seconds between runs
+            calls_per_run: How many calls a run makes
+
+        Returns:
+            The number of seconds to wait before the next run
+
+        Raises:
+            None
+        """
+        remaining: int = self.remaining()
+        if remaining > self.daily_limit * self.low_watermark:
+            return interval
+
+        until_reset: float = self.seconds_until_reset()
+        if remaining <= 0:
+            return max(interval, until_reset)
+
+        return max(interval, until_reset * max(calls_per_run, 1) / remaining)
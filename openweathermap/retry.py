@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+CountingRetry() class file
+
+CountingRetry() is a urllib3 Retry that counts every retry it decides to
+make in the run metrics, so the retries hidden inside the requests session
+show up next to the API calls, and that gives up instead of honoring a
+Retry-After longer than MAX_RETRY_AFTER. It lives in its own module so
+urllib3 is only imported once a requests session is actually created.
+"""
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from metrics import metrics
+from openweathermap.openweathermap import MAX_RETRY_AFTER
+
+
+class CountingRetry(Retry):
+    """
+    CountingRetry() class file
+
+    CountingRetry() is a urllib3 Retry that counts every retry it decides
+    to make in the run metrics, and gives up on a Retry-After that is too
+    long to wait for.
+    """
+
+    def increment(self, *args, **kwargs) -> Retry:
+        """
+        Count the retry, unless the server asks to wait too long for it
+
+        A Retry-After of an hour would block a cron run, or the daemon's
+        only thread, for that long. Running out of retries makes the
+        session return the response as is, so the run fails over to the
+        cached weather or the next run instead.
+
+        Args:
+            The same as Retry.increment()
+
+        Returns:
+            The Retry to use for the next attempt
+
+        Raises:
+            MaxRetryError when the retries run out or the server asks to
+            wait longer than MAX_RETRY_AFTER
+        """
+        response = kwargs.get('response')
+        if response is not None and self.respect_retry_after_header:
+            retry_after: float | None = self.get_retry_after(response)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                raise MaxRetryError(
+                    kwargs.get('_pool'),
+                    kwargs.get('url', args[1] if len(args) > 1 else None),
+                    ResponseError(
+                        f'Retry-After of {retry_after:.0f}s is too long'))
+
+        new_retry: Retry = super().increment(*args, **kwargs)
+        metrics.increment('api_retries_total')
+        return new_retry
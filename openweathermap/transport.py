@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+HttpClientSession() class file
+
+HttpClientSession() is a small stand-in for requests.Session built on the
+standard library's http.client. It only does what the API wrapper needs,
+keep-alive GET requests with retries, so a run that makes a couple of API
+calls doesn't have to import requests, urllib3, idna, charset-normalizer
+and certifi first. Pass an instance to openweathermap.set_session() to use
+it.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from metrics import metrics
+from openweathermap.openweathermap import MAX_RETRY_AFTER, RETRY_STATUSES
+
+USER_AGENT: str = 'owencraft-weather'
+
+
+class HttpClientResponse():
+    """
+    HttpClientResponse() class file
+
+    HttpClientResponse() holds a fully read response, with the parts of
+    requests.Response that the API wrapper uses.
+    """
+
+    def __init__(
+            self,
+            status_code: int,
+            headers: dict[str, str],
+            content: bytes) -> None:
+        self._status_code = status_code
+        self._headers = headers
+        self._content = content
+
+    @property
+    def status_code(self) -> int:
+        """
+        Getter for the status_code property
+
+        Args:
+            None
+
+        Returns:
+            The HTTP status code of the response
+
+        Raises:
+            None
+        """
+        return self._status_code
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """
+        Getter for the headers property
+
+        Args:
+            None
+
+        Returns:
+            The response headers with lowercase names
+
+        Raises:
+            None
+        """
+        return self._headers
+
+    @property
+    def content(self) -> bytes:
+        """
+        Getter for the content property
+
+        Args:
+            None
+
+        Returns:
+            The raw response body
+
+        Raises:
+            None
+        """
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """
+        Getter for the text property
+
+        Args:
+            None
+
+        Returns:
+            The response body decoded with the charset from the
+            Content-Type header, or UTF-8 if there isn't one
+
+        Raises:
+            None
+        """
+        charset: str = 'utf-8'
+        for param in self.headers.get('content-type', '').split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"')
+
+        try:
+            return self.content.decode(charset, 'replace')
+        except LookupError:
+            return self.content.decode('utf-8', 'replace')
+
+    def json(self) -> Any:
+        """
+        Decode the response body as JSON
+
+        Args:
+            None
+
+        Returns:
+            The decoded JSON body
+
+        Raises:
+            ValueError when the body is not valid JSON
+        """
+        return json.loads(self.text)
+
+
+class HttpClientSession():
+    """
+    HttpClientSession() class file
+
+    HttpClientSession() is a small stand-in for requests.Session built on
+    the standard library's http.client. Idle connections are kept per host
+    and reused, and connection errors and 429/5xx responses are retried
+    with jittered exponential backoff that honors the Retry-After header,
+    unless it is longer than MAX_RETRY_AFTER.
+    """
+
+    def __init__(
+            self,
+            retries: int = 3,
+            backoff_factor: float = 0.5,
+            backoff_jitter: float = 0.5,
+            backoff_max: float = 30) -> None:
+        if retries < 0:
+            raise ValueError('The number of retries cannot be negative!')
+
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._backoff_jitter = backoff_jitter
+        self._backoff_max = backoff_max
+        self._idle: dict[
+            tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def retries(self) -> int:
+        """
+        Getter for the retries property
+
+        Args:
+            None
+
+        Returns:
+            How many times a failed request is retried
+
+        Raises:
+            None
+        """
+        return self._retries
+
+    def _acquire(
+            self,
+            scheme: str,
+            netloc: str,
+            timeout: float) -> http.client.HTTPConnection:
+        """
+        Take an idle connection to the host, or open a new one
+
+        Args:
+            scheme: Either http or https
+            netloc: The host and optional port to connect to
+            timeout: The socket timeout in seconds
+
+        Returns:
+            A connection to the host
+
+        Raises:
+            None
+        """
+        with self._lock:
+            idle: list[http.client.HTTPConnection] = self._idle.get(
+                (scheme, netloc), [])
+            connection: http.client.HTTPConnection | None = (
+                idle.pop() if idle else None)
+
+        if connection is None:
+            if scheme == 'https':
+                connection = http.client.HTTPSConnection(
+                    netloc, timeout=timeout)
+            else:
+                connection = http.client.HTTPConnection(
+                    netloc, timeout=timeout)
+
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+
+        return connection
+
+    def _release(
+            self,
+            scheme: str,
+            netloc: str,
+            connection: http.client.HTTPConnection) -> None:
+        """
+        Keep a connection around for the next request to the same host
+
+        Args:
+            scheme: Either http or https
+            netloc: The host and optional port of the connection
+            connection: The connection, with its last response fully read
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def _get_backoff(
+            self, attempt: int, retry_after: str | None) -> float | None:
+        """
+        Work out how long to wait before the next attempt
+
+        Args:
+            attempt: How many attempts have failed so far
+            retry_after: The Retry-After header of the last response, if any
+
+        Returns:
+            The number of seconds to wait, at most backoff_max, or None if
+            the server asks to wait longer than MAX_RETRY_AFTER, which isn't
+            worth blocking the run for
+
+        Raises:
+            None
+        """
+        if retry_after:
+            try:
+                delay: float = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(
+                        retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = -1
+
+            if delay > MAX_RETRY_AFTER:
+                return None
+            if delay >= 0:
+                return min(delay, self._backoff_max)
+
+        delay = self._backoff_factor * (2 ** (attempt - 1))
+        delay += random.uniform(0, self._backoff_jitter)
+        return min(delay, self._backoff_max)
+
+    def get(self, url: str, timeout: float = 10) -> HttpClientResponse:
+        """
+        Send a GET request and read the whole response
+
+        Args:
+            url: The full URL to request
+            timeout: The socket timeout in seconds
+
+        Returns:
+            The response. When the retries run out on a 429 or 5xx status,
+            the last response is returned like requests does with
+            raise_on_status=False.
+
+        Raises:
+            ValueError when the URL is not http or https
+            ConnectionError when the request still fails after every retry
+        """
+        parts: urllib.parse.SplitResult = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'Unsupported URL: {url}')
+
+        target: str = parts.path or '/'
+        if parts.query:
+            target = f'{target}?{parts.query}'
+        headers: dict[str, str] = {
+            'Accept': 'application/json',
+            'User-Agent': USER_AGENT
+        }
+
+        attempt: int = 0
+        while True:
+            attempt += 1
+            connection: http.client.HTTPConnection = self._acquire(
+                parts.scheme, parts.netloc, timeout)
+            reused: bool = connection.sock is not None
+            try:
+                connection.request('GET', target, headers=headers)
+                raw: http.client.HTTPResponse = connection.getresponse()
+                content: bytes = raw.read()
+            except (OSError, http.client.HTTPException) as err:
+                connection.close()
+                if reused:
+                    # The server may have closed the idle connection, which
+                    # isn't worth a retry or a backoff
+                    attempt -= 1
+                    continue
+
+                if attempt > self.retries:
+                    raise ConnectionError(
+                        f'GET {parts.netloc}{parts.path} failed: {err}'
+                    ) from err
+
+                metrics.increment('api_retries_total')
+                time.sleep(self._get_backoff(attempt, None) or 0)
+                continue
+
+            if raw.will_close:
+                connection.close()
+            else:
+                self._release(parts.scheme, parts.netloc, connection)
+
+            response: HttpClientResponse = HttpClientResponse(
+                raw.status,
+                {name.lower(): value for name, value in raw.getheaders()},
+                content)
+            if raw.status not in RETRY_STATUSES or attempt > self.retries:
+                return response
+
+            delay: float | None = self._get_backoff(
+                attempt, response.headers.get('retry-after'))
+            if delay is None:
+                return response
+
+            metrics.increment('api_retries_total')
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """
+        Close every idle connection
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            connections: list[http.client.HTTPConnection] = [
+                connection
+                for idle in self._idle.values()
+                for connection in idle
+            ]
+            self._idle.clear()
+
+        for connection in connections:
+            connection.close()
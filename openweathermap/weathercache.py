@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+WeatherCache() class file
+
+WeatherCache() is a class that keeps the last current weather fetched for
+every location in a file under data/. While an entry is fresh it is used
+instead of calling the API, and while it is only stale it is still good
+enough to fall back on when the API is slow or down.
+"""
+import time
+
+from datastore import datastore
+
+DEFAULT_TTL: int = 0
+DEFAULT_STALE_TTL: int = 3 * 60 * 60
+
+
+class WeatherCache():
+    """
+    WeatherCache() class file
+
+    WeatherCache() is a class that keeps the last current weather fetched
+    for every location in a file under data/, with a fresh and a stale TTL.
+    """
+
+    def __init__(
+            self,
+            path: str | None = None,
+            ttl: int = DEFAULT_TTL,
+            stale_ttl: int = DEFAULT_STALE_TTL) -> None:
+        self._path = path or datastore.get_data_path('weather.json')
+        self._ttl = ttl
+        self._stale_ttl = max(ttl, stale_ttl)
+
+    @property
+    def path(self) -> str:
+        """
+        Getter for the path property
+
+        Args:
+            None
+
+        Returns:
+            The path of the cache file in str format
+
+        Raises:
+            None
+        """
+        return self._path
+
+    @property
+    def ttl(self) -> int:
+        """
+        Getter for the ttl property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a fetched weather is used for instead of
+            calling the API
+
+        Raises:
+            None
+        """
+        return self._ttl
+
+    @property
+    def stale_ttl(self) -> int:
+        """
+        Getter for the stale_ttl property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a fetched weather can be fallen back on
+            when a new one can't be fetched
+
+        Raises:
+            None
+        """
+        return self._stale_ttl
+
+    def _key(self, lat: str, lon: str) -> str:
+        """
+        Build the cache key for the given latitude and longitude
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+
+        Returns:
+            The cache key in str format
+
+        Raises:
+            None
+        """
+        return f'{lat},{lon}'
+
+    def get(
+            self,
+            lat: str,
+            lon: str,
+            max_age: float | None = None) -> int | None:
+        """
+        Look up the cached weather for a location
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+            max_age: An optional max age in seconds to use instead of the
+            fresh TTL, e.g. the stale TTL
+
+        Returns:
+            The weather ID, or None if the location is not cached or the
+            cached entry is older than the max age
+
+        Raises:
+            None
+        """
+        if max_age is None:
+            max_age = self.ttl
+
+        entry = datastore.read_json(self.path).get(self._key(lat, lon))
+        if not isinstance(entry, dict):
+            return None
+
+        try:
+            if time.time() - float(entry['fetched_at']) > max_age:
+                return None
+            return int(entry['id'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_stale(self, lat: str, lon: str) -> int | None:
+        """
+        Look up the cached weather for a location, fresh or stale
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+
+        Returns:
+            The weather ID, or None if the location is not cached or the
+            cached entry is older than the stale TTL
+
+        Raises:
+            None
+        """
+        return self.get(lat, lon, self.stale_ttl)
+
+    def set(self, lat: str, lon: str, weather_id: int) -> None:
+        """
+        Store the weather fetched for a location
+
+        Args:
+            lat: The latitude in str format
+            lon: The longitude in str format
+            weather_id: The weather ID returned by the API
+
+        Returns:
+            None
+
+        Raises:
+            OSError when the cache file cannot be written
+        """
+        with datastore.update_json(self.path) as data:
+            data[self._key(lat, lon)] = {
+                'id': weather_id,
+                'fetched_at': time.time()
+            }
@@ -20,6 +20,33 @@ class ParseArgs():
         self._args = args
         self._zipcode = 0
         self._country_code = 'US'
+        self._rcon_backend = 'rcon'
+        self._transport = 'requests'
+        self._geocode_ttl = 90
+        self._daemon = False
+        self._interval = 300
+        self._max_interval = 0
+        self._forecast = False
+        self._minutely = False
+        self._forecast_max_age = 6
+        self._resync_interval = 60
+        self._config = ''
+        self._use_async = False
+        self._concurrency = 10
+        self._request_timeout = 15
+        self._workers = 8
+        self._server_deadline = 10
+        self._weather_rules = ''
+        self._metrics_file = ''
+        self._metrics_json = ''
+        self._daily_quota = 0
+        self._coalesce_window = 30
+        self._weather_ttl = 0
+        self._weather_stale_ttl = 180
+        self._refresh_timeout = 3
+        self._deadline = 60
+        self._skip_empty = False
+        self._empty_interval = 0
 
         self._parser = self._create_parser()
         self._parse_args: argparse.Namespace = self.parser.parse_args(
@@ -83,6 +110,528 @@ class ParseArgs():
         """
         return self._country_code
 
+    @property
+    def rcon_backend(self) -> str:
+        """
+        Getter for the rcon_backend property
+
+        This determines how commands are sent to the Minecraft server, either
+        `rcon` for the built-in client or `mcrcon` for the mcrcon binary.
+
+        Args:
+            None
+
+        Returns:
+            The name of the RCON backend to use.
+
+        Raises:
+            None
+        """
+        return self._rcon_backend
+
+    @property
+    def transport(self) -> str:
+        """
+        Getter for the transport property
+
+        This determines how the OpenWeatherMap API is called, either
+        `requests` (the default) or `stdlib` for the lighter http.client
+        based session.
+
+        Args:
+            None
+
+        Returns:
+            The name of the HTTP transport to use.
+
+        Raises:
+            None
+        """
+        return self._transport
+
+    @property
+    def geocode_ttl(self) -> int:
+        """
+        Getter for the geocode_ttl property
+
+        This determines how many days a cached latitude and longitude is
+        used for before the Geocoding API is asked again.
+
+        Args:
+            None
+
+        Returns:
+            The number of days a cached location stays valid for.
+
+        Raises:
+            None
+        """
+        return self._geocode_ttl
+
+    @property
+    def daemon(self) -> bool:
+        """
+        Getter for the daemon property
+
+        This determines whether the program keeps running and updates the
+        weather on an interval, or updates it once and exits.
+
+        Args:
+            None
+
+        Returns:
+            True if the program should run as a daemon, False if not.
+
+        Raises:
+            None
+        """
+        return self._daemon
+
+    @property
+    def interval(self) -> int:
+        """
+        Getter for the interval property
+
+        This determines how many seconds to wait between weather updates
+        when running as a daemon.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds between weather updates.
+
+        Raises:
+            None
+        """
+        return self._interval
+
+    @property
+    def max_interval(self) -> int:
+        """
+        Getter for the max_interval property
+
+        This determines how far apart the daemon may spread out updates
+        while the forecast is settled. The interval is then the shortest
+        time between updates.
+
+        Args:
+            None
+
+        Returns:
+            The longest number of seconds between updates, or 0 to always
+            wait the interval.
+
+        Raises:
+            None
+        """
+        return self._max_interval
+
+    @property
+    def forecast(self) -> bool:
+        """
+        Getter for the forecast property
+
+        This determines whether the weather is applied from a cached hourly
+        forecast instead of asking the API for the current weather each run.
+
+        Args:
+            None
+
+        Returns:
+            True if the hourly forecast should be used, False if not.
+
+        Raises:
+            None
+        """
+        return self._forecast
+
+    @property
+    def minutely(self) -> bool:
+        """
+        Getter for the minutely property
+
+        This determines whether the minute by minute precipitation for the
+        next hour is fetched along with the current weather, so the daemon
+        can change the weather the minute the rain starts or stops.
+
+        Args:
+            None
+
+        Returns:
+            True if the minutely precipitation should be used, False if not.
+
+        Raises:
+            None
+        """
+        return self._minutely
+
+    @property
+    def forecast_max_age(self) -> int:
+        """
+        Getter for the forecast_max_age property
+
+        This determines how many hours a fetched hourly forecast is used for
+        before a new one is fetched.
+
+        Args:
+            None
+
+        Returns:
+            The number of hours a forecast stays valid for.
+
+        Raises:
+            None
+        """
+        return self._forecast_max_age
+
+    @property
+    def resync_interval(self) -> int:
+        """
+        Getter for the resync_interval property
+
+        This determines how many minutes the same weather is skipped for
+        before it is sent to the server again anyway.
+
+        Args:
+            None
+
+        Returns:
+            The number of minutes between forced weather updates.
+
+        Raises:
+            None
+        """
+        return self._resync_interval
+
+    @property
+    def config(self) -> str:
+        """
+        Getter for the config property
+
+        This is the path of a fleet config file listing every server to
+        control. When it is set, the zipcode and country code are read from
+        the config instead of the command line.
+
+        Args:
+            None
+
+        Returns:
+            The path of the fleet config file, or an empty string if none
+            was given.
+
+        Raises:
+            None
+        """
+        return self._config
+
+    @property
+    def use_async(self) -> bool:
+        """
+        Getter for the use_async property
+
+        This determines whether every server in the fleet config is updated
+        concurrently instead of one after another.
+
+        Args:
+            None
+
+        Returns:
+            True if the fleet should be updated concurrently, False if not.
+
+        Raises:
+            None
+        """
+        return self._use_async
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Getter for the concurrency property
+
+        This determines how many API requests, and separately how many RCON
+        commands, can be in flight at the same time in async mode.
+
+        Args:
+            None
+
+        Returns:
+            The maximum number of concurrent requests.
+
+        Raises:
+            None
+        """
+        return self._concurrency
+
+    @property
+    def request_timeout(self) -> int:
+        """
+        Getter for the request_timeout property
+
+        This determines how many seconds a single API request or RCON
+        command can take in async mode before it is given up on.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a single request can take.
+
+        Raises:
+            None
+        """
+        return self._request_timeout
+
+    @property
+    def workers(self) -> int:
+        """
+        Getter for the workers property
+
+        This determines how many servers in the fleet config are updated at
+        the same time.
+
+        Args:
+            None
+
+        Returns:
+            The number of servers to update at the same time.
+
+        Raises:
+            None
+        """
+        return self._workers
+
+    @property
+    def server_deadline(self) -> int:
+        """
+        Getter for the server_deadline property
+
+        This determines how many seconds updating a single server in the
+        fleet config can take before it is reported as failed.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a single server update can take.
+
+        Raises:
+            None
+        """
+        return self._server_deadline
+
+    @property
+    def weather_rules(self) -> str:
+        """
+        Getter for the weather_rules property
+
+        This is the path of a JSON rules file that changes how weather
+        condition codes are mapped to Minecraft weather.
+
+        Args:
+            None
+
+        Returns:
+            The path of the rules file, or an empty string if none was given.
+
+        Raises:
+            None
+        """
+        return self._weather_rules
+
+    @property
+    def metrics_file(self) -> str:
+        """
+        Getter for the metrics_file property
+
+        This is the path to write the run metrics to in the Prometheus text
+        format, for the node_exporter textfile collector.
+
+        Args:
+            None
+
+        Returns:
+            The path of the metrics file, or an empty string if none was
+            given.
+
+        Raises:
+            None
+        """
+        return self._metrics_file
+
+    @property
+    def metrics_json(self) -> str:
+        """
+        Getter for the metrics_json property
+
+        This is the path to write a JSON summary of the run metrics to.
+
+        Args:
+            None
+
+        Returns:
+            The path of the JSON summary, or an empty string if none was
+            given.
+
+        Raises:
+            None
+        """
+        return self._metrics_json
+
+    @property
+    def daily_quota(self) -> int:
+        """
+        Getter for the daily_quota property
+
+        This is how many One Call API calls every process running on this
+        machine may make per day, shared through a file under data/.
+
+        Args:
+            None
+
+        Returns:
+            The number of calls allowed per day, 0 if calls aren't budgeted.
+
+        Raises:
+            None
+        """
+        return self._daily_quota
+
+    @property
+    def coalesce_window(self) -> int:
+        """
+        Getter for the coalesce_window property
+
+        This is how many seconds the result of an API call is shared with
+        other runs asking for the same location, so runs started at the
+        same time make one call between them.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds to share results for, 0 to not coalesce.
+
+        Raises:
+            None
+        """
+        return self._coalesce_window
+
+    @property
+    def weather_ttl(self) -> int:
+        """
+        Getter for the weather_ttl property
+
+        This determines how many minutes the last fetched current weather
+        is used for before the API is asked again.
+
+        Args:
+            None
+
+        Returns:
+            The number of minutes the cached weather is fresh for.
+
+        Raises:
+            None
+        """
+        return self._weather_ttl
+
+    @property
+    def weather_stale_ttl(self) -> int:
+        """
+        Getter for the weather_stale_ttl property
+
+        This determines how many minutes the last fetched current weather
+        can still be used for when the API is slow or down.
+
+        Args:
+            None
+
+        Returns:
+            The number of minutes the cached weather can be fallen back on.
+
+        Raises:
+            None
+        """
+        return self._weather_stale_ttl
+
+    @property
+    def refresh_timeout(self) -> int:
+        """
+        Getter for the refresh_timeout property
+
+        This determines how many seconds to wait for the API before falling
+        back on the stale cached weather.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds to wait for a refresh.
+
+        Raises:
+            None
+        """
+        return self._refresh_timeout
+
+    @property
+    def deadline(self) -> int:
+        """
+        Getter for the deadline property
+
+        This determines how many seconds a whole run may take, from
+        geocoding to setting the weather, before it gives up.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a run may take, or 0 for no deadline.
+
+        Raises:
+            None
+        """
+        return self._deadline
+
+    @property
+    def skip_empty(self) -> bool:
+        """
+        Getter for the skip_empty property
+
+        This determines whether the players online are checked first, so
+        the weather isn't fetched or set while nobody is there to see it.
+
+        Args:
+            None
+
+        Returns:
+            True if updates are skipped on an empty server, False if not.
+
+        Raises:
+            None
+        """
+        return self._skip_empty
+
+    @property
+    def empty_interval(self) -> int:
+        """
+        Getter for the empty_interval property
+
+        This determines how often the weather is still updated while the
+        server is empty.
+
+        Args:
+            None
+
+        Returns:
+            The number of minutes between updates on an empty server, or 0
+            to not update it at all until a player joins.
+
+        Raises:
+            None
+        """
+        return self._empty_interval
+
     @property
     def parser(self) -> argparse.ArgumentParser:
         """
@@ -124,6 +673,60 @@ class ParseArgs():
             description='Control the weather on a Minecraft Server'
         )
 
+        # --config
+        parser.add_argument(
+            '--config',
+            nargs=1,
+            required=False,
+            help='A JSON file listing every server to control, instead of '
+            'a single zipcode'
+        )
+
+        # --async
+        parser.add_argument(
+            '--async',
+            dest='use_async',
+            action='store_true',
+            required=False,
+            help='Update every server in the fleet config concurrently'
+        )
+
+        # --concurrency
+        parser.add_argument(
+            '--concurrency',
+            nargs=1,
+            required=False,
+            help='How many requests can be in flight at once in async mode '
+            '(default: 10)'
+        )
+
+        # --request-timeout
+        parser.add_argument(
+            '--request-timeout',
+            nargs=1,
+            required=False,
+            help='How many seconds a single request can take in async mode '
+            '(default: 15)'
+        )
+
+        # --workers
+        parser.add_argument(
+            '--workers',
+            nargs=1,
+            required=False,
+            help='How many servers in the fleet config to update at the '
+            'same time (default: 8)'
+        )
+
+        # --server-deadline
+        parser.add_argument(
+            '--server-deadline',
+            nargs=1,
+            required=False,
+            help='How many seconds updating a single server in the fleet '
+            'config can take (default: 10)'
+        )
+
         # -z/--zipcode
         parser.add_argument(
             '-z',
@@ -142,6 +745,202 @@ class ParseArgs():
             help='The two letter country code that the zipcode resides in'
         )
 
+        # -b/--rcon-backend
+        parser.add_argument(
+            '-b',
+            '--rcon-backend',
+            nargs=1,
+            required=False,
+            choices=['rcon', 'mcrcon'],
+            help='Send commands with the built-in RCON client (default) or '
+            'the mcrcon binary'
+        )
+
+        # --transport
+        parser.add_argument(
+            '--transport',
+            nargs=1,
+            required=False,
+            choices=['requests', 'stdlib'],
+            help='Call the API with requests (default) or the lighter '
+            'standard library http.client'
+        )
+
+        # --geocode-ttl
+        parser.add_argument(
+            '--geocode-ttl',
+            nargs=1,
+            required=False,
+            help='How many days to cache the latitude and longitude of a '
+            'zipcode for (default: 90)'
+        )
+
+        # -d/--daemon
+        parser.add_argument(
+            '-d',
+            '--daemon',
+            action='store_true',
+            required=False,
+            help='Keep running and update the weather on an interval'
+        )
+
+        # -i/--interval
+        parser.add_argument(
+            '-i',
+            '--interval',
+            nargs=1,
+            required=False,
+            help='How many seconds to wait between weather updates when '
+            'running as a daemon (default: 300)'
+        )
+
+        # --minutely
+        parser.add_argument(
+            '--minutely',
+            action='store_true',
+            required=False,
+            help='Change the weather the minute the rain starts or stops '
+            'within the next hour (requires --daemon, not with --config)'
+        )
+
+        # --max-interval
+        parser.add_argument(
+            '--max-interval',
+            nargs=1,
+            required=False,
+            help='Adapt the interval to the forecast, polling as rarely as '
+            'this many seconds while it is settled and as often as the '
+            'interval around predicted changes (requires --daemon and '
+            '--forecast, not with --config)'
+        )
+
+        # -f/--forecast
+        parser.add_argument(
+            '-f',
+            '--forecast',
+            action='store_true',
+            required=False,
+            help='Apply the weather from a cached hourly forecast instead of '
+            'fetching the current weather every run'
+        )
+
+        # --forecast-max-age
+        parser.add_argument(
+            '--forecast-max-age',
+            nargs=1,
+            required=False,
+            help='How many hours to use a fetched forecast for, between 1 '
+            'and 48 (default: 6)'
+        )
+
+        # --resync-interval
+        parser.add_argument(
+            '--resync-interval',
+            nargs=1,
+            required=False,
+            help='How many minutes to skip sending unchanged weather for, '
+            '0 to always send it (default: 60)'
+        )
+
+        # --weather-rules
+        parser.add_argument(
+            '--weather-rules',
+            nargs=1,
+            required=False,
+            help='A JSON file of rules mapping weather condition codes to '
+            'Minecraft weather'
+        )
+
+        # --weather-ttl
+        parser.add_argument(
+            '--weather-ttl',
+            nargs=1,
+            required=False,
+            help='How many minutes to reuse the last fetched weather for '
+            'before asking the API again (default: 0)'
+        )
+
+        # --weather-stale-ttl
+        parser.add_argument(
+            '--weather-stale-ttl',
+            nargs=1,
+            required=False,
+            help='How many minutes the last fetched weather can be used for '
+            'when the API is slow or down, 0 to never use it (default: 180)'
+        )
+
+        # --refresh-timeout
+        parser.add_argument(
+            '--refresh-timeout',
+            nargs=1,
+            required=False,
+            help='How many seconds to wait for the API before using the last '
+            'fetched weather instead (default: 3)'
+        )
+
+        # --deadline
+        parser.add_argument(
+            '--deadline',
+            nargs=1,
+            required=False,
+            help='How many seconds a run may take end to end before it '
+            'gives up, 0 for no deadline (default: 60, not with --config)'
+        )
+
+        # --skip-empty
+        parser.add_argument(
+            '--skip-empty',
+            action='store_true',
+            required=False,
+            help='Check the players online first and skip the update while '
+            'the server is empty (not with --config)'
+        )
+
+        # --empty-interval
+        parser.add_argument(
+            '--empty-interval',
+            nargs=1,
+            required=False,
+            help='How many minutes between updates while the server is '
+            'empty, 0 to wait for a player to join (default: 0)'
+        )
+
+        # --daily-quota
+        parser.add_argument(
+            '--daily-quota',
+            nargs=1,
+            required=False,
+            help='How many One Call API calls to allow per day across every '
+            'run, 0 for no limit (default: 0)'
+        )
+
+        # --coalesce-window
+        parser.add_argument(
+            '--coalesce-window',
+            nargs=1,
+            required=False,
+            help='How many seconds to share API results with other runs '
+            'asking for the same location, 0 to not share them (default: 30)'
+        )
+
+        # --metrics-file
+        parser.add_argument(
+            '--metrics-file',
+            nargs=1,
+            required=False,
+            help='Write timings and counters to this Prometheus textfile '
+            'after every run'
+        )
+
+        # --metrics-json
+        parser.add_argument(
+            '--metrics-json',
+            nargs=1,
+            required=False,
+            help='Write timings and counters to this JSON file after every '
+            'run'
+        )
+
         # -v/--version
         parser.add_argument(
             '-v',
@@ -175,6 +974,58 @@ class ParseArgs():
             self._print_version()
             self.parser.exit()
 
+        # If the fleet config is given, set it
+        if self._parse_args.config:
+            self._config = self._parse_args.config[0]
+
+        # Update the fleet concurrently
+        if self._parse_args.use_async:
+            if not self._config:
+                self.parser.error('--async requires --config!')
+            self._use_async = True
+
+        # If the concurrency is given, set it
+        if self._parse_args.concurrency:
+            try:
+                self._concurrency = int(self._parse_args.concurrency[0])
+            except ValueError:
+                self.parser.error('Invalid concurrency given!')
+
+            if self._concurrency <= 0:
+                self.parser.error('Invalid concurrency given!')
+
+        # If the request timeout is given, set it
+        if self._parse_args.request_timeout:
+            try:
+                self._request_timeout = int(
+                    self._parse_args.request_timeout[0])
+            except ValueError:
+                self.parser.error('Invalid request timeout given!')
+
+            if self._request_timeout <= 0:
+                self.parser.error('Invalid request timeout given!')
+
+        # If the number of workers is given, set it
+        if self._parse_args.workers:
+            try:
+                self._workers = int(self._parse_args.workers[0])
+            except ValueError:
+                self.parser.error('Invalid number of workers given!')
+
+            if self._workers <= 0:
+                self.parser.error('Invalid number of workers given!')
+
+        # If the server deadline is given, set it
+        if self._parse_args.server_deadline:
+            try:
+                self._server_deadline = int(
+                    self._parse_args.server_deadline[0])
+            except ValueError:
+                self.parser.error('Invalid server deadline given!')
+
+            if self._server_deadline <= 0:
+                self.parser.error('Invalid server deadline given!')
+
         # Set the zipcode
         if self._parse_args.zipcode:
             try:
@@ -182,7 +1033,7 @@ class ParseArgs():
             except ValueError:
                 self.parser.error('Invalid zipcode given!')
 
-        else:
+        elif not self._config:
             self.parser.error('Zipcode is required!')
 
         # If the country code is given, set it
@@ -190,6 +1041,186 @@ class ParseArgs():
             self._country_code = self._parse_args.country_code[0].strip(
             ).upper()
 
+        # If the RCON backend is given, set it
+        if self._parse_args.rcon_backend:
+            self._rcon_backend = self._parse_args.rcon_backend[0]
+
+        # If the HTTP transport is given, set it
+        if self._parse_args.transport:
+            self._transport = self._parse_args.transport[0]
+
+        # If the geocode cache TTL is given, set it
+        if self._parse_args.geocode_ttl:
+            try:
+                self._geocode_ttl = int(self._parse_args.geocode_ttl[0])
+            except ValueError:
+                self.parser.error('Invalid geocode TTL given!')
+
+            if self._geocode_ttl < 0:
+                self.parser.error('Invalid geocode TTL given!')
+
+        # Run as a daemon
+        if self._parse_args.daemon:
+            self._daemon = True
+
+        # If the interval is given, set it
+        if self._parse_args.interval:
+            try:
+                self._interval = int(self._parse_args.interval[0])
+            except ValueError:
+                self.parser.error('Invalid interval given!')
+
+            if self._interval <= 0:
+                self.parser.error('Invalid interval given!')
+
+        # Use the hourly forecast
+        if self._parse_args.forecast:
+            self._forecast = True
+
+        # Use the minutely precipitation
+        if self._parse_args.minutely:
+            if not self._daemon:
+                self.parser.error('--minutely requires --daemon!')
+            if self._forecast:
+                self.parser.error('--minutely cannot be used with --forecast!')
+            if self._config:
+                self.parser.error('--minutely cannot be used with --config!')
+            self._minutely = True
+
+        # If the max interval is given, set it
+        if self._parse_args.max_interval:
+            if not self._daemon:
+                self.parser.error('--max-interval requires --daemon!')
+            if not self._forecast:
+                self.parser.error('--max-interval requires --forecast!')
+            if self._config:
+                self.parser.error(
+                    '--max-interval cannot be used with --config!')
+
+            try:
+                self._max_interval = int(self._parse_args.max_interval[0])
+            except ValueError:
+                self.parser.error('Invalid max interval given!')
+
+            if self._max_interval < self._interval:
+                self.parser.error('Invalid max interval given!')
+
+        # If the forecast max age is given, set it
+        if self._parse_args.forecast_max_age:
+            try:
+                self._forecast_max_age = int(
+                    self._parse_args.forecast_max_age[0])
+            except ValueError:
+                self.parser.error('Invalid forecast max age given!')
+
+            if not 1 <= self._forecast_max_age <= 48:
+                self.parser.error('Invalid forecast max age given!')
+
+        # If the resync interval is given, set it
+        if self._parse_args.resync_interval:
+            try:
+                self._resync_interval = int(
+                    self._parse_args.resync_interval[0])
+            except ValueError:
+                self.parser.error('Invalid resync interval given!')
+
+            if self._resync_interval < 0:
+                self.parser.error('Invalid resync interval given!')
+
+        # If the weather rules file is given, set it
+        if self._parse_args.weather_rules:
+            self._weather_rules = self._parse_args.weather_rules[0]
+
+        # If the weather TTLs are given, set them
+        if self._parse_args.weather_ttl:
+            try:
+                self._weather_ttl = int(self._parse_args.weather_ttl[0])
+            except ValueError:
+                self.parser.error('Invalid weather TTL given!')
+
+            if self._weather_ttl < 0:
+                self.parser.error('Invalid weather TTL given!')
+
+        if self._parse_args.weather_stale_ttl:
+            try:
+                self._weather_stale_ttl = int(
+                    self._parse_args.weather_stale_ttl[0])
+            except ValueError:
+                self.parser.error('Invalid weather stale TTL given!')
+
+            if self._weather_stale_ttl < 0:
+                self.parser.error('Invalid weather stale TTL given!')
+
+        # If the refresh timeout is given, set it
+        if self._parse_args.refresh_timeout:
+            try:
+                self._refresh_timeout = int(
+                    self._parse_args.refresh_timeout[0])
+            except ValueError:
+                self.parser.error('Invalid refresh timeout given!')
+
+            if self._refresh_timeout <= 0:
+                self.parser.error('Invalid refresh timeout given!')
+
+        # If the deadline is given, set it
+        if self._parse_args.deadline:
+            try:
+                self._deadline = int(self._parse_args.deadline[0])
+            except ValueError:
+                self.parser.error('Invalid deadline given!')
+
+            if self._deadline < 0:
+                self.parser.error('Invalid deadline given!')
+
+            if self._config:
+                self.parser.error('--deadline cannot be used with --config, '
+                                  'use --server-deadline instead!')
+
+        # Skip updates while the server is empty
+        if self._parse_args.skip_empty:
+            if self._config:
+                self.parser.error('--skip-empty cannot be used with --config!')
+            self._skip_empty = True
+
+        # If the empty interval is given, set it
+        if self._parse_args.empty_interval:
+            try:
+                self._empty_interval = int(
+                    self._parse_args.empty_interval[0])
+            except ValueError:
+                self.parser.error('Invalid empty interval given!')
+
+            if self._empty_interval < 0:
+                self.parser.error('Invalid empty interval given!')
+
+        # If the daily quota is given, set it
+        if self._parse_args.daily_quota:
+            try:
+                self._daily_quota = int(self._parse_args.daily_quota[0])
+            except ValueError:
+                self.parser.error('Invalid daily quota given!')
+
+            if self._daily_quota < 0:
+                self.parser.error('Invalid daily quota given!')
+
+        # If the coalesce window is given, set it
+        if self._parse_args.coalesce_window:
+            try:
+                self._coalesce_window = int(
+                    self._parse_args.coalesce_window[0])
+            except ValueError:
+                self.parser.error('Invalid coalesce window given!')
+
+            if self._coalesce_window < 0:
+                self.parser.error('Invalid coalesce window given!')
+
+        # If the metrics files are given, set them
+        if self._parse_args.metrics_file:
+            self._metrics_file = self._parse_args.metrics_file[0]
+
+        if self._parse_args.metrics_json:
+            self._metrics_json = self._parse_args.metrics_json[0]
+
     def _print_version(self) -> None:
         """
         Prints out the warranty and version number of the program
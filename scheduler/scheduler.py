@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Scheduler() class file
+
+Scheduler() is a class that runs a job over and over on a fixed interval
+until it is told to stop. Run times are anchored to when the scheduler
+started, so the time the job itself takes doesn't push later runs back.
+One-off callbacks can be scheduled in between runs, and run on the same
+thread as the job, so they never run at the same time as it.
+"""
+import math
+import signal
+import threading
+import time
+from typing import Callable
+
+
+class Scheduler():
+    """
+    Scheduler() class file
+
+    Scheduler() is a class that runs a job over and over on a fixed interval
+    until it is told to stop. Run times are anchored to when the scheduler
+    started, so the time the job itself takes doesn't push later runs back.
+    """
+
+    def __init__(self, interval: float) -> None:
+        if interval <= 0:
+            raise ValueError('The interval must be greater than zero!')
+
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self._timers: dict[str, tuple[float, Callable[[], None]]] = {}
+
+    @property
+    def interval(self) -> float:
+        """
+        Getter for the interval property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds between the start of each run
+
+        Raises:
+            None
+        """
+        return self._interval
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Getter for the stopped property
+
+        Args:
+            None
+
+        Returns:
+            True if the scheduler has been told to stop, False if not
+
+        Raises:
+            None
+        """
+        return self._stop_event.is_set()
+
+    def stop(self, *args) -> None:
+        """
+        Tell the scheduler to stop
+
+        A run that is in progress is allowed to finish. This method accepts
+        and ignores any arguments so it can be used as a signal handler.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self._stop_event.set()
+
+    def call_later(
+            self,
+            key: str,
+            delay: float,
+            callback: Callable[[], None]) -> None:
+        """
+        Run a callback once after a delay, in between runs of the job
+
+        Scheduling a callback under a key that is already pending replaces
+        it, so a job can keep moving a planned action as new data comes in.
+        A callback that falls due while the job is running waits for it to
+        finish. This must be called from the job or from another callback.
+
+        Args:
+            key: The name of the callback, like `minutely`
+            delay: The number of seconds to wait before running it
+            callback: The function to run, it is called with no arguments
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self._timers[key] = (time.monotonic() + max(0.0, delay), callback)
+
+    def cancel(self, key: str) -> None:
+        """
+        Cancel a pending callback
+
+        Args:
+            key: The name the callback was scheduled under
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self._timers.pop(key, None)
+
+    def _wait(self, until: float) -> bool:
+        """
+        Wait until the next run, running callbacks as they fall due
+
+        Args:
+            until: The monotonic time of the next run
+
+        Returns:
+            True if the scheduler was told to stop while waiting, False if
+            it is time for the next run
+
+        Raises:
+            Any exception raised by a callback
+        """
+        while True:
+            now: float = time.monotonic()
+            due: float = min(
+                (timer[0] for timer in self._timers.values()),
+                default=math.inf)
+            if due >= until:
+                return self._stop_event.wait(max(0.0, until - now))
+
+            if self._stop_event.wait(max(0.0, due - now)):
+                return True
+
+            for key, timer in list(self._timers.items()):
+                if timer[0] <= time.monotonic():
+                    del self._timers[key]
+                    timer[1]()
+
+    def handle_signals(self) -> None:
+        """
+        Stop the scheduler gracefully on SIGTERM and SIGINT
+
+        This must be called from the main thread.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self, job: Callable[[], float | None]) -> None:
+        """
+        Run the job on the configured interval until stopped
+
+        The job runs immediately and then at every multiple of the interval
+        after that. If a run takes longer than the interval, the missed
+        slots are skipped rather than run back to back.
+
+        A job can also pick when it runs next by returning a number of
+        seconds, which is counted from when it finished. Later runs are
+        anchored to that time.
+
+        Args:
+            job: The function to run, it is called with no arguments and
+            returns None or the number of seconds to wait before running it
+            again
+
+        Returns:
+            None
+
+        Raises:
+            Any exception raised by the job or a callback
+        """
+        next_run: float = time.monotonic()
+        while not self.stopped:
+            delay: float | None = job()
+
+            now: float = time.monotonic()
+            if delay is not None:
+                next_run = now + max(0.0, delay)
+            else:
+                next_run += self.interval
+                if next_run <= now:
+                    missed: int = math.floor(
+                        (now - next_run) / self.interval) + 1
+                    next_run += missed * self.interval
+
+            if self._wait(next_run):
+                break
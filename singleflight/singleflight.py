@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+SingleFlight() class file
+
+SingleFlight() is a class that makes sure only one fetch per key is in
+flight at a time. Within a process, callers that ask for a key while it is
+already being fetched wait for that fetch and get its result. Across
+processes, the fetch runs under a per-key file lock and its result is kept
+under data/inflight/ for a short window, so cron runs that start in the
+same minute for the same location share one API call. Results and locks
+that have outlived the window are cleaned up as new fetches come in.
+"""
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from datastore import datastore
+
+DEFAULT_WINDOW: float = 30
+DEFAULT_WAIT: float = 15
+
+
+class _Call():
+    """
+    A fetch in flight in this process, for the callers waiting on it
+    """
+
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight():
+    """
+    SingleFlight() class file
+
+    SingleFlight() is a class that makes sure only one fetch per key is in
+    flight at a time, both within a process and across processes.
+    """
+
+    def __init__(
+            self,
+            window: float = DEFAULT_WINDOW,
+            wait: float = DEFAULT_WAIT,
+            directory: str | None = None) -> None:
+        if window <= 0:
+            raise ValueError('The window must be greater than zero!')
+
+        if wait < 0:
+            raise ValueError('The wait cannot be negative!')
+
+        self._window = window
+        self._wait = wait
+        self._directory = directory or datastore.get_data_path('inflight')
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._pruned_at: float | None = None
+
+    @property
+    def window(self) -> float:
+        """
+        Getter for the window property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds a result is shared with other processes
+
+        Raises:
+            None
+        """
+        return self._window
+
+    @property
+    def wait(self) -> float:
+        """
+        Getter for the wait property
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds to wait for another process's fetch before
+            fetching anyway
+
+        Raises:
+            None
+        """
+        return self._wait
+
+    @property
+    def directory(self) -> str:
+        """
+        Getter for the directory property
+
+        Args:
+            None
+
+        Returns:
+            The directory the shared results and locks are kept in
+
+        Raises:
+            None
+        """
+        return self._directory
+
+    def _get_path(self, key: str) -> str:
+        """
+        Get the path of the shared result file for a key
+
+        Args:
+            key: The key of the fetch
+
+        Returns:
+            The path of the result file in str format
+
+        Raises:
+            None
+        """
+        digest: str = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def _read_fresh(self, path: str, key: str) -> dict[str, Any] | None:
+        """
+        Read a shared result if it is still inside the window
+
+        Args:
+            path: The path of the result file
+            key: The key of the fetch, to guard against hash collisions
+
+        Returns:
+            The result file's contents, or None if there is no fresh result
+
+        Raises:
+            None
+        """
+        entry: dict[str, Any] = datastore.read_json(path)
+        if entry.get('key') != key or 'result' not in entry:
+            return None
+
+        try:
+            if time.time() - float(entry['fetched_at']) > self.window:
+                return None
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        return entry
+
+    def _prune(self) -> None:
+        """
+        Remove the results and locks of keys that have outlived the window
+
+        Every location and time window leaves a result and a lock file
+        behind, so they are cleaned up at most once per window. A key is
+        only removed while its lock can be taken right away, which leaves
+        fetches still in flight alone.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        now: float = time.monotonic()
+        if self._pruned_at is not None and now - self._pruned_at < self.window:
+            return
+        self._pruned_at = now
+
+        try:
+            entries: list[os.DirEntry] = list(os.scandir(self.directory))
+        except OSError:
+            return
+
+        cutoff: float = time.time() - self.window
+        for entry in entries:
+            if not entry.name.endswith('.json.lock'):
+                continue
+
+            path: str = entry.path[:-len('.lock')]
+            try:
+                updated_at: float = entry.stat().st_mtime
+                if os.path.exists(path):
+                    updated_at = max(updated_at, os.path.getmtime(path))
+                if updated_at > cutoff:
+                    continue
+
+                with datastore.lock(path, timeout=0):
+                    if os.path.exists(path):
+                        os.remove(path)
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+    def _fetch_shared(
+            self,
+            key: str,
+            fetch: Callable[[], Any],
+            share: Callable[[Any], bool] | None) -> Any:
+        """
+        Fetch a key once across every process
+
+        Args:
+            key: The key of the fetch
+            fetch: The function doing the fetch
+            share: An optional function that decides whether a result is
+            good enough to share
+
+        Returns:
+            The result of this process's fetch, or another process's if it
+            fetched the same key within the window
+
+        Raises:
+            Any exception raised by the fetch
+        """
+        path: str = self._get_path(key)
+        entry: dict[str, Any] | None = self._read_fresh(path, key)
+        if entry is not None:
+            return entry['result']
+
+        with contextlib.ExitStack() as stack:
+            try:
+                stack.enter_context(datastore.lock(path, timeout=self.wait))
+            except OSError:
+                # Waited long enough (or locking isn't possible here), so
+                # don't let another process's stuck fetch hold this one up.
+                # Only the lock is guarded: a fetch that fails on its own
+                # must not be sent a second time.
+                return fetch()
+
+            # Whoever held the lock may have just fetched it for us
+            entry = self._read_fresh(path, key)
+            if entry is not None:
+                return entry['result']
+
+            result: Any = fetch()
+            if share is None or share(result):
+                try:
+                    datastore.write_json(path, {
+                        'key': key,
+                        'fetched_at': time.time(),
+                        'result': result
+                    })
+                except (OSError, TypeError, ValueError):
+                    pass
+
+        self._prune()
+        return result
+
+    def do(
+            self,
+            key: str,
+            fetch: Callable[[], Any],
+            share: Callable[[Any], bool] | None = None) -> Any:
+        """
+        Fetch a key, or get the result of a fetch of it already in flight
+
+        Results are shared with other processes through a JSON file, so
+        they must be JSON serialisable (tuples come back as lists). A
+        failed fetch is never shared: the exception goes to the callers in
+        this process, and other processes fetch for themselves.
+
+        Args:
+            key: The key of the fetch, like `current:40.7,-74.0`
+            fetch: The function doing the fetch, called with no arguments
+            share: An optional function that returns False for results
+            that shouldn't be shared with other processes (e.g. an error
+            marker)
+
+        Returns:
+            The result of the fetch
+
+        Raises:
+            Any exception raised by the fetch
+        """
+        with self._lock:
+            call: _Call | None = self._calls.get(key)
+            leader: bool = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._fetch_shared(key, fetch, share)
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
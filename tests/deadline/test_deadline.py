@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""TestDeadline class file"""
+import sys
+import time
+
+import pytest
+
+from deadline.deadline import Deadline, DeadlineExceededError
+
+
+class TestDeadline():
+    """Tests for the Deadline class"""
+
+    def test_invalid_seconds(self) -> None:
+        with pytest.raises(ValueError):
+            Deadline(0)
+
+    def test_no_deadline(self) -> None:
+        deadline = Deadline(None)
+        assert deadline.remaining is None
+        assert deadline.timeout('weather', 10) == 10
+        assert deadline.call('weather', lambda x: x * 2, 21) == 42
+
+    def test_timeout_is_capped(self) -> None:
+        deadline = Deadline(5)
+        assert deadline.timeout('rcon', 1) == 1
+        assert deadline.timeout('weather', 10) <= 5
+
+    def test_timeout_after_deadline(self) -> None:
+        deadline = Deadline(0.05)
+        time.sleep(0.1)
+        assert deadline.remaining == 0
+        with pytest.raises(DeadlineExceededError, match='rcon'):
+            deadline.timeout('rcon', 1)
+
+    def test_call_gives_up(self) -> None:
+        deadline = Deadline(0.1)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError, match='weather'):
+            deadline.call('weather', time.sleep, 1)
+        assert time.monotonic() - start < 0.5
+
+    def test_call_raises_errors(self) -> None:
+        def fail() -> None:
+            raise KeyError('lat')
+
+        deadline = Deadline(1)
+        with pytest.raises(KeyError):
+            deadline.call('geocode', fail)
+        with pytest.raises(SystemExit):
+            deadline.call('geocode', sys.exit, 1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""TestFleet class file"""
+import json
+
+import pytest
+
+from fleet import fleet
+
+
+class TestFleet():
+    """Tests for functions in fleet.py"""
+
+    def write_config(self, tmp_path, config) -> str:
+        path = tmp_path / 'fleet.json'
+        path.write_text(json.dumps(config), encoding='utf-8')
+        return str(path)
+
+    def test_load_config(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv('CREATIVE_PASS', 'hunter3')
+        path = self.write_config(tmp_path, {'servers': [
+            {
+                'name': 'survival',
+                'host': 'mc1',
+                'password': 'hunter2',
+                'zipcode': '01234'
+            },
+            {
+                'name': 'creative',
+                'host': 'mc2',
+                'port': 25576,
+                'password_env': 'CREATIVE_PASS',
+                'zipcode': 10001,
+                'country_code': 'us'
+            }
+        ]})
+
+        servers = fleet.load_config(path)
+        assert servers == [
+            {
+                'name': 'survival',
+                'host': 'mc1',
+                'port': 25575,
+                'password': 'hunter2',
+                'zipcode': 1234,
+                'country_code': 'US'
+            },
+            {
+                'name': 'creative',
+                'host': 'mc2',
+                'port': 25576,
+                'password': 'hunter3',
+                'zipcode': 10001,
+                'country_code': 'US'
+            }
+        ]
+
+    def test_load_config_value_error(self, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            fleet.load_config(str(tmp_path / 'missing.json'))
+
+        bad_configs = [
+            {},
+            {'servers': []},
+            {'servers': [{'host': 'mc1', 'zipcode': 1}]},
+            {'servers': [{'host': 'mc1', 'password': 'x'}]},
+            {'servers': [{'password': 'x', 'zipcode': 1}]},
+            {'servers': [{'host': 'mc1', 'password': 'x', 'zipcode': 'ab'}]},
+            {'servers': [
+                {'name': 'a', 'host': 'mc1', 'password': 'x', 'zipcode': 1},
+                {'name': 'a', 'host': 'mc2', 'password': 'x', 'zipcode': 1},
+            ]},
+        ]
+        for config in bad_configs:
+            with pytest.raises(ValueError):
+                fleet.load_config(self.write_config(tmp_path, config))
+
+    def test_group_by_zipcode(self) -> None:
+        servers = [
+            {'name': 'a', 'zipcode': 10001, 'country_code': 'US'},
+            {'name': 'b', 'zipcode': 10002, 'country_code': 'US'},
+            {'name': 'c', 'zipcode': 10001, 'country_code': 'US'},
+            {'name': 'd', 'zipcode': 10001, 'country_code': 'CA'},
+        ]
+        groups = fleet.group_by_zipcode(servers)
+        assert [s['name'] for s in groups[(10001, 'US')]] == ['a', 'c']
+        assert [s['name'] for s in groups[(10002, 'US')]] == ['b']
+        assert [s['name'] for s in groups[(10001, 'CA')]] == ['d']
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""TestForecast class file"""
+import time
+
+from forecast import forecast
+from forecast.forecast import ForecastCache
+
+
+class TestForecast():
+    """Tests for functions and classes in forecast.py"""
+
+    def set_up(self) -> None:
+        self.start = 1684926000
+        self.timeline = [
+            {'dt': self.start, 'weather': 'clear', 'pop': 0},
+            {'dt': self.start + 3600, 'weather': 'rain', 'pop': 0.8},
+            {'dt': self.start + 7200, 'weather': 'thunder', 'pop': 1},
+        ]
+
+    def test_get_weather_at(self) -> None:
+        self.set_up()
+        assert forecast.get_weather_at(self.timeline, self.start) == 'clear'
+        assert forecast.get_weather_at(
+            self.timeline, self.start + 3599) == 'clear'
+        assert forecast.get_weather_at(
+            self.timeline, self.start + 3600) == 'rain'
+        assert forecast.get_weather_at(
+            self.timeline, self.start + 10799) == 'thunder'
+
+    def test_get_weather_at_outside_timeline(self) -> None:
+        self.set_up()
+        assert forecast.get_weather_at(self.timeline, self.start - 1) is None
+        assert forecast.get_weather_at(
+            self.timeline, self.start + 10800) is None
+        assert forecast.get_weather_at([], self.start) is None
+
+    def test_forecast_cache(self, tmp_path, monkeypatch) -> None:
+        self.set_up()
+        cache = ForecastCache(str(tmp_path / 'forecast.json'), max_age=60)
+        assert cache.get_timeline('10.234', '-10.234') is None
+
+        cache.set_timeline('10.234', '-10.234', self.timeline)
+        assert cache.get_timeline('10.234', '-10.234') == self.timeline
+        assert cache.get_timeline('11.234', '-10.234') is None
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert cache.get_timeline('10.234', '-10.234') is None
+
+    def test_get_weather_duration(self) -> None:
+        self.set_up()
+        self.timeline.insert(
+            2, {'dt': self.start + 7200, 'weather': 'rain', 'pop': 0.8})
+        self.timeline[3]['dt'] = self.start + 10800
+
+        assert forecast.get_weather_duration(self.timeline, self.start) == 3600
+        assert forecast.get_weather_duration(
+            self.timeline, self.start + 3700) == 7100
+        assert forecast.get_weather_duration(
+            self.timeline, self.start + 10800) == 3600
+        assert forecast.get_weather_duration(
+            self.timeline, self.start + 14400) is None
+
+    def test_get_poll_interval(self) -> None:
+        self.set_up()
+        settled = [
+            {'dt': self.start + hour * 3600, 'weather': 'clear', 'pop': 0}
+            for hour in range(6)
+        ]
+        assert forecast.get_poll_interval(
+            settled, self.start, 300, 3600) == 3600
+
+        # Rain at 80% is coming up, so poll more often
+        assert forecast.get_poll_interval(
+            self.timeline, self.start + 600, 300, 3600) == 2280
+
+        # And poll right after it starts
+        assert forecast.get_poll_interval(
+            self.timeline, self.start + 1800, 300, 3600) == 1805
+
+    def test_get_poll_interval_uncertain(self) -> None:
+        self.set_up()
+        self.timeline[0]['pop'] = 0.5
+        assert forecast.get_poll_interval(
+            self.timeline, self.start, 300, 3600) == 300
+        assert forecast.get_poll_interval(
+            self.timeline, self.start - 1, 300, 3600) == 300
+
+    def test_get_precipitation_change(self) -> None:
+        self.set_up()
+        minutely = [
+            {'dt': self.start + minute * 60, 'precipitation': 0}
+            for minute in range(60)
+        ]
+        assert forecast.get_precipitation_change(
+            minutely, self.start + 30) is None
+
+        for minute in minutely[20:45]:
+            minute['precipitation'] = 0.3
+        assert forecast.get_precipitation_change(
+            minutely, self.start + 30) == (self.start + 1200, True)
+        assert forecast.get_precipitation_change(
+            minutely, self.start + 1300) == (self.start + 2700, False)
+
+        # Outside of the minutely forecast
+        assert forecast.get_precipitation_change(
+            minutely, self.start - 1) is None
+        assert forecast.get_precipitation_change(
+            minutely, self.start + 3600) is None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""TestLogger class file"""
+import logging
+import logging.handlers
+import sys
+import time
+
+from logger import logger
+
+
+class TestLogger():
+    """Tests for functions in logger.py"""
+
+    def test_configure_logger(self, tmp_path, monkeypatch) -> None:
+        (tmp_path / 'logs').mkdir()
+        monkeypatch.setattr(sys, 'path', [str(tmp_path)] + sys.path[1:])
+
+        logger.configure_logger('testLogger')
+        logger.configure_logger('testLogger')
+        test_logger = logging.getLogger('testLogger')
+        assert len(test_logger.handlers) == 1
+        assert isinstance(
+            test_logger.handlers[0], logging.handlers.QueueHandler)
+
+        test_logger.info('Hello %s!', 'world')
+        test_logger.debug('Filtered out')
+
+        test_logger.info('Last')
+
+        # Records are written by a background thread, so wait for them
+        path = tmp_path / 'logs' / 'testLogger.log'
+        deadline = time.monotonic() + 5
+        lines: list[str] = []
+        while time.monotonic() < deadline:
+            lines = path.read_text(encoding='utf-8').splitlines()
+            if len(lines) == 2:
+                break
+            time.sleep(0.01)
+
+        assert len(lines) == 2
+        assert lines[0].endswith(
+            f'{logger.get_hostname()} testLogger[{logger.get_pid()}] '
+            'Hello world!')
+
+    def test_flush_logger(self, tmp_path, monkeypatch) -> None:
+        (tmp_path / 'logs').mkdir()
+        monkeypatch.setattr(sys, 'path', [str(tmp_path)] + sys.path[1:])
+
+        logger.configure_logger('flushLogger')
+        flush_logger = logging.getLogger('flushLogger')
+        flush_logger.info('First')
+        logger.flush_logger('flushLogger')
+
+        # Flushing waits for the records, and logging goes on afterwards
+        path = tmp_path / 'logs' / 'flushLogger.log'
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 1
+        flush_logger.info('Second')
+        logger.flush_logger('flushLogger')
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 2
+
+        logger.flush_logger('flushLogger', False)
+        logger.flush_logger('flushLogger')
+        logger.flush_logger('missingLogger')
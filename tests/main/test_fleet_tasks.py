@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""TestFleetTasks() class file"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import main
+from datastore import datastore
+from forecast.forecast import ForecastCache
+from openweathermap import openweathermap
+from openweathermap.weathercache import WeatherCache
+from parseargs.parseargs import ParseArgs
+
+
+class FakeAsyncRconClient():
+    """Records the commands sent to one server and how many overlapped"""
+
+    def __init__(self, tracker: 'ConcurrencyTracker', name: str) -> None:
+        self.tracker = tracker
+        self.server = f'{name}:25575'
+        self.commands: list[str] = []
+
+    async def command(self, cmd: str) -> bytes:
+        async with self.tracker:
+            await asyncio.sleep(0.05)
+        self.commands.append(cmd)
+        return b''
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeMcrcon():
+    """Sets the weather unless its host is `fail` or `hang`"""
+
+    instances: list['FakeMcrcon'] = []
+    released: threading.Event = threading.Event()
+
+    def __init__(
+            self,
+            backend: str,
+            hostname: str,
+            password: str,
+            port: int,
+            timeout: float) -> None:
+        self.hostname = hostname
+        self.server = f'{hostname}:{port}'
+        self.timeout = timeout
+        self.commands: list[str] = []
+        self.closed = False
+        FakeMcrcon.instances.append(self)
+
+    def set_weather(
+            self,
+            weather: str,
+            duration: int | None = None,
+            timeout: float | None = None) -> None:
+        if self.hostname == 'fail':
+            raise ValueError('[ERROR] RCON authentication failed!')
+        if self.hostname == 'hang':
+            FakeMcrcon.released.wait(5)
+        self.commands.append(f'weather {weather}')
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ConcurrencyTracker():
+    """Counts how many requests are in flight at once"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    async def __aenter__(self) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    async def __aexit__(self, *args) -> None:
+        self.active -= 1
+
+
+class ThreadTracker():
+    """Counts how many blocking calls are in flight at once"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> None:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *args) -> None:
+        with self.lock:
+            self.active -= 1
+
+
+class TestFleetTasks():
+    """Tests for the fleet orchestration in main.py"""
+
+    def set_up(self, tmp_path, monkeypatch, *args: str) -> None:
+        monkeypatch.setattr(
+            datastore, 'get_data_path',
+            lambda filename: str(tmp_path / filename))
+        self.parser = ParseArgs(['--config', 'fleet.json', *args])
+        self.servers = [
+            {
+                'name': f'mc{i}',
+                'host': f'mc{i}',
+                'port': 25575,
+                'password': 'secret',
+                'zipcode': 10000 + i,
+                'country_code': 'US'
+            }
+            for i in range(6)
+        ]
+
+    def set_up_fleet(self, monkeypatch, hosts: list[str]) -> None:
+        for server, host in zip(self.servers, hosts):
+            server['host'] = host
+        self.servers = self.servers[:len(hosts)]
+        FakeMcrcon.instances = []
+        FakeMcrcon.released = threading.Event()
+        monkeypatch.setattr(main, 'Mcrcon', FakeMcrcon)
+        monkeypatch.setattr(
+            main, 'get_lat_and_lon_from_zipcode',
+            lambda zipcode, country_code, geocache: (str(zipcode), '1.0'))
+        monkeypatch.setattr(
+            main, 'get_weather', lambda parser, lat, lon: ('rain', None))
+
+    def test_fleet_tasks(self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, monkeypatch, '--server-deadline', '4')
+        self.set_up_fleet(monkeypatch, ['mc0', 'mc1', 'mc2'])
+        mcrcons: dict[str, FakeMcrcon] = {}
+
+        main.fleet_tasks(self.parser, self.servers, mcrcons)
+        assert sorted(mcrcons) == ['mc0', 'mc1', 'mc2']
+        for mcrcon in mcrcons.values():
+            assert mcrcon.commands == ['weather rain']
+            assert mcrcon.timeout == 2
+            assert not mcrcon.closed
+
+        # The connections are reused by the next run
+        main.fleet_tasks(self.parser, self.servers, mcrcons)
+        assert len(FakeMcrcon.instances) == 3
+
+    def test_fleet_tasks_failures(self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, monkeypatch, '--server-deadline', '1')
+        self.set_up_fleet(monkeypatch, ['mc0', 'fail', 'hang'])
+        mcrcons: dict[str, FakeMcrcon] = {}
+
+        start = time.monotonic()
+        try:
+            with pytest.raises(SystemExit):
+                main.fleet_tasks(self.parser, self.servers, mcrcons)
+            assert time.monotonic() - start < 2
+
+            # Only the server that worked keeps its connection
+            ok, failed, hung = FakeMcrcon.instances
+            assert list(mcrcons.values()) == [ok]
+            assert ok.commands == ['weather rain'] and not ok.closed
+            assert failed.closed
+            # The hung job still has its connection until it finishes
+            assert not hung.closed
+        finally:
+            FakeMcrcon.released.set()
+
+        for _ in range(100):
+            if hung.closed:
+                break
+            time.sleep(0.01)
+        assert hung.closed
+
+    def run_async(
+            self,
+            clients: dict[str, FakeAsyncRconClient]) -> list[str]:
+        return asyncio.run(
+            main.async_fleet_tasks(self.parser, self.servers, clients))
+
+    def test_async_fleet_tasks_bounded(self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, monkeypatch, '--async', '--concurrency', '2')
+        geocode = ThreadTracker()
+        weather = ThreadTracker()
+        rcon = ConcurrencyTracker()
+
+        def get_lat_and_lon(
+                zipcode: int, country_code: str, session: None = None,
+                timeout: float = 1) -> tuple[str, str]:
+            with geocode:
+                time.sleep(0.05)
+            return (str(zipcode), '1.0')
+
+        def get_current_weather(
+                lat: str, lon: str, session: None = None,
+                timeout: float = 1) -> int:
+            with weather:
+                time.sleep(0.05)
+            return 501
+
+        monkeypatch.setattr(
+            openweathermap, 'get_lat_and_lon', get_lat_and_lon)
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather', get_current_weather)
+        clients = {
+            server['name']: FakeAsyncRconClient(rcon, server['name'])
+            for server in self.servers
+        }
+
+        assert self.run_async(clients) == []
+        assert geocode.peak == 2
+        assert weather.peak == 2
+        assert rcon.peak == 2
+        assert all(
+            client.commands == ['weather rain']
+            for client in clients.values())
+
+    def test_async_fleet_tasks_slowest_request(
+            self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, monkeypatch, '--async')
+        delays = {'10000': 0.4, '10001': 0.1, '10002': 0.1, '10003': 0.1,
+                  '10004': 0.1, '10005': 0.1}
+
+        def get_lat_and_lon(
+                zipcode: int, country_code: str, session: None = None,
+                timeout: float = 1) -> tuple[str, str]:
+            return (str(zipcode), '1.0')
+
+        def get_current_weather(
+                lat: str, lon: str, session: None = None,
+                timeout: float = 1) -> int:
+            time.sleep(delays[lat])
+            return 800
+
+        monkeypatch.setattr(
+            openweathermap, 'get_lat_and_lon', get_lat_and_lon)
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather', get_current_weather)
+        rcon = ConcurrencyTracker()
+        clients = {
+            server['name']: FakeAsyncRconClient(rcon, server['name'])
+            for server in self.servers
+        }
+
+        start = time.monotonic()
+        assert self.run_async(clients) == []
+        elapsed = time.monotonic() - start
+
+        # The requests overlap, so the run takes about as long as the
+        # slowest one instead of the 0.9s they add up to
+        assert 0.4 <= elapsed < 0.7
+
+    def test_async_fleet_tasks_timeout(self, tmp_path, monkeypatch) -> None:
+        self.set_up(
+            tmp_path, monkeypatch, '--async', '--request-timeout', '1',
+            '--refresh-timeout', '1')
+        self.servers = self.servers[:2]
+        cache = WeatherCache(ttl=0, stale_ttl=3600)
+        cache.set('10000', '1.0', 501)
+        released = threading.Event()
+
+        def get_lat_and_lon(
+                zipcode: int, country_code: str, session: None = None,
+                timeout: float = 1) -> tuple[str, str]:
+            return (str(zipcode), '1.0')
+
+        def get_current_weather(
+                lat: str, lon: str, session: None = None,
+                timeout: float = 1) -> int:
+            released.wait(5)
+            return 800
+
+        monkeypatch.setattr(
+            openweathermap, 'get_lat_and_lon', get_lat_and_lon)
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather', get_current_weather)
+        rcon = ConcurrencyTracker()
+        clients = {
+            server['name']: FakeAsyncRconClient(rcon, server['name'])
+            for server in self.servers
+        }
+
+        start = time.monotonic()
+        try:
+            failed = self.run_async(clients)
+        finally:
+            released.set()
+
+        # The second location is given up on after both timeouts
+        assert time.monotonic() - start < 3
+        # The first location falls back to its stale weather, the second
+        # has none to fall back to
+        assert failed == ['mc1']
+        assert clients['mc0'].commands == ['weather rain']
+        assert clients['mc1'].commands == []
+
+        # The refresh that was given up on still fills the cache
+        main.wait_for_refreshes(5)
+        assert cache.get_stale('10000', '1.0') == 800
+
+    def test_async_fleet_tasks_forecast_fallback(
+            self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, monkeypatch, '--async', '--forecast')
+        self.servers = self.servers[:2]
+        hour = int(time.time()) // 3600 * 3600
+        now = time.time()
+        with monkeypatch.context() as context:
+            context.setattr(time, 'time', lambda: now - 2 * 86400)
+            ForecastCache().set_timeline('10000', '1.0', [
+                {'dt': hour, 'weather': 'rain', 'pop': 0.8},
+                {'dt': hour + 3600, 'weather': 'clear', 'pop': 0.0},
+            ])
+
+        def get_lat_and_lon(
+                zipcode: int, country_code: str, session: None = None,
+                timeout: float = 1) -> tuple[str, str]:
+            return (str(zipcode), '1.0')
+
+        def get_hourly_forecast(
+                lat: str, lon: str, session: None = None,
+                timeout: float = 1) -> list[dict[str, int]]:
+            raise ValueError('API down')
+
+        monkeypatch.setattr(
+            openweathermap, 'get_lat_and_lon', get_lat_and_lon)
+        monkeypatch.setattr(
+            openweathermap, 'get_hourly_forecast', get_hourly_forecast)
+        rcon = ConcurrencyTracker()
+        clients = {
+            server['name']: FakeAsyncRconClient(rcon, server['name'])
+            for server in self.servers
+        }
+
+        # The first location holds its last forecast while the API is
+        # down, the second has none to hold
+        assert self.run_async(clients) == ['mc1']
+        assert clients['mc0'].commands[0].startswith('weather rain')
+        assert clients['mc1'].commands == []
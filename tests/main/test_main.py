@@ -1,9 +1,23 @@
 #!/usr/bin/env python3
 """TestMain() class file"""
+import json
+import os
 import pytest
 import random
+import subprocess
+import sys
+import time
 
 import main
+from mcrcon.mcrcon import Mcrcon
+from mcrcon.presencestate import PresenceState
+from metrics import metrics
+from openweathermap import geoindex, openweathermap
+from openweathermap.geocache import GeocodeCache
+from openweathermap.quota import QuotaExceededError
+from openweathermap.weathercache import WeatherCache
+from parseargs.parseargs import ParseArgs
+from scheduler.scheduler import Scheduler
 
 
 class TestMain():
@@ -25,3 +39,228 @@ class TestMain():
 
         weather_id = random.randint(-1000, 199)
         assert main.map_weather_id_to_minecraft_weather(weather_id) == 'clear'
+
+    def test_build_timeline(self) -> None:
+        hourly = [
+            {'dt': 1684926000, 'id': 803, 'pop': 0.0},
+            {'dt': 1684929600, 'id': 501, 'pop': 0.6},
+            {'dt': 1684933200, 'id': 211, 'pop': 0.9},
+        ]
+        assert main.build_timeline(hourly) == [
+            {'dt': 1684926000, 'weather': 'clear', 'pop': 0.0},
+            {'dt': 1684929600, 'weather': 'rain', 'pop': 0.6},
+            {'dt': 1684933200, 'weather': 'thunder', 'pop': 0.9},
+        ]
+
+    def test_get_current_weather_serves_stale(
+            self, tmp_path, monkeypatch) -> None:
+        cache = WeatherCache(str(tmp_path / 'weather.json'), 0, 3600)
+        cache.set('1.0', '2.0', 501)
+
+        def slow_weather(lat: str, lon: str, timeout: float) -> int:
+            time.sleep(0.3)
+            return 800
+
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather', slow_weather)
+        start = time.monotonic()
+        assert main.get_current_weather('1.0', '2.0', cache, 0.05) == 501
+        assert time.monotonic() - start < 0.25
+
+        # The refresh still lands in the cache for the next run
+        time.sleep(0.4)
+        assert cache.get_stale('1.0', '2.0') == 800
+
+    def test_get_current_weather_refreshes(
+            self, tmp_path, monkeypatch) -> None:
+        cache = WeatherCache(str(tmp_path / 'weather.json'), 0, 3600)
+        cache.set('1.0', '2.0', 501)
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather',
+            lambda lat, lon, timeout: 800)
+        assert main.get_current_weather('1.0', '2.0', cache, 1) == 800
+
+    def test_get_current_weather_error_is_not_clear(
+            self, tmp_path, monkeypatch) -> None:
+        cache = WeatherCache(str(tmp_path / 'weather.json'), 0, 3600)
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather',
+            lambda lat, lon, timeout: -1)
+        with pytest.raises(SystemExit):
+            main.get_current_weather('1.0', '2.0', cache, 1)
+
+    def test_get_lat_and_lon_prefers_index(
+            self, tmp_path, monkeypatch) -> None:
+        dump = tmp_path / 'allCountries.txt'
+        dump.write_text('\t'.join([
+            'US', '01234', 'Somewhere', 'MA', '', '', '', '', '',
+            '42.1', '-72.5', '4']) + '\n', encoding='utf-8')
+        db_path = str(tmp_path / 'postal.sqlite')
+        geoindex.build_index(str(dump), db_path)
+        monkeypatch.setattr(geoindex, 'get_index_path', lambda: db_path)
+        monkeypatch.setattr(
+            openweathermap, 'get_lat_and_lon',
+            lambda zipcode, country_code, timeout: ('40.7', '-74.0'))
+        geocache = GeocodeCache(str(tmp_path / 'geocode.json'))
+
+        # Zipcodes in the index are never copied into the cache
+        assert main.get_lat_and_lon_from_zipcode(
+            1234, 'US', geocache) == ('42.1', '-72.5')
+        assert geocache.get(1234, 'US') is None
+
+        assert main.get_lat_and_lon_from_zipcode(
+            10001, 'US', geocache) == ('40.7', '-74.0')
+        assert geocache.get(10001, 'US') == ('40.7', '-74.0')
+
+    def test_check_presence(self, tmp_path, monkeypatch) -> None:
+        mcrcon = Mcrcon('rcon', '127.0.0.1', 'secret', 25575)
+        state = PresenceState(str(tmp_path / 'presence_state.json'))
+        counts = iter(['2', '0', '0', '1'])
+        monkeypatch.setattr(
+            mcrcon, 'get_count_of_players_online', lambda: next(counts))
+
+        assert main.check_presence(mcrcon, state) == (True, False)
+        assert main.check_presence(mcrcon, state) == (False, False)
+        assert main.check_presence(mcrcon, state) == (False, False)
+        assert main.check_presence(mcrcon, state) == (True, True)
+
+    def test_get_minutely_weather(self, monkeypatch) -> None:
+        now = int(time.time()) // 60 * 60
+        minutely = [
+            {'dt': now + minute * 60, 'precipitation': 0}
+            for minute in range(60)
+        ]
+        for minute in minutely[20:]:
+            minute['precipitation'] = 1.2
+        data = {'id': 803, 'minutely': minutely}
+        monkeypatch.setattr(
+            openweathermap, 'get_minutely_weather',
+            lambda lat, lon, timeout: data)
+
+        weather, duration, change = main.get_minutely_weather('1.0', '2.0')
+        assert weather == 'clear'
+        assert change == (now + 1200, 'rain')
+        assert duration == pytest.approx(now + 1200 - time.time(), abs=1)
+
+        # Already raining, so nothing changes when the rain starts
+        data['id'] = 501
+        assert main.get_minutely_weather('1.0', '2.0') == ('rain', None, None)
+
+    def test_update_weather_drops_scheduled_change(
+            self, monkeypatch) -> None:
+        mcrcon = Mcrcon('rcon', '127.0.0.1', 'secret', 25575)
+        scheduler = Scheduler(60)
+        parser = ParseArgs(['-z', '01234', '--skip-empty'])
+
+        # Nobody is online, so this update is skipped
+        scheduler.call_later('minutely', 600, lambda: None)
+        monkeypatch.setattr(
+            main, 'check_presence', lambda mcrcon, state: (False, False))
+        assert main.update_weather(parser, mcrcon, scheduler) is None
+        assert scheduler._timers == {}
+
+        # The daily API budget is spent
+        def get_weather(parser, lat, lon, timeout):
+            raise QuotaExceededError('Daily API budget spent!')
+
+        scheduler.call_later('minutely', 600, lambda: None)
+        monkeypatch.setattr(
+            main, 'check_presence', lambda mcrcon, state: (True, False))
+        monkeypatch.setattr(
+            main, 'get_lat_and_lon_from_zipcode',
+            lambda zipcode, country_code, geocache, timeout: ('1.0', '2.0'))
+        monkeypatch.setattr(main, 'get_weather', get_weather)
+        assert main.update_weather(parser, mcrcon, scheduler) is None
+        assert scheduler._timers == {}
+
+    def test_update_weather_rcon_deadline(self, monkeypatch) -> None:
+        mcrcon = Mcrcon('rcon', '127.0.0.1', 'secret', 25575)
+        parser = ParseArgs(['-z', '01234', '--deadline', '1'])
+        closed: list[bool] = []
+
+        def set_weather(*args) -> bool:
+            time.sleep(3)
+            return True
+
+        monkeypatch.setattr(
+            main, 'get_lat_and_lon_from_zipcode',
+            lambda zipcode, country_code, geocache, timeout: ('1.0', '2.0'))
+        monkeypatch.setattr(
+            main, 'get_weather',
+            lambda parser, lat, lon, timeout: ('rain', None))
+        monkeypatch.setattr(main, 'set_weather', set_weather)
+        monkeypatch.setattr(mcrcon, 'close', lambda: closed.append(True))
+
+        # Every socket operation fits in the budget on its own, but the
+        # stage as a whole doesn't
+        start = time.monotonic()
+        with pytest.raises(SystemExit):
+            main.update_weather(parser, mcrcon)
+        assert time.monotonic() - start < 2
+        assert closed == [True]
+
+    def test_export_metrics_times_logging(self, tmp_path) -> None:
+        path = tmp_path / 'metrics.json'
+        parser = ParseArgs(['-z', '01234', '--metrics-json', str(path)])
+        main.export_metrics(parser)
+        assert 'log' in json.loads(path.read_text())['stages']
+
+    def test_scheduled_change_failure(self, monkeypatch) -> None:
+        mcrcon = Mcrcon('rcon', '127.0.0.1', 'secret', 25575)
+        scheduler = Scheduler(60)
+        parser = ParseArgs(['-z', '01234'])
+        failures = metrics.get_counter('run_failures_total')
+
+        def set_weather(*args) -> bool:
+            sys.exit(1)
+
+        monkeypatch.setattr(main, 'set_weather', set_weather)
+        main.schedule_weather_change(
+            parser, mcrcon, scheduler, int(time.time()), 'rain')
+
+        # The failure stays inside the callback instead of stopping the
+        # daemon's scheduler
+        assert not scheduler._wait(time.monotonic() + 0.1)
+        assert metrics.get_counter('run_failures_total') == failures + 1
+
+    def test_refresh_outlives_the_run(self, tmp_path) -> None:
+        """A refresh that is slower than the refresh timeout still fills
+        the cache before a single run's process exits"""
+        root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        cache = WeatherCache(str(tmp_path / 'data' / 'weather.json'), 0, 3600)
+        cache.set('1.0', '2.0', 501)
+        script = '\n'.join([
+            'import sys, time',
+            'import main',
+            'from mcrcon.mcrcon import Mcrcon',
+            'from openweathermap import openweathermap',
+            'def slow_weather(lat, lon, timeout):',
+            '    time.sleep(1.5)',
+            '    return 800',
+            'openweathermap.get_current_weather = slow_weather',
+            'openweathermap.get_lat_and_lon = '
+            'lambda zipcode, country_code, timeout: ("1.0", "2.0")',
+            'Mcrcon.set_weather = lambda self, *args: None',
+            'sys.argv = ["main.py", "-z", "01234", "--refresh-timeout", "1"]',
+            'main.main()',
+        ])
+        env = dict(
+            os.environ, OPENWEATHERMAP_API_KEY='x', PYTHONPATH=root,
+            MCRCON_HOST='127.0.0.1', MCRCON_PASS='secret')
+
+        # Run it as a script so the data and logs land under tmp_path
+        (tmp_path / 'logs').mkdir()
+        (tmp_path / 'run.py').write_text(script, encoding='utf-8')
+        output = subprocess.run(
+            [sys.executable, 'run.py'], cwd=tmp_path, env=env,
+            capture_output=True, text=True, timeout=30)
+        assert output.returncode == 0, output.stderr
+
+        # The run used the stale weather, but the refresh still landed
+        state = json.loads(
+            (tmp_path / 'data' / 'weather_state.json').read_text())
+        assert [entry['weather'] for entry in state.values()] == ['rain']
+        assert WeatherCache(
+            str(tmp_path / 'data' / 'weather.json'), 0, 3600
+        ).get_stale('1.0', '2.0') == 800
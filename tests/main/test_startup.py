@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""TestStartup() class file"""
+import os
+import subprocess
+import sys
+
+# Modules that must only be imported on the paths that need them
+HEAVY_MODULES: list[str] = [
+    'requests', 'urllib3', 'asyncio', 'concurrent.futures', 'subprocess',
+    'sqlite3'
+]
+
+
+class TestStartup():
+    """Startup benchmarks for main.py based on `python -X importtime`"""
+
+    def set_up(self) -> None:
+        self.root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def get_import_times(self, *args: str) -> dict[str, int]:
+        """Run python -X importtime and return the cumulative time in
+        microseconds of every module imported, by module name"""
+        env = dict(os.environ, OPENWEATHERMAP_API_KEY='x')
+        output = subprocess.run(
+            [sys.executable, '-X', 'importtime', *args],
+            cwd=self.root, env=env, capture_output=True, text=True,
+            timeout=60)
+
+        # A module already imported by the interpreter itself (e.g. from a
+        # .pth file) is not reported, so compare against a bare startup
+        baseline = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'pass'],
+            cwd=self.root, env=env, capture_output=True, text=True,
+            timeout=60)
+        preloaded: set[str] = set(self._parse(baseline.stderr))
+
+        return {
+            name: cumulative
+            for name, cumulative in self._parse(output.stderr).items()
+            if name not in preloaded
+        }
+
+    def _parse(self, stderr: str) -> dict[str, int]:
+        times: dict[str, int] = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            times[name.strip()] = int(cumulative)
+        return times
+
+    def assert_not_imported(self, times: dict[str, int]) -> None:
+        for name in times:
+            for heavy in HEAVY_MODULES:
+                assert name != heavy and not name.startswith(f'{heavy}.'), (
+                    f'{heavy} is imported on startup')
+
+    def test_version(self) -> None:
+        self.set_up()
+        times = self.get_import_times('main.py', '-v')
+        assert 'parseargs.parseargs' in times
+        self.assert_not_imported(times)
+
+    def test_import_main(self) -> None:
+        self.set_up()
+        times = self.get_import_times('-c', 'import main')
+        assert 'main' in times
+        self.assert_not_imported(times)
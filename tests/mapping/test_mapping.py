@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""TestWeatherMapping class file"""
+import json
+import random
+
+import pytest
+
+from mapping import mapping
+from mapping.mapping import WeatherMapping
+
+
+class TestWeatherMapping():
+    """Tests for functions and classes in mapping.py"""
+
+    def test_parse_codes(self) -> None:
+        assert list(mapping.parse_codes(500)) == [500]
+        assert list(mapping.parse_codes('502-504')) == [502, 503, 504]
+        assert list(mapping.parse_codes('6xx')) == list(range(600, 700))
+        assert mapping.parse_codes([200, '210-211']) == [200, 210, 211]
+
+        for codes in ['abc', '504-502', '1000', '-1', 'xx', '5x']:
+            with pytest.raises(ValueError):
+                mapping.parse_codes(codes)
+
+    def test_default_rules(self) -> None:
+        weather_mapping = WeatherMapping()
+        assert weather_mapping.map(-1) == 'clear'
+        assert weather_mapping.map(random.randint(700, 1000)) == 'clear'
+        assert weather_mapping.map(random.randint(300, 699)) == 'rain'
+        assert weather_mapping.map(random.randint(200, 299)) == 'thunder'
+        assert weather_mapping.map(random.randint(-1000, 199)) == 'clear'
+
+    def test_custom_rules(self) -> None:
+        weather_mapping = WeatherMapping([
+            {'codes': '502-504', 'weather': 'thunder'},
+            {'codes': '6xx', 'weather': 'rain'},
+        ])
+        assert weather_mapping.map(501) == 'rain'
+        assert weather_mapping.map(503) == 'thunder'
+        assert weather_mapping.map(601) == 'rain'
+        assert weather_mapping.map(800) == 'clear'
+
+        with pytest.raises(ValueError):
+            WeatherMapping([{'codes': 500, 'weather': 'snow'}])
+
+        with pytest.raises(ValueError):
+            WeatherMapping(default='snow')
+
+    def test_map_many(self) -> None:
+        weather_mapping = WeatherMapping()
+        ids = [random.randint(-100, 1100) for _ in range(1000)]
+        assert weather_mapping.map_many(ids) == [
+            weather_mapping.map(weather_id) for weather_id in ids]
+        assert weather_mapping.map_many([211, 500, 800]) == [
+            'thunder', 'rain', 'clear']
+        assert weather_mapping.map_many([500]) == ['rain']
+        assert weather_mapping.map_many([]) == []
+
+    def test_from_file(self, tmp_path) -> None:
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps({
+            'default': 'rain',
+            'rules': [{'codes': [771, 781], 'weather': 'thunder'}]
+        }), encoding='utf-8')
+
+        weather_mapping = WeatherMapping.from_file(str(path))
+        assert weather_mapping.map(781) == 'thunder'
+        assert weather_mapping.map(150) == 'rain'
+        assert weather_mapping.map(1000) == 'rain'
+
+        # The default rules still cover 7xx and 8xx, and an API error is
+        # never turned into rain
+        assert weather_mapping.map(800) == 'clear'
+        assert weather_mapping.map(701) == 'clear'
+        assert weather_mapping.map(-1) == 'clear'
+        assert weather_mapping.map_many([800, 701, -1]) == [
+            'clear', 'clear', 'clear']
+
+        path.write_text('{"rules": "nope"}', encoding='utf-8')
+        with pytest.raises(ValueError):
+            WeatherMapping.from_file(str(path))
+
+        with pytest.raises(ValueError):
+            WeatherMapping.from_file(str(tmp_path / 'missing.json'))
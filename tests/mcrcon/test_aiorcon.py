@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""TestAsyncRconClient class file"""
+import asyncio
+
+import pytest
+
+from mcrcon.aiorcon import AsyncRconClient
+from tests.mcrcon.test_rcon import FakeRconServer
+
+
+class TestAsyncRconClient():
+    """Tests for the AsyncRconClient class in aiorcon.py"""
+
+    def test_command_reuses_connection(self) -> None:
+        server = FakeRconServer('secret')
+
+        async def run() -> list[bytes]:
+            client = AsyncRconClient('127.0.0.1', 'secret', server.port)
+            try:
+                return await asyncio.gather(
+                    client.command('weather rain'), client.command('list'))
+            finally:
+                await client.close()
+
+        try:
+            first, second = asyncio.run(run())
+            assert first == 'ran §aweather rain!'.encode()
+            assert second == 'ran §alist!'.encode()
+            assert server.logins == 1
+        finally:
+            server.stop()
+
+    def test_bad_password(self) -> None:
+        server = FakeRconServer('secret')
+
+        async def run() -> None:
+            client = AsyncRconClient('127.0.0.1', 'wrong', server.port)
+            with pytest.raises(ValueError):
+                await client.command('list')
+            assert not client.connected
+
+        try:
+            asyncio.run(run())
+        finally:
+            server.stop()
+
+    def test_command_replaces_dropped_connection(self) -> None:
+        server = FakeRconServer('secret')
+
+        async def run() -> bytes:
+            client = AsyncRconClient('127.0.0.1', 'secret', server.port)
+            try:
+                await client.command('weather rain')
+                server.drop()
+                await asyncio.sleep(0.1)
+                return await client.command('list')
+            finally:
+                await client.close()
+
+        try:
+            assert asyncio.run(run()) == 'ran §alist!'.encode()
+            assert server.commands == ['weather rain', 'list']
+            assert server.logins == 2
+        finally:
+            server.stop()
+
+    def test_command_send_failure_is_retried(self) -> None:
+        server = FakeRconServer('secret')
+
+        def write(data: bytes) -> None:
+            raise BrokenPipeError('Broken pipe')
+
+        async def run() -> bytes:
+            client = AsyncRconClient('127.0.0.1', 'secret', server.port)
+            try:
+                await client.command('list')
+                assert client._writer is not None
+                client._writer.write = write
+                return await client.command('say hi')
+            finally:
+                await client.close()
+
+        try:
+            assert asyncio.run(run()) == 'ran §asay hi!'.encode()
+            assert server.commands == ['list', 'say hi']
+            assert server.logins == 2
+        finally:
+            server.stop()
+
+    def test_command_timeout_is_not_resent(self) -> None:
+        server = FakeRconServer('secret')
+        server.silent = True
+
+        async def run() -> None:
+            client = AsyncRconClient('127.0.0.1', 'secret', server.port, 0.2)
+            with pytest.raises(asyncio.TimeoutError):
+                await client.command('say hi')
+            assert not client.connected
+
+        try:
+            asyncio.run(run())
+            assert server.commands == ['say hi']
+        finally:
+            server.stop()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""TestResponseDecoder class file"""
+from mcrcon.decoder import ResponseDecoder
+
+
+class TestResponseDecoder():
+    """Tests for the ResponseDecoder class in decoder.py"""
+
+    def test_decode_strips_format_codes(self) -> None:
+        decoder = ResponseDecoder()
+        raw = '§6There are §c1§6 of a max of §c20§6 players online:'
+        raw = raw.encode()
+        assert decoder.decode(raw) == [
+            'There are 1 of a max of 20 players online:'
+        ]
+
+    def test_decode_strips_ansi_codes(self) -> None:
+        decoder = ResponseDecoder()
+        raw = b'\x1b[0;33mChanging to rain\x1b[0m\n\x1b[0m'
+        assert decoder.decode(raw) == ['Changing to rain']
+
+    def test_decode_strips_noise(self) -> None:
+        decoder = ResponseDecoder()
+        raw = (b'Saved the game\n'
+               b'Automatic saving is now disabledThere are 0 of a max of '
+               b'20 players online:\nAutomatic saving is now enabled')
+        assert decoder.decode(raw) == [
+            'There are 0 of a max of 20 players online:'
+        ]
+
+    def test_decode_large_output(self) -> None:
+        decoder = ResponseDecoder()
+        raw = b'\x1b[0mSaved the game\n\xc2\xa7aline\n' * 10000
+        assert decoder.decode(raw) == ['line'] * 10000
+
+    def test_parse_list(self) -> None:
+        decoder = ResponseDecoder()
+        player_list = decoder.parse_list([
+            'Saving...',
+            'There are 3 of a max of 20 players online: alice, bob_2, Eve'
+        ])
+        assert player_list is not None
+        assert player_list.count == 3
+        assert player_list.max_players == 20
+        assert player_list.names == ['alice', 'bob_2', 'Eve']
+
+    def test_parse_list_empty(self) -> None:
+        decoder = ResponseDecoder()
+        player_list = decoder.parse_list(['There are 0/10 players online:'])
+        assert player_list is not None
+        assert player_list.count == 0
+        assert player_list.max_players == 10
+        assert player_list.names == []
+
+    def test_parse_list_not_a_list(self) -> None:
+        decoder = ResponseDecoder()
+        assert decoder.parse_list(['Unknown command']) is None
+        assert decoder.parse_list([]) is None
+
+    def test_parse_list_essentials(self) -> None:
+        decoder = ResponseDecoder()
+        raw = '§6There are §c1§6 out of maximum §c20§6 players online.'
+        player_list = decoder.parse_list(decoder.decode(raw.encode()))
+        assert player_list is not None
+        assert player_list.count == 1
+        assert player_list.max_players == 20
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""TestFanOut class file"""
+import threading
+import time
+
+import pytest
+
+from mcrcon.fanout import FanOut
+
+
+class TestFanOut():
+    """Tests for the FanOut class in fanout.py"""
+
+    def test_invalid_settings(self) -> None:
+        with pytest.raises(ValueError):
+            FanOut(workers=0)
+
+        with pytest.raises(ValueError):
+            FanOut(deadline=0)
+
+    def test_run(self) -> None:
+        def fail() -> None:
+            raise ValueError('RCON authentication failed!')
+
+        report = FanOut(workers=2).run({
+            'a': lambda: 'ok',
+            'b': fail,
+        })
+        assert [r['server'] for r in report['succeeded']] == ['a']
+        assert report['succeeded'][0]['result'] == 'ok'
+        assert report['failed'][0]['server'] == 'b'
+        assert report['failed'][0]['error'] == 'RCON authentication failed!'
+        assert FanOut().run({}) == {'succeeded': [], 'failed': []}
+
+    def test_run_deadline(self) -> None:
+        release = threading.Event()
+        start = time.monotonic()
+        report = FanOut(workers=2, deadline=0.2).run({
+            'dead': lambda: release.wait(5),
+            'b': lambda: None,
+            'c': lambda: None,
+            'd': lambda: None,
+        })
+        release.set()
+
+        assert time.monotonic() - start < 1
+        assert sorted(r['server'] for r in report['succeeded']) == [
+            'b', 'c', 'd']
+        assert report['failed'][0]['server'] == 'dead'
+        assert report['failed'][0]['latency'] >= 0.2
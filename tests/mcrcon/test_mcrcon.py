@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""TestMcrcon class file"""
+import pytest
+
+from mcrcon.mcrcon import Mcrcon
+from tests.mcrcon.test_rcon import FakeRconServer, UnwritableSocket
+
+
+class TestMcrcon():
+    """Tests for the Mcrcon class in mcrcon.py"""
+
+    def set_up(self, monkeypatch: pytest.MonkeyPatch) -> FakeRconServer:
+        server = FakeRconServer('secret')
+        monkeypatch.setenv('MCRCON_HOST', '127.0.0.1')
+        monkeypatch.setenv('MCRCON_PASS', 'secret')
+        monkeypatch.setenv('MCRCON_PORT', str(server.port))
+        return server
+
+    def test_set_weather(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            mcrcon.set_weather('rain')
+            mcrcon.set_weather('clear')
+            assert server.commands == ['weather rain', 'weather clear']
+            assert server.logins == 1
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_set_weather_duration(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            mcrcon.set_weather('thunder', 600)
+            mcrcon.set_weather('clear', 0)
+            mcrcon.set_weather('rain', 5000000)
+            assert server.commands == [
+                'weather thunder 600s',
+                'weather clear 1s',
+                'weather rain 1000000s'
+            ]
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_set_weather_value_error(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            with pytest.raises(ValueError):
+                mcrcon.set_weather('snow')
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_command_strips_formatting(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            assert mcrcon._run_command('list') == ['ran list!']
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_get_online_players(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        whitelist = [{'name': f'player_{i}'} for i in range(1000)]
+        try:
+            monkeypatch.setattr(mcrcon, '_run_command', lambda cmd: [
+                'There are 2 of a max of 20 players online: '
+                'player_7, player_999'
+            ])
+            online = mcrcon.get_online_players(whitelist)
+            assert len(online) == 1000
+            assert online[7] == {'player': 'player_7', 'count': 1}
+            assert online[8] == {'player': 'player_8', 'count': 0}
+            assert sum(player['count'] for player in online) == 2
+            assert mcrcon.get_count_of_players_online() == '2'
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_get_presence_diff(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        polls = iter([
+            ['There are 1 of a max of 20 players online: alice'],
+            ['There are 1 of a max of 20 players online: bob_builder']
+        ])
+        try:
+            monkeypatch.setattr(
+                mcrcon, '_run_command', lambda cmd: next(polls))
+            assert mcrcon.presence is None
+            mcrcon.get_presence()
+            previous = mcrcon.presence
+            joined, left = mcrcon.get_presence().diff(previous)
+            assert joined == ['bob_builder']
+            assert left == ['alice']
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_command_reconnects(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            mcrcon._run_command('list')
+            assert mcrcon._client is not None
+            mcrcon._client._socket = UnwritableSocket(mcrcon._client._socket)
+            assert mcrcon._run_command('say hi') == ['ran say hi!']
+            assert server.commands == ['list', 'say hi']
+            assert server.logins == 2
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_command_timeout_not_resent(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        server.silent = True
+        mcrcon = Mcrcon(timeout=0.2)
+        try:
+            with pytest.raises(ValueError):
+                mcrcon._run_command('say hi')
+            assert server.commands == ['say hi']
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_batch(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            results = mcrcon.run_batch(['weather rain', 'list', 'x' * 2000])
+            assert all(result['error'] for result in results)
+            assert server.commands == []
+
+            results = mcrcon.run_batch(['weather rain', 'list'])
+            assert results == [
+                {
+                    'command': 'weather rain',
+                    'output': ['ran weather rain!'],
+                    'error': None
+                },
+                {'command': 'list', 'output': ['ran list!'], 'error': None}
+            ]
+            assert server.logins == 1
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_batch_reconnects(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon()
+        try:
+            mcrcon._run_command('list')
+            assert mcrcon._client is not None
+            mcrcon._client._socket = UnwritableSocket(mcrcon._client._socket)
+            assert mcrcon._run_rcon_batch(['say 1', 'say 2']) == [
+                ['ran say 1!'], ['ran say 2!']]
+            assert server.commands == ['list', 'say 1', 'say 2']
+            assert server.logins == 2
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_batch_timeout_not_resent(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        server.silent = True
+        mcrcon = Mcrcon(timeout=0.2)
+        try:
+            results = mcrcon.run_batch(['say 1', 'say 2'])
+            assert all(result['error'] for result in results)
+            assert server.commands == ['say 1', 'say 2']
+        finally:
+            mcrcon.close()
+            server.stop()
+
+    def test_run_batch_mcrcon(
+            self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        mcrcon = Mcrcon('mcrcon')
+
+        def run(cmd: str, timeout: float | None = None) -> list[str]:
+            if cmd == 'bad':
+                raise ValueError('[ERROR] bad')
+            return [f'ran {cmd}']
+
+        try:
+            monkeypatch.setattr(mcrcon, '_run_mcrcon_command', run)
+            assert mcrcon.run_batch(['bad', 'list']) == [
+                {'command': 'bad', 'output': [], 'error': '[ERROR] bad'},
+                {'command': 'list', 'output': ['ran list'], 'error': None}
+            ]
+        finally:
+            server.stop()
+
+    def test_invalid_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        server = self.set_up(monkeypatch)
+        try:
+            with pytest.raises(SystemExit):
+                Mcrcon('telnet')
+        finally:
+            server.stop()
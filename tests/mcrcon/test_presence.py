@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""TestPlayerPresence class file"""
+from mcrcon.presence import PlayerPresence
+
+
+class TestPlayerPresence():
+    """Tests for the PlayerPresence class in presence.py"""
+
+    def test_is_online(self) -> None:
+        presence = PlayerPresence(['Alice', 'bob_2'])
+        assert presence.count == 2
+        assert presence.names == ['Alice', 'bob_2']
+        assert presence.is_online('alice')
+        assert presence.is_online('bob_2')
+        assert not presence.is_online('bob')
+
+    def test_reported_count(self) -> None:
+        presence = PlayerPresence(['Alice'], 3)
+        assert presence.count == 3
+        assert PlayerPresence().count == 0
+
+    def test_diff(self) -> None:
+        previous = PlayerPresence(['alice', 'bob', 'carol'])
+        current = PlayerPresence(['Bob', 'dave', 'carol'])
+        assert current.diff(previous) == (['dave'], ['alice'])
+        assert current.diff(None) == (['Bob', 'dave', 'carol'], [])
+        assert current.diff(current) == ([], [])
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""TestPresenceState class file"""
+import time
+
+from mcrcon.presencestate import PresenceState
+
+
+class TestPresenceState():
+    """Tests for the PresenceState class in presencestate.py"""
+
+    def test_record(self, tmp_path) -> None:
+        state = PresenceState(str(tmp_path / 'presence_state.json'))
+        assert not state.record('localhost:25575', 2)
+        assert state.get('localhost:25575') is None
+        assert state.needs_update('localhost:25575')
+
+        assert not state.record('localhost:25575', 0)
+        assert state.get('localhost:25575') is not None
+        assert not state.needs_update('localhost:25575')
+
+        # Another run sees the server is empty, and that a player joined
+        state = PresenceState(str(tmp_path / 'presence_state.json'))
+        assert not state.record('localhost:25575', 0)
+        assert state.record('localhost:25575', 1)
+        assert state.get('localhost:25575') is None
+
+    def test_empty_interval(self, tmp_path, monkeypatch) -> None:
+        state = PresenceState(str(tmp_path / 'presence_state.json'), 600)
+        state.record('localhost:25575', 0)
+        assert not state.needs_update('localhost:25575')
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 601)
+        assert state.needs_update('localhost:25575')
+        state.set_updated('localhost:25575')
+        assert not state.needs_update('localhost:25575')
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""TestRconClient class file"""
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from mcrcon.rcon import RconClient, StaleConnectionError
+
+
+class FakeRconServer():
+    """A tiny single-connection RCON server that echoes commands back"""
+
+    def __init__(self, password: str) -> None:
+        self.password = password
+        self.logins = 0
+        self.commands: list[str] = []
+        self.silent = False
+        self.conn: socket.socket | None = None
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def recv_packet(self, conn: socket.socket) -> tuple[int, int, str]:
+        header = conn.recv(4, socket.MSG_WAITALL)
+        if len(header) < 4:
+            raise OSError('closed')
+        (length,) = struct.unpack('<i', header)
+        data = conn.recv(length, socket.MSG_WAITALL)
+        request_id, packet_type = struct.unpack('<ii', data[:8])
+        return (request_id, packet_type, data[8:-2].decode())
+
+    def send_packet(
+            self, conn: socket.socket, request_id: int, body: str) -> None:
+        payload = struct.pack('<ii', request_id, 0) + body.encode() + b'\0\0'
+        conn.sendall(struct.pack('<i', len(payload)) + payload)
+
+    def serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.conn = conn
+            with conn:
+                try:
+                    request_id, _, body = self.recv_packet(conn)
+                    self.logins += 1
+                    if body != self.password:
+                        request_id = -1
+                    payload = struct.pack('<ii', request_id, 2) + b'\0\0'
+                    conn.sendall(struct.pack('<i', len(payload)) + payload)
+
+                    while True:
+                        request_id, packet_type, body = self.recv_packet(conn)
+                        if packet_type != 2:
+                            if self.silent:
+                                continue
+                            self.send_packet(
+                                conn, request_id, 'Unknown request 0')
+                            continue
+                        self.commands.append(body)
+                        if self.silent:
+                            continue
+                        # Split the response to mimic large output
+                        self.send_packet(conn, request_id, f'ran §a{body}')
+                        self.send_packet(conn, request_id, '!')
+                except OSError:
+                    continue
+
+    def drop(self) -> None:
+        """Close the open connection, like a server dropping an idle one"""
+        if self.conn is not None:
+            self.conn.shutdown(socket.SHUT_RDWR)
+
+    def stop(self) -> None:
+        self.listener.close()
+
+
+class UnwritableSocket():
+    """A connected socket the server has silently stopped listening on"""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def settimeout(self, timeout: float | None) -> None:
+        self.sock.settimeout(timeout)
+
+    def sendall(self, data: bytes) -> None:
+        raise BrokenPipeError('Broken pipe')
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class TestRconClient():
+    """Tests for the RconClient class in rcon.py"""
+
+    def test_command_reuses_connection(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                first = client.command('weather rain')
+                second = client.command('list')
+
+            assert first == 'ran §aweather rain!'.encode()
+            assert second == 'ran §alist!'.encode()
+            assert server.commands == ['weather rain', 'list']
+            assert server.logins == 1
+        finally:
+            server.stop()
+
+    def test_command_replaces_dropped_connection(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                client.command('weather rain')
+                server.drop()
+                time.sleep(0.1)
+                assert client.command('list') == 'ran §alist!'.encode()
+
+            assert server.commands == ['weather rain', 'list']
+            assert server.logins == 2
+        finally:
+            server.stop()
+
+    def test_command_send_failure_is_stale(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                client.command('list')
+                client._socket = UnwritableSocket(client._socket)
+                with pytest.raises(StaleConnectionError):
+                    client.command('say hi')
+                assert not client.connected
+
+            assert server.commands == ['list']
+        finally:
+            server.stop()
+
+    def test_command_recv_timeout_is_not_stale(self) -> None:
+        server = FakeRconServer('secret')
+        server.silent = True
+        try:
+            client = RconClient('127.0.0.1', 'secret', server.port, 0.2)
+            with client:
+                with pytest.raises(OSError) as err:
+                    client.command('say hi')
+                assert not isinstance(err.value, StaleConnectionError)
+                assert not client.connected
+
+            assert server.commands == ['say hi']
+        finally:
+            server.stop()
+
+    def test_bad_password(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            client = RconClient('127.0.0.1', 'wrong', server.port)
+            with pytest.raises(ValueError):
+                client.connect()
+            assert not client.connected
+        finally:
+            server.stop()
+
+    def test_command_too_long(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                with pytest.raises(ValueError):
+                    client.command('say ' + 'a' * 2000)
+        finally:
+            server.stop()
+
+    def test_command_many(self) -> None:
+        server = FakeRconServer('secret')
+        cmds = [f'say {i}' for i in range(40)]
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                responses = client.command_many(cmds)
+                after = client.command('list')
+
+            assert responses == [f'ran §a{cmd}!'.encode() for cmd in cmds]
+            assert after == 'ran §alist!'.encode()
+            assert server.commands == cmds + ['list']
+            assert server.logins == 1
+        finally:
+            server.stop()
+
+    def test_command_many_send_failure_is_stale(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                client.command('list')
+                client._socket = UnwritableSocket(client._socket)
+                with pytest.raises(StaleConnectionError):
+                    client.command_many(['say 1', 'say 2'])
+                assert not client.connected
+
+            assert server.commands == ['list']
+        finally:
+            server.stop()
+
+    def test_command_many_recv_timeout_is_not_stale(self) -> None:
+        server = FakeRconServer('secret')
+        server.silent = True
+        try:
+            client = RconClient('127.0.0.1', 'secret', server.port, 0.2)
+            with client:
+                with pytest.raises(OSError) as err:
+                    client.command_many(['say 1', 'say 2'])
+                assert not isinstance(err.value, StaleConnectionError)
+                assert not client.connected
+
+            assert server.commands == ['say 1', 'say 2']
+        finally:
+            server.stop()
+
+    def test_command_many_too_long(self) -> None:
+        server = FakeRconServer('secret')
+        try:
+            with RconClient('127.0.0.1', 'secret', server.port) as client:
+                with pytest.raises(ValueError):
+                    client.command_many(['list', 'say ' + 'a' * 2000])
+                assert client.command_many([]) == []
+
+            assert server.commands == []
+        finally:
+            server.stop()
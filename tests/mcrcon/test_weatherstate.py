@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""TestWeatherState class file"""
+import time
+
+from mcrcon.weatherstate import WeatherState
+
+
+class TestWeatherState():
+    """Tests for the WeatherState class in weatherstate.py"""
+
+    def test_needs_update(self, tmp_path, monkeypatch) -> None:
+        state = WeatherState(str(tmp_path / 'state.json'), resync_interval=60)
+        assert state.needs_update('localhost:25575', 'rain')
+
+        state.set('localhost:25575', 'rain')
+        assert not state.needs_update('localhost:25575', 'rain')
+        assert state.needs_update('localhost:25575', 'clear')
+        assert state.needs_update('otherhost:25575', 'rain')
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 60)
+        assert state.needs_update('localhost:25575', 'rain')
+
+    def test_resync_disabled(self, tmp_path) -> None:
+        state = WeatherState(str(tmp_path / 'state.json'), resync_interval=0)
+        state.set('localhost:25575', 'rain')
+        assert state.needs_update('localhost:25575', 'rain')
+        assert state.get('localhost:25575')['weather'] == 'rain'
+
+    def test_needs_update_after_duration(self, tmp_path, monkeypatch) -> None:
+        state = WeatherState(
+            str(tmp_path / 'state.json'), resync_interval=3600)
+        state.set('localhost:25575', 'rain', 60)
+        assert not state.needs_update('localhost:25575', 'rain')
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 60)
+        assert state.needs_update('localhost:25575', 'rain')
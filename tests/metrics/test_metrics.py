@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""TestMetrics class file"""
+import json
+
+import pytest
+
+from metrics import metrics
+
+
+class TestMetrics():
+    """Tests for functions in metrics.py"""
+
+    def set_up(self) -> None:
+        metrics.reset()
+
+    def test_increment(self) -> None:
+        self.set_up()
+        metrics.increment('api_calls_total', {'endpoint': 'onecall'})
+        metrics.increment('api_calls_total', {'endpoint': 'onecall'})
+        metrics.increment('api_retries_total', value=3)
+
+        counters = metrics.snapshot()['counters']
+        assert counters[
+            'owencraft_api_calls_total{endpoint="onecall"}'] == 2
+        assert counters['owencraft_api_retries_total'] == 3
+        assert metrics.get_counter(
+            'api_calls_total', {'endpoint': 'onecall'}) == 2
+        assert metrics.get_counter('api_calls_total') == 0
+
+    def test_span(self) -> None:
+        self.set_up()
+        with metrics.span('geocode'):
+            pass
+
+        with pytest.raises(ValueError):
+            with metrics.span('geocode'):
+                raise ValueError('failed')
+
+        stage = metrics.snapshot()['stages']['geocode']
+        assert stage['count'] == 2
+        assert stage['sum'] >= stage['max'] >= stage['last'] >= 0
+
+    def test_write_prometheus(self, tmp_path) -> None:
+        self.set_up()
+        metrics.increment('cache_hits_total', {'cache': 'geocode'})
+        metrics.observe('weather', 0.25)
+        path = tmp_path / 'owencraft.prom'
+        metrics.write_prometheus(str(path))
+
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert '# TYPE owencraft_cache_hits_total counter' in lines
+        assert 'owencraft_cache_hits_total{cache="geocode"} 1' in lines
+        assert ('owencraft_stage_duration_seconds_count{stage="weather"} 1'
+                in lines)
+        assert ('owencraft_stage_duration_seconds_sum{stage="weather"} '
+                '0.250000' in lines)
+
+    def test_write_json(self, tmp_path) -> None:
+        self.set_up()
+        metrics.observe('rcon', 0.5)
+        path = tmp_path / 'metrics.json'
+        metrics.write_json(str(path))
+
+        data = json.loads(path.read_text(encoding='utf-8'))
+        assert data['stages']['rcon']['last'] == 0.5
+        assert data['counters'] == {}
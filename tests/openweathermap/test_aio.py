@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""TestAio class file"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openweathermap import aio, openweathermap
+
+
+class TestAio():
+    """Tests for functions in aio.py"""
+
+    def test_get_current_weather(self, monkeypatch) -> None:
+        monkeypatch.setattr(
+            openweathermap, 'get_current_weather',
+            lambda lat, lon, session, timeout: 501)
+        assert asyncio.run(aio.get_current_weather('1.0', '2.0', 1)) == 501
+
+    def test_get_current_weather_timeout(self, monkeypatch) -> None:
+        released = threading.Event()
+        calls: list[float] = []
+
+        def slow(lat: str, lon: str, session: None, timeout: float) -> int:
+            calls.append(timeout)
+            released.wait(5)
+            return 800
+
+        monkeypatch.setattr(openweathermap, 'get_current_weather', slow)
+        start = time.monotonic()
+        try:
+            with pytest.raises(ValueError):
+                asyncio.run(aio.get_current_weather('1.0', '2.0', 0.1))
+            assert time.monotonic() - start < 1
+            assert calls == [0.1]
+            # The worker is left to finish on a daemon thread, so it can't
+            # hold up the interpreter's exit
+            assert all(
+                thread.daemon for thread in threading.enumerate()
+                if thread.name == 'slow')
+        finally:
+            released.set()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""TestGeocodeCache class file"""
+import time
+
+from openweathermap.geocache import GeocodeCache
+
+
+class TestGeocodeCache():
+    """Tests for the GeocodeCache class in geocache.py"""
+
+    def test_get_missing(self, tmp_path) -> None:
+        cache = GeocodeCache(str(tmp_path / 'geocode.json'))
+        assert cache.get(10001, 'US') is None
+
+    def test_set_and_get(self, tmp_path) -> None:
+        cache = GeocodeCache(str(tmp_path / 'geocode.json'))
+        cache.set(10001, 'US', '10.234', '-10.234')
+        cache.set(10002, 'us', '11.234', '-11.234')
+
+        other = GeocodeCache(str(tmp_path / 'geocode.json'))
+        assert other.get(10001, 'US') == ('10.234', '-10.234')
+        assert other.get(10002, 'US') == ('11.234', '-11.234')
+        assert other.get(10001, 'CA') is None
+
+    def test_expired(self, tmp_path, monkeypatch) -> None:
+        cache = GeocodeCache(str(tmp_path / 'geocode.json'), ttl=60)
+        cache.set(10001, 'US', '10.234', '-10.234')
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert cache.get(10001, 'US') is None
+
+    def test_corrupt_file(self, tmp_path) -> None:
+        path = tmp_path / 'geocode.json'
+        path.write_text('{not json', encoding='utf-8')
+        cache = GeocodeCache(str(path))
+        assert cache.get(10001, 'US') is None
+
+        cache.set(10001, 'US', '10.234', '-10.234')
+        assert cache.get(10001, 'US') == ('10.234', '-10.234')
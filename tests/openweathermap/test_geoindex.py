@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""TestGeoIndex class file"""
+from openweathermap import geoindex
+
+
+class TestGeoIndex():
+    """Tests for functions in geoindex.py"""
+
+    def write_dump(self, tmp_path) -> str:
+        rows = [
+            ['US', '01234', 'Somewhere', 'MA', '', '', '', '', '',
+             '42.1', '-72.5', '4'],
+            ['US', '01234', 'Duplicate', 'MA', '', '', '', '', '',
+             '0', '0', '4'],
+            ['US', '10001', 'New York', 'NY', '', '', '', '', '',
+             '40.7484', '-73.9967', '4'],
+            ['DE', '10115', 'Berlin', '', '', '', '', '', '',
+             '52.5323', '13.3846', '4'],
+            ['US', '99999', 'No location', '', '', '', '', '', '',
+             '', '', ''],
+        ]
+        path = tmp_path / 'allCountries.txt'
+        path.write_text(
+            '\n'.join('\t'.join(row) for row in rows) + '\n', encoding='utf-8')
+        return str(path)
+
+    def test_normalize_postal_code(self) -> None:
+        assert geoindex.normalize_postal_code('01234') == '1234'
+        assert geoindex.normalize_postal_code(1234) == '1234'
+        assert geoindex.normalize_postal_code('00000') == '0'
+        assert geoindex.normalize_postal_code(' sw1a 1aa ') == 'SW1A1AA'
+
+    def test_build_and_lookup(self, tmp_path) -> None:
+        db_path = str(tmp_path / 'postal.sqlite')
+        assert geoindex.lookup(10001, 'US', db_path) is None
+
+        assert geoindex.build_index(self.write_dump(tmp_path), db_path) == 3
+        assert geoindex.lookup(1234, 'US', db_path) == ('42.1', '-72.5')
+        assert geoindex.lookup('10001', 'us', db_path) == (
+            '40.7484', '-73.9967')
+        assert geoindex.lookup(10115, 'DE', db_path) == ('52.5323', '13.3846')
+        assert geoindex.lookup(10115, 'US', db_path) is None
+        assert geoindex.lookup(99999, 'US', db_path) is None
+
+    def test_rebuild(self, tmp_path) -> None:
+        db_path = str(tmp_path / 'postal.sqlite')
+        geoindex.build_index(self.write_dump(tmp_path), db_path)
+        assert geoindex.lookup(10001, 'US', db_path) is not None
+
+        empty = tmp_path / 'empty.txt'
+        empty.write_text('', encoding='utf-8')
+        assert geoindex.build_index(str(empty), db_path) == 0
+        assert geoindex.lookup(10001, 'US', db_path) is None
@@ -4,8 +4,13 @@ import pytest
 
 import requests
 import requests_mock
+from urllib3 import HTTPResponse
+from urllib3.exceptions import MaxRetryError
 
+from metrics import metrics
 from openweathermap import openweathermap
+from openweathermap.quota import QuotaBudget, QuotaExceededError
+from openweathermap.retry import CountingRetry
 
 
 class TestOpenWeatherMap():
@@ -151,3 +156,141 @@ class TestOpenWeatherMap():
         requests_mock.register_uri('GET', url, json=data, status_code=200)
         weather_id = openweathermap.get_current_weather(self.lat, self.lon)
         assert 803 == weather_id
+
+    def test_get_session(self) -> None:
+        self.set_up()
+        openweathermap.set_session(None)
+        session = openweathermap.get_session()
+        assert session is openweathermap.get_session()
+
+        retry = session.get_adapter(self.base_url).max_retries
+        assert retry.total == 3
+        assert 429 in retry.status_forcelist
+        assert 503 in retry.status_forcelist
+        assert retry.respect_retry_after_header
+        assert not retry.raise_on_status
+
+    def test_retries_are_counted(self) -> None:
+        self.set_up()
+        metrics.reset()
+        retry = openweathermap.get_session().get_adapter(
+            self.base_url).max_retries
+        retry = retry.increment(method='GET', url='/')
+        retry = retry.increment(method='GET', url='/')
+
+        assert isinstance(retry, CountingRetry)
+        assert retry.total == 1
+        assert metrics.snapshot()['counters'][
+            'owencraft_api_retries_total'] == 2
+
+    def test_long_retry_after_is_not_waited_for(self) -> None:
+        self.set_up()
+        metrics.reset()
+        retry = openweathermap.get_session().get_adapter(
+            self.base_url).max_retries
+
+        short = HTTPResponse(status=429, headers={'Retry-After': '1'})
+        assert retry.increment(method='GET', url='/', response=short)
+
+        long = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+        with pytest.raises(MaxRetryError):
+            retry.increment(method='GET', url='/', response=long)
+        assert metrics.snapshot()['counters'][
+            'owencraft_api_retries_total'] == 1
+
+    def test_get_current_weather_with_session(
+            self, requests_mock: requests_mock.Mocker) -> None:
+        self.set_up()
+        url = f'/data/3.0/onecall?lat={self.lat}&lon={self.lon}'
+        data = {'current': {'weather': [{'id': 500}]}}
+        requests_mock.register_uri('GET', url, json=data, status_code=200)
+
+        session = requests.Session()
+        weather_id = openweathermap.get_current_weather(
+            self.lat, self.lon, session)
+        assert 500 == weather_id
+        assert requests_mock.call_count == 1
+
+    def test_get_hourly_forecast(
+            self, requests_mock: requests_mock.Mocker) -> None:
+        self.set_up()
+        url = f'/data/3.0/onecall?lat={self.lat}&lon={self.lon}'
+        data = {
+            'lat': self.lat,
+            'lon': self.lon,
+            'hourly': [
+                {'dt': 1684926000, 'weather': [{'id': 803}], 'pop': 0},
+                {'dt': 1684929600, 'weather': [{'id': 501}], 'pop': 0.6},
+                {'dt': 1684933200, 'weather': [{'id': 211}]},
+            ]
+        }
+        requests_mock.register_uri('GET', url, json=data, status_code=200)
+        hourly = openweathermap.get_hourly_forecast(self.lat, self.lon)
+        assert hourly == [
+            {'dt': 1684926000, 'id': 803, 'pop': 0.0},
+            {'dt': 1684929600, 'id': 501, 'pop': 0.6},
+            {'dt': 1684933200, 'id': 211, 'pop': 0.0},
+        ]
+        assert 'exclude=current' in requests_mock.last_request.url
+
+    def test_get_minutely_weather(
+            self, requests_mock: requests_mock.Mocker) -> None:
+        self.set_up()
+        url = f'/data/3.0/onecall?lat={self.lat}&lon={self.lon}'
+        data = {
+            'current': {'weather': [{'id': 803}]},
+            'minutely': [
+                {'dt': 1684926000, 'precipitation': 0},
+                {'dt': 1684926060, 'precipitation': 0.4},
+            ]
+        }
+        requests_mock.register_uri('GET', url, json=data, status_code=200)
+        assert openweathermap.get_minutely_weather(self.lat, self.lon) == {
+            'id': 803,
+            'minutely': [
+                {'dt': 1684926000, 'precipitation': 0.0},
+                {'dt': 1684926060, 'precipitation': 0.4},
+            ]
+        }
+        assert 'exclude=hourly' in requests_mock.last_request.url
+
+        # Not every location has minutely data
+        requests_mock.register_uri('GET', url, json={
+            'current': {'weather': [{'id': 500}]}
+        }, status_code=200)
+        assert openweathermap.get_minutely_weather(self.lat, self.lon) == {
+            'id': 500,
+            'minutely': []
+        }
+
+    def test_get_hourly_forecast_empty_response(
+            self, requests_mock: requests_mock.Mocker) -> None:
+        self.set_up()
+        url = f'/data/3.0/onecall?lat={self.lat}&lon={self.lon}'
+        requests_mock.register_uri(
+            'GET', url, text='Forbidden', status_code=401)
+        assert openweathermap.get_hourly_forecast(self.lat, self.lon) == []
+
+    def test_get_current_weather_quota(
+            self, requests_mock: requests_mock.Mocker, tmp_path) -> None:
+        self.set_up()
+        url = f'/data/3.0/onecall?lat={self.lat}&lon={self.lon}'
+        data = {'current': {'weather': [{'id': 500}]}}
+        requests_mock.register_uri('GET', url, json=data, status_code=200)
+
+        metrics.reset()
+        quota = QuotaBudget(2, str(tmp_path / 'api_quota.json'))
+        openweathermap.set_quota(quota)
+        try:
+            # Another process spends part of the shared budget
+            assert quota.acquire()
+            assert openweathermap.get_current_weather(
+                self.lat, self.lon) == 500
+            with pytest.raises(QuotaExceededError):
+                openweathermap.get_current_weather(self.lat, self.lon)
+        finally:
+            openweathermap.set_quota(None)
+
+        assert requests_mock.call_count == 1
+        assert quota.used() == 2
+        assert metrics.get_counter('api_quota_calls_total') == 1
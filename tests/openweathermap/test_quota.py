@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""TestQuotaBudget class file"""
+import json
+
+import pytest
+
+from openweathermap.quota import QuotaBudget
+
+
+class TestQuotaBudget():
+    """Tests for the QuotaBudget class"""
+
+    def set_up(self, tmp_path, daily_limit: int = 3) -> None:
+        self.path = str(tmp_path / 'api_quota.json')
+        self.quota = QuotaBudget(daily_limit, self.path)
+
+    def test_invalid_limit(self, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            QuotaBudget(0, str(tmp_path / 'api_quota.json'))
+
+    def test_acquire(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        assert self.quota.acquire()
+        assert self.quota.acquire(2)
+        assert not self.quota.acquire()
+        assert self.quota.used() == 3
+        assert self.quota.remaining() == 0
+
+        # Another process sees the same budget
+        assert QuotaBudget(3, self.path).remaining() == 0
+
+    def test_resets_every_day(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump({'day': '2000-01-01', 'used': 3}, file)
+
+        assert self.quota.remaining() == 3
+        assert self.quota.acquire()
+        assert self.quota.used() == 1
+
+    def test_stretch_interval(self, tmp_path, monkeypatch) -> None:
+        self.set_up(tmp_path, daily_limit=100)
+        monkeypatch.setattr(self.quota, 'seconds_until_reset', lambda: 3600)
+        assert self.quota.stretch_interval(60) == 60
+
+        # 10 calls left for the last hour, so one call every 6 minutes
+        self.quota.acquire(90)
+        assert self.quota.stretch_interval(60) == 360
+        assert self.quota.stretch_interval(60, calls_per_run=2) == 720
+
+        self.quota.acquire(10)
+        assert self.quota.stretch_interval(60) == 3600
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""TestHttpClientSession class file"""
+import http.server
+import json
+import threading
+
+import pytest
+
+from openweathermap import openweathermap
+from openweathermap.transport import HttpClientSession
+
+
+class FakeApiHandler(http.server.BaseHTTPRequestHandler):
+    """Answers with the queued (status, body) pairs, one per request"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        self.server.paths.append(self.path)
+        status, body = self.server.responses.pop(0)
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', self.server.retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class TestHttpClientSession():
+    """Tests for the HttpClientSession class"""
+
+    def set_up(self, responses: list[tuple[int, dict]]) -> None:
+        self.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), FakeApiHandler)
+        self.server.responses = responses
+        self.server.paths = []
+        self.server.retry_after = '0'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.session = HttpClientSession(backoff_factor=0, backoff_jitter=0)
+
+    def tear_down(self) -> None:
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get(self) -> None:
+        self.set_up([(200, {'id': 1}), (200, {'id': 2})])
+        try:
+            first = self.session.get(f'{self.base_url}/a?x=1', timeout=5)
+            second = self.session.get(f'{self.base_url}/b', timeout=5)
+        finally:
+            self.tear_down()
+
+        assert first.status_code == 200
+        assert first.json() == {'id': 1}
+        assert second.json() == {'id': 2}
+        assert self.server.paths == ['/a?x=1', '/b']
+
+    def test_get_retries(self) -> None:
+        self.set_up([(429, {}), (503, {}), (200, {'id': 3})])
+        try:
+            response = self.session.get(f'{self.base_url}/', timeout=5)
+        finally:
+            self.tear_down()
+
+        assert response.status_code == 200
+        assert len(self.server.paths) == 3
+
+    def test_get_long_retry_after(self) -> None:
+        self.set_up([(429, {}), (200, {'id': 3})])
+        self.server.retry_after = '3600'
+        try:
+            response = self.session.get(f'{self.base_url}/', timeout=5)
+        finally:
+            self.tear_down()
+
+        assert response.status_code == 429
+        assert len(self.server.paths) == 1
+
+    def test_get_out_of_retries(self) -> None:
+        self.set_up([(503, {'message': 'down'})] * 2)
+        self.session = HttpClientSession(retries=1, backoff_factor=0)
+        try:
+            response = self.session.get(f'{self.base_url}/', timeout=5)
+        finally:
+            self.tear_down()
+
+        assert response.status_code == 503
+        assert 'down' in response.text
+
+    def test_get_connection_error(self) -> None:
+        self.set_up([])
+        self.tear_down()
+        session = HttpClientSession(retries=0)
+        with pytest.raises(ConnectionError):
+            session.get(f'{self.base_url}/', timeout=1)
+
+    def test_get_current_weather(self, monkeypatch) -> None:
+        data = {'current': {'weather': [{'id': 501}]}}
+        self.set_up([(200, data)])
+        monkeypatch.setattr(openweathermap, 'BASE_URL', self.base_url)
+        monkeypatch.setenv('OPENWEATHERMAP_API_KEY', 'x')
+        try:
+            weather_id = openweathermap.get_current_weather(
+                '1.0', '2.0', self.session)
+        finally:
+            self.tear_down()
+
+        assert weather_id == 501
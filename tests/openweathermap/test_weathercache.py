@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""TestWeatherCache class file"""
+import time
+
+from openweathermap.weathercache import WeatherCache
+
+
+class TestWeatherCache():
+    """Tests for the WeatherCache class in weathercache.py"""
+
+    def test_get_missing(self, tmp_path) -> None:
+        cache = WeatherCache(str(tmp_path / 'weather.json'))
+        assert cache.get('10.234', '-10.234') is None
+        assert cache.get_stale('10.234', '-10.234') is None
+
+    def test_fresh_and_stale(self, tmp_path, monkeypatch) -> None:
+        cache = WeatherCache(
+            str(tmp_path / 'weather.json'), ttl=60, stale_ttl=600)
+        cache.set('10.234', '-10.234', 501)
+        assert cache.get('10.234', '-10.234') == 501
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert cache.get('10.234', '-10.234') is None
+        assert cache.get_stale('10.234', '-10.234') == 501
+
+        monkeypatch.setattr(time, 'time', lambda: now + 601)
+        assert cache.get_stale('10.234', '-10.234') is None
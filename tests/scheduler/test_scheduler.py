@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""TestScheduler class file"""
+import time
+
+import pytest
+
+from scheduler.scheduler import Scheduler
+
+
+class TestScheduler():
+    """Tests for the Scheduler class in scheduler.py"""
+
+    def test_invalid_interval(self) -> None:
+        with pytest.raises(ValueError):
+            Scheduler(0)
+
+    def test_run_until_stopped(self) -> None:
+        scheduler = Scheduler(0.01)
+        runs: list[float] = []
+
+        def job() -> None:
+            runs.append(time.monotonic())
+            if len(runs) == 3:
+                scheduler.stop()
+
+        scheduler.run(job)
+        assert len(runs) == 3
+        assert scheduler.stopped
+
+    def test_run_skips_missed_slots(self) -> None:
+        scheduler = Scheduler(0.02)
+        runs: list[float] = []
+
+        def job() -> None:
+            runs.append(time.monotonic())
+            if len(runs) == 1:
+                time.sleep(0.05)
+            if len(runs) == 2:
+                scheduler.stop()
+
+        scheduler.run(job)
+        # The second run lands on the next slot of the original schedule
+        assert runs[1] - runs[0] == pytest.approx(0.06, abs=0.015)
+
+    def test_run_with_job_delay(self) -> None:
+        scheduler = Scheduler(10)
+        runs: list[float] = []
+
+        def job() -> float:
+            runs.append(time.monotonic())
+            if len(runs) == 3:
+                scheduler.stop()
+            return 0.02
+
+        scheduler.run(job)
+        # The job's own delay replaces the 10s interval
+        assert len(runs) == 3
+        assert runs[2] - runs[0] == pytest.approx(0.04, abs=0.015)
+
+    def test_call_later(self) -> None:
+        scheduler = Scheduler(10)
+        calls: list[str] = []
+        start = time.monotonic()
+
+        def job() -> None:
+            scheduler.call_later('change', 0.05, lambda: calls.append('old'))
+            scheduler.call_later('change', 0.02, lambda: calls.append('new'))
+            scheduler.call_later('stop', 0.04, scheduler.stop)
+            scheduler.call_later('never', 0.03, lambda: calls.append('x'))
+            scheduler.cancel('never')
+
+        scheduler.run(job)
+        # Only the latest callback for a key runs, on time, between runs
+        assert calls == ['new']
+        assert time.monotonic() - start == pytest.approx(0.04, abs=0.015)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""TestSingleFlight class file"""
+import os
+import threading
+import time
+
+import pytest
+
+from datastore import datastore
+from singleflight.singleflight import SingleFlight
+
+
+class TestSingleFlight():
+    """Tests for the SingleFlight class in singleflight.py"""
+
+    def set_up(self, tmp_path, window: float = 30) -> None:
+        self.directory = str(tmp_path / 'inflight')
+        self.single_flight = SingleFlight(window, 1, self.directory)
+        self.calls = 0
+
+    def fetch(self) -> int:
+        self.calls += 1
+        time.sleep(0.05)
+        return 803
+
+    def test_invalid_window(self) -> None:
+        with pytest.raises(ValueError):
+            SingleFlight(0)
+
+    def test_coalesces_threads(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        results: list[int] = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.single_flight.do('current:1,2', self.fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [803] * 5
+        assert self.calls == 1
+
+    def test_shares_across_processes(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        assert self.single_flight.do('current:1,2', self.fetch) == 803
+
+        # Another process sees the result while it is inside the window
+        other = SingleFlight(30, 1, self.directory)
+        assert other.do('current:1,2', self.fetch) == 803
+        assert other.do('current:3,4', self.fetch) == 803
+        assert self.calls == 2
+
+    def test_window_expires(self, tmp_path) -> None:
+        self.set_up(tmp_path, window=0.01)
+        self.single_flight.do('current:1,2', self.fetch)
+        time.sleep(0.02)
+        self.single_flight.do('current:1,2', self.fetch)
+        assert self.calls == 2
+
+    def test_does_not_share_rejected_results(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        self.single_flight.do(
+            'current:1,2', lambda: -1, lambda result: result != -1)
+        assert self.single_flight.do('current:1,2', self.fetch) == 803
+
+    def test_error_goes_to_waiters(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        errors: list[Exception] = []
+
+        def fetch() -> int:
+            time.sleep(0.05)
+            raise ValueError('API down')
+
+        def call() -> None:
+            try:
+                self.single_flight.do('current:1,2', fetch)
+            except ValueError as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+
+    def test_fetches_when_lock_is_held(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+        single_flight = SingleFlight(30, 0.05, self.directory)
+        path = single_flight._get_path('current:1,2')
+        with datastore.lock(path):
+            assert single_flight.do('current:1,2', self.fetch) == 803
+        assert self.calls == 1
+
+    def test_fetch_error_is_not_retried(self, tmp_path) -> None:
+        self.set_up(tmp_path)
+
+        def fetch() -> int:
+            self.calls += 1
+            raise ConnectionError('API down')
+
+        with pytest.raises(ConnectionError):
+            self.single_flight.do('current:1,2', fetch)
+        assert self.calls == 1
+
+    def test_prunes_expired_entries(self, tmp_path) -> None:
+        self.set_up(tmp_path, window=0.2)
+        self.single_flight.do('current:1,2', self.fetch)
+        self.single_flight.do('current:3,4', self.fetch)
+        assert len(os.listdir(self.directory)) == 4
+
+        time.sleep(0.3)
+        self.single_flight.do('current:5,6', self.fetch)
+        path = self.single_flight._get_path('current:5,6')
+        assert sorted(os.listdir(self.directory)) == sorted([
+            os.path.basename(path), os.path.basename(path) + '.lock'])
+
+    def test_prune_leaves_held_locks(self, tmp_path) -> None:
+        self.set_up(tmp_path, window=0.2)
+        held = self.single_flight._get_path('current:1,2')
+        with datastore.lock(held):
+            time.sleep(0.3)
+            self.single_flight.do('current:3,4', self.fetch)
+            assert os.path.exists(held + '.lock')